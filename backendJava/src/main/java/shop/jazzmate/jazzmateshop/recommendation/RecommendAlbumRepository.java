@@ -1,6 +1,9 @@
 package shop.jazzmate.jazzmateshop.recommendation;
 
 import org.springframework.data.jpa.repository.JpaRepository;
+import org.springframework.data.jpa.repository.Modifying;
+import org.springframework.data.jpa.repository.Query;
+import org.springframework.data.repository.query.Param;
 import org.springframework.stereotype.Repository;
 import shop.jazzmate.jazzmateshop.recommendation.entity.RecommendAlbum;
 
@@ -10,4 +13,9 @@ import java.util.List;
 public interface RecommendAlbumRepository extends JpaRepository<RecommendAlbum, Integer> {
 
     List<RecommendAlbum> findByUserReviewId(Integer userReviewId);
+
+    // 콜백 재전송 시 이전 결과를 지우고 다시 저장한다. bulk delete라 이어지는 insert보다 먼저 실행된다.
+    @Modifying(flushAutomatically = true, clearAutomatically = true)
+    @Query("DELETE FROM RecommendAlbum r WHERE r.userReviewId = :userReviewId")
+    int deleteByUserReviewId(@Param("userReviewId") Integer userReviewId);
 }
@@ -24,6 +24,7 @@ public class RecommendAlbumService {
 
     // POST /api/user-reviews/{reviewId}/recommendations — FastAPI 콜백
     // albumId = v_embedding_with_album.album_id (= embedding_vectors.id)
+    // FastAPI outbox는 at-least-once로 전송한다. 같은 결과가 다시 와도 리뷰의 추천을 통째로 교체한다.
     @Transactional
     public void createRecommendAlbums(Integer reviewId, RecommendAlbumCallbackRequest request) {
         UserReview review = userReviewRepository.findById(reviewId)
@@ -56,10 +57,12 @@ public class RecommendAlbumService {
                         .recommendationReason(item.getRecommendationReason())
                         .build())
                 .toList();
+        int replaced = recommendAlbumRepository.deleteByUserReviewId(reviewId);
         recommendAlbumRepository.saveAll(albums);
-        
+
         review.completeRecommendation();
 
-        log.info("추천 앨범 저장 완료: reviewId={}, savedCount={}", reviewId, albums.size());
+        log.info("추천 앨범 저장 완료: reviewId={}, savedCount={}, replacedCount={}",
+                reviewId, albums.size(), replaced);
     }
 }
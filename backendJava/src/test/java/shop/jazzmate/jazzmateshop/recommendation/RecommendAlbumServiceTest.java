@@ -5,6 +5,7 @@ import org.junit.jupiter.api.Nested;
 import org.junit.jupiter.api.Test;
 import org.junit.jupiter.api.extension.ExtendWith;
 import org.mockito.ArgumentCaptor;
+import org.mockito.InOrder;
 import org.mockito.InjectMocks;
 import org.mockito.Mock;
 import org.mockito.junit.jupiter.MockitoExtension;
@@ -25,6 +26,7 @@ import static org.assertj.core.api.Assertions.assertThat;
 import static org.assertj.core.api.Assertions.assertThatThrownBy;
 import static org.mockito.ArgumentMatchers.anyList;
 import static org.mockito.BDDMockito.given;
+import static org.mockito.Mockito.inOrder;
 import static org.mockito.Mockito.never;
 import static org.mockito.Mockito.verify;
 
@@ -93,6 +95,20 @@ class RecommendAlbumServiceTest {
             assertThat(captor.getValue()).hasSize(3);
         }
 
+        @Test
+        @DisplayName("같은 콜백 재전송 → 기존 추천 삭제 후 저장해 중복 없음")
+        void createRecommendAlbums_redeliveredCallback_replacesExistingRows() {
+            given(recommendAlbumRepository.deleteByUserReviewId(REVIEW_ID)).willReturn(2);
+            given(recommendAlbumRepository.saveAll(anyList())).willAnswer(i -> i.getArgument(0));
+            given(userReviewRepository.findById(REVIEW_ID)).willReturn(Optional.of(buildReview()));
+
+            recommendAlbumService.createRecommendAlbums(REVIEW_ID, buildBatchRequest(ALBUM_ID_10, ALBUM_ID_11));
+
+            InOrder order = inOrder(recommendAlbumRepository);
+            order.verify(recommendAlbumRepository).deleteByUserReviewId(REVIEW_ID);
+            order.verify(recommendAlbumRepository).saveAll(anyList());
+        }
+
         @Test
         @DisplayName("콜백 저장 완료 → UserReview 상태 COMPLETED 전이")
         void createRecommendAlbums_completedCallback_marksReviewCompleted() {
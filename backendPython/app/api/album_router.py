@@ -0,0 +1,32 @@
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+
+from app.core.config import settings
+from app.schemas.recommendation import SimilarAlbum, SimilarAlbumsResponse
+
+
+router = APIRouter(prefix="/albums")
+
+
+@router.get("/{album_id}/similar", response_model=SimilarAlbumsResponse)
+async def get_similar_albums(
+    album_id: str,
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=settings.ALBUM_KNN_NEIGHBORS)] = 10,
+) -> SimilarAlbumsResponse:
+    graph = getattr(request.app.state, "album_knn_graph", None)
+    if graph is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Album kNN graph is not loaded.",
+        )
+    if album_id not in graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return SimilarAlbumsResponse(
+        album_id=album_id,
+        similar_albums=[
+            SimilarAlbum(album_id=neighbor_id, similarity=round(score, 4))
+            for neighbor_id, score in graph.similar(album_id, limit)
+        ],
+    )
@@ -0,0 +1,55 @@
+import asyncio
+import hmac
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+
+from app.core.config import settings
+from app.core.profiler import SamplingProfiler
+
+
+router = APIRouter(prefix="/debug", include_in_schema=False)
+
+# 표본 추출이 겹치면 서로의 stack이 섞이므로 프로세스당 한 번에 하나만 돌린다.
+_profile_lock = asyncio.Lock()
+
+
+def _authorize(token: Optional[str]) -> None:
+    expected = settings.DEBUG_PROFILER_TOKEN
+    if not expected:
+        # 토큰을 설정하지 않은 환경에서는 라우트가 없는 것처럼 보인다.
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if token is None or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(default=10.0, gt=0),
+    mode: Literal["cpu", "async"] = "cpu",
+    interval_ms: float = Query(default=5.0, ge=1.0, le=1000.0),
+    x_debug_token: Optional[str] = Header(default=None),
+) -> Response:
+    _authorize(x_debug_token)
+    if seconds > settings.DEBUG_PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"seconds must be <= {settings.DEBUG_PROFILER_MAX_SECONDS}",
+        )
+    if _profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A profile is already running."
+        )
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval_seconds=interval_ms / 1000)
+        if mode == "cpu":
+            await asyncio.to_thread(profiler.profile_threads, seconds)
+        else:
+            await profiler.profile_tasks(seconds)
+
+    return Response(
+        content=profiler.collapsed(),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="profile-{mode}.collapsed"'},
+    )
@@ -1,15 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import Request
 
 from app.core.exceptions import ConfigurationError
 from app.clients.spring_callback_client import SpringCallbackClient
 from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.recommendation_history_repository import (
+    RecommendationHistoryRepository,
+)
+from app.services.bulk_recommendation_service import (
+    BulkJobRegistry,
+    BulkRecommendationService,
+)
 from app.services.embedding_service import EmbeddingService
+from app.services.recommendation_queue import RecommendationJobQueue
 from app.services.recommendation_reason_service import RecommendationReasonService
 from app.services.recommendation_service import RecommendationService
 
 
-def _get_required_app_state(request: Request, resource_name: str):
-    value = getattr(request.app.state, resource_name, None)
+def _get_required_state(state, resource_name: str):
+    value = getattr(state, resource_name, None)
     if value is None:
         raise ConfigurationError(
             f"FastAPI app.state.{resource_name} is not configured."
@@ -17,17 +28,110 @@ def _get_required_app_state(request: Request, resource_name: str):
     return value
 
 
+def _get_required_app_state(request: Request, resource_name: str):
+    return _get_required_state(request.app.state, resource_name)
+
+
+@dataclass(frozen=True)
+class ServiceContainer:
+    """lifespan에서 한 번 조립해 요청 간에 공유하는 service 묶음.
+
+    service들은 요청별 상태 없이 app-scoped 리소스만 참조하므로 공유해도 된다.
+    """
+
+    recommendation_service: RecommendationService
+    bulk_recommendation_service: BulkRecommendationService
+
+
+def build_service_container(state) -> ServiceContainer:
+    recommendation_service = build_recommendation_service(state)
+    return ServiceContainer(
+        recommendation_service=recommendation_service,
+        bulk_recommendation_service=build_bulk_recommendation_service(
+            state, recommendation_service
+        ),
+    )
+
+
 def get_recommendation_service(request: Request) -> RecommendationService:
-    database = _get_required_app_state(request, "database")
-    embedding_client = _get_required_app_state(request, "openai_embedding_client")
-    chat_client = _get_required_app_state(request, "openai_chat_client")
-    spring_http_client = _get_required_app_state(request, "spring_http_client")
+    services = getattr(request.app.state, "services", None)
+    if services is not None:
+        return services.recommendation_service
+    return build_recommendation_service(request.app.state)
+
+
+def build_recommendation_service(state) -> RecommendationService:
+    """app.state로 RecommendationService를 조립한다. 추천 worker 프로세스도 이 함수를 쓴다."""
+    database = _get_required_state(state, "database")
+    embedding_client = _get_required_state(state, "openai_embedding_client")
+    chat_client = _get_required_state(state, "openai_chat_client")
+    spring_http_client = _get_required_state(state, "spring_http_client")
 
     return RecommendationService(
-        embedding_service=EmbeddingService(openai_client=embedding_client),
-        album_embedding_repository=AlbumEmbeddingRepository(database=database),
+        embedding_service=EmbeddingService(
+            openai_client=embedding_client,
+            cache=getattr(state, "embedding_cache", None),
+        ),
+        album_embedding_repository=AlbumEmbeddingRepository(
+            database=database,
+            vector_index_loader=getattr(state, "album_vector_index_loader", None),
+            category_index=getattr(state, "album_category_index", None),
+        ),
+        recommendation_reason_service=RecommendationReasonService(
+            openai_client=chat_client,
+            cache=getattr(state, "reason_cache", None),
+        ),
+        spring_callback_client=SpringCallbackClient(
+            http_client=spring_http_client,
+            callback_dispatcher=getattr(state, "callback_dispatcher", None),
+            callback_batcher=getattr(state, "callback_batcher", None),
+        ),
+        economy_reason_scheduler=getattr(state, "economy_reason_scheduler", None),
+        recommendation_history_repository=RecommendationHistoryRepository(
+            database=database
+        ),
+        user_taste_store=getattr(state, "user_taste_store", None),
+        candidate_page_cache=getattr(state, "candidate_page_cache", None),
+        candidate_reranker=getattr(state, "candidate_reranker", None),
+        result_cache=getattr(state, "recommendation_result_cache", None),
+    )
+
+
+def get_bulk_recommendation_service(request: Request) -> BulkRecommendationService:
+    services = getattr(request.app.state, "services", None)
+    if services is not None:
+        return services.bulk_recommendation_service
+    return build_bulk_recommendation_service(
+        request.app.state, build_recommendation_service(request.app.state)
+    )
+
+
+def build_bulk_recommendation_service(
+    state, service: RecommendationService
+) -> BulkRecommendationService:
+    vector_index_loader = _get_required_state(state, "album_vector_index_loader")
+    bulk_reason_limiter = _get_required_state(state, "bulk_reason_limiter")
+
+    return BulkRecommendationService(
+        embedding_service=service.embedding_service,
+        album_embedding_repository=service.album_embedding_repository,
+        vector_index_loader=vector_index_loader,
         recommendation_reason_service=RecommendationReasonService(
-            openai_client=chat_client
+            openai_client=service.recommendation_reason_service.openai_client,
+            cache=service.recommendation_reason_service.cache,
+            concurrency_limiter=bulk_reason_limiter,
         ),
-        spring_callback_client=SpringCallbackClient(http_client=spring_http_client),
+        spring_callback_client=service.spring_callback_client,
+        economy_reason_scheduler=service.economy_reason_scheduler,
+        recommendation_history_repository=service.recommendation_history_repository,
+        candidate_reranker=service.candidate_reranker,
     )
+
+
+def get_bulk_job_registry(request: Request) -> BulkJobRegistry:
+    return _get_required_app_state(request, "bulk_job_registry")
+
+
+def get_recommendation_queue(request: Request) -> Optional[RecommendationJobQueue]:
+    # 설정하지 않으면 None이고, 추천은 front end 프로세스의 BackgroundTasks로 처리한다.
+    return getattr(request.app.state, "recommendation_queue", None)
@@ -1,8 +1,47 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, Response, status
+import asyncio
+import json
+from typing import Optional
 
-from app.api.dependencies import get_recommendation_service
-from app.schemas.recommendation import RecommendByReviewRequest
-from app.services.recommendation_service import RecommendationService
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import (
+    get_bulk_job_registry,
+    get_bulk_recommendation_service,
+    get_recommendation_queue,
+    get_recommendation_service,
+)
+from app.core.tracing import (
+    current_span_context,
+    format_traceparent,
+    parse_traceparent,
+    tracer,
+)
+from app.schemas.recommendation import (
+    BulkRecommendationJobResponse,
+    BulkRecommendByReviewsRequest,
+    RecommendByReviewRequest,
+    RecommendationPageResponse,
+)
+from app.services.bulk_recommendation_service import (
+    BulkJobRegistry,
+    BulkRecommendationService,
+)
+from app.services.candidate_page_store import CandidatePageStore
+from app.services.recommendation_queue import RecommendationJobQueue
+from app.services.recommendation_service import (
+    RecommendationService,
+    recommendation_handler,
+)
 
 
 router = APIRouter(prefix="/recommend")
@@ -13,10 +52,111 @@ async def recommend_by_review(
     request: RecommendByReviewRequest,
     background_tasks: BackgroundTasks,
     service: RecommendationService = Depends(get_recommendation_service),
+    queue: Optional[RecommendationJobQueue] = Depends(get_recommendation_queue),
+    traceparent: Optional[str] = Header(default=None),
 ) -> Response:
-    background_tasks.add_task(
-        service.recommend_by_review,
-        request.review_id,
-        request.review_content,
-    )
+    # Spring이 보낸 traceparent를 부모로 삼아 콜백까지 같은 trace로 이어 붙인다.
+    with tracer.start_span(
+        "POST /recommend/review",
+        parent=parse_traceparent(traceparent),
+        review_id=request.review_id,
+        mode=request.mode,
+    ):
+        # paged 후보가 이 프로세스 메모리에만 있으면 다음 page 조회를 위해 worker로 넘기지 않는다.
+        local_pages = request.mode == "paged" and not isinstance(
+            service.candidate_page_cache, CandidatePageStore
+        )
+        if queue is not None and not local_pages:
+            context = current_span_context()
+            await asyncio.to_thread(
+                queue.add,
+                request.review_id,
+                request.review_content,
+                request.mode,
+                request.user_id,
+                format_traceparent(context) if context is not None else traceparent,
+            )
+            return Response(status_code=status.HTTP_202_ACCEPTED)
+
+        background_tasks.add_task(
+            tracer.bind(
+                recommendation_handler(service, request.mode),
+                "recommendation.background",
+            ),
+            request.review_id,
+            request.review_content,
+            request.user_id,
+        )
     return Response(status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.get(
+    "/review/{review_id}/recommendations",
+    response_model=RecommendationPageResponse,
+)
+async def get_recommendation_page(
+    review_id: int,
+    page: int = Query(ge=1),
+    service: RecommendationService = Depends(get_recommendation_service),
+) -> RecommendationPageResponse:
+    result = await service.recommendation_page(review_id, page)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return result
+
+
+@router.post("/review/stream")
+async def stream_recommendation_by_review(
+    request: RecommendByReviewRequest,
+    service: RecommendationService = Depends(get_recommendation_service),
+) -> StreamingResponse:
+    async def event_stream():
+        async for event, data in service.stream_by_review(
+            request.review_content, request.user_id
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/reviews/bulk",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BulkRecommendationJobResponse,
+)
+async def recommend_by_reviews_bulk(
+    request: BulkRecommendByReviewsRequest,
+    background_tasks: BackgroundTasks,
+    service: BulkRecommendationService = Depends(get_bulk_recommendation_service),
+    registry: BulkJobRegistry = Depends(get_bulk_job_registry),
+    traceparent: Optional[str] = Header(default=None),
+) -> BulkRecommendationJobResponse:
+    job = registry.create(total=len(request.items))
+    with tracer.start_span(
+        "POST /recommend/reviews/bulk",
+        parent=parse_traceparent(traceparent),
+        job_id=job.job_id,
+        total=job.total,
+    ):
+        background_tasks.add_task(
+            tracer.bind(service.run, "bulk_recommendation.background"),
+            job,
+            request.items,
+            request.mode,
+        )
+    return BulkRecommendationJobResponse.model_validate(job)
+
+
+@router.get("/reviews/bulk/{job_id}", response_model=BulkRecommendationJobResponse)
+async def get_bulk_recommendation_job(
+    job_id: str,
+    registry: BulkJobRegistry = Depends(get_bulk_job_registry),
+) -> BulkRecommendationJobResponse:
+    job = registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return BulkRecommendationJobResponse.model_validate(job)
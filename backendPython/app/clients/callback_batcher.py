@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError
+from app.core.tracing import TRACEPARENT_HEADER, inject_headers, parse_traceparent, tracer
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = "/api/user-reviews/recommendations/batch"
+CALLBACK_PATH_TEMPLATE = "/api/user-reviews/{review_id}/recommendations"
+
+
+def batch_callback_url(base_url: Optional[str] = None) -> str:
+    return f"{(base_url or settings.SPRING_BASE_URL).rstrip('/')}{BATCH_PATH}"
+
+
+def batch_callback_body(items: Iterable[tuple[int, dict[str, Any]]]) -> dict[str, Any]:
+    """(review_id, 개별 콜백 body)를 배치 콜백 API body로 묶는다."""
+    return {"callbacks": [{"reviewId": review_id, **body} for review_id, body in items]}
+
+
+class CallbackBatcher:
+    """outbox 없이 운영할 때 짧은 window 안의 완료 결과를 모아 배치 콜백 한 번으로 보낸다.
+
+    배치 전송이 실패하면 결과를 버리지 않고 항목마다 개별 콜백으로 다시 보낸다.
+    outbox가 있으면 `CallbackDispatcher`가 outbox에 기록된 결과를 전송 시점에 묶으므로 쓰지 않는다.
+    """
+
+    BATCH_PATH = BATCH_PATH
+
+    def __init__(
+        self,
+        deliver: Callable[[str, dict[str, Any], dict[str, str]], Awaitable[None]],
+        base_url: Optional[str] = None,
+        window_seconds: float = settings.CALLBACK_BATCH_WINDOW_MS / 1000,
+        max_batch_size: int = settings.CALLBACK_BATCH_MAX_SIZE,
+    ):
+        if deliver is None:
+            raise ConfigurationError("CallbackBatcher requires a deliver function.")
+        self.deliver = deliver
+        self.base_url = (base_url or settings.SPRING_BASE_URL).rstrip("/")
+        self.url = batch_callback_url(self.base_url)
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[int, dict[str, Any], dict[str, str]]] = []
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(
+        self, review_id: int, body: dict[str, Any], headers: Optional[dict[str, str]] = None
+    ) -> None:
+        self._pending.append((review_id, body, dict(headers or {})))
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+            return
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        # 배치 요청은 traceparent를 하나만 실을 수 있어 첫 결과의 trace에 batch span을 잇는다.
+        parent = parse_traceparent(batch[0][2].get(TRACEPARENT_HEADER))
+        with tracer.start_span(
+            "spring.callback.batch", parent=parent, url=self.url, size=len(batch)
+        ):
+            try:
+                await self.deliver(
+                    self.url,
+                    batch_callback_body((review_id, body) for review_id, body, _ in batch),
+                    inject_headers(),
+                )
+                return
+            except Exception as exc:
+                logger.warning(
+                    "Spring batch callback failed; sending individually: size=%s, error=%s",
+                    len(batch),
+                    exc,
+                )
+        await self._deliver_each(batch)
+
+    async def stop(self) -> None:
+        await self.flush()
+
+    async def _deliver_each(
+        self, batch: list[tuple[int, dict[str, Any], dict[str, str]]]
+    ) -> None:
+        for review_id, body, headers in batch:
+            url = f"{self.base_url}{CALLBACK_PATH_TEMPLATE.format(review_id=review_id)}"
+            try:
+                await self.deliver(url, body, headers)
+            except Exception as exc:
+                logger.exception(
+                    "Spring callback failed: review_id=%s, error=%s", review_id, exc
+                )
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self.flush()
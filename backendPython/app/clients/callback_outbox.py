@@ -0,0 +1,466 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Optional
+from urllib.parse import urlsplit
+
+from app.clients.callback_batcher import batch_callback_body, batch_callback_url
+from app.clients.spring_callback_client import post_callback
+from app.core.config import settings
+from app.core.error_codes import RecommendationErrorCode
+from app.core.exceptions import CallbackError, ConfigurationError
+from app.core.metrics import ERRORS_TOTAL
+from app.core.tracing import TRACEPARENT_HEADER, inject_headers, parse_traceparent, tracer
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    url: str
+    body: dict[str, Any]
+    headers: dict[str, str]
+    attempts: int
+    review_id: Optional[int] = None
+
+
+class CallbackOutbox:
+    """Spring 콜백 payload를 전송 전에 기록하는 로컬 SQLite 저장소.
+
+    여러 프로세스(uvicorn worker, 추천 worker)가 같은 파일을 열어도 된다. 전송할 payload는
+    `claim`으로 lease를 잡아 가져가므로 한 payload를 두 프로세스가 동시에 보내지 않는다.
+    lease 안에 전송 결과를 기록하지 못하고 프로세스가 죽으면 lease가 지난 뒤 다시 가져간다.
+    """
+
+    PENDING = "PENDING"
+    DEAD = "DEAD"
+
+    def __init__(self, path: str):
+        if not path:
+            raise ConfigurationError("CallbackOutbox requires a database path.")
+        self.path = path
+        self._lock = threading.Lock()
+        # 트랜잭션을 직접 연다. claim은 BEGIN IMMEDIATE로 다른 프로세스의 claim과 겹치지 않는다.
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS callback_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                body TEXT NOT NULL,
+                headers TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                lease_until REAL,
+                review_id INTEGER
+            )
+            """
+        )
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(callback_outbox)")
+        }
+        # 컬럼을 추가하기 전에 만든 outbox 파일도 그대로 이어서 쓴다.
+        for column, column_type in (("lease_until", "REAL"), ("review_id", "INTEGER")):
+            if column not in columns:
+                self._connection.execute(
+                    f"ALTER TABLE callback_outbox ADD COLUMN {column} {column_type}"
+                )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_callback_outbox_due "
+            "ON callback_outbox (status, next_attempt_at)"
+        )
+
+    def add(
+        self,
+        url: str,
+        body: dict[str, Any],
+        headers: Optional[dict[str, str]] = None,
+        now: Optional[float] = None,
+        review_id: Optional[int] = None,
+        next_attempt_at: Optional[float] = None,
+    ) -> int:
+        now = time.time() if now is None else now
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO callback_outbox "
+                "(url, body, headers, status, attempts, next_attempt_at, created_at, review_id) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+                (
+                    url,
+                    json.dumps(body, ensure_ascii=False),
+                    json.dumps(headers or {}),
+                    self.PENDING,
+                    now if next_attempt_at is None else next_attempt_at,
+                    now,
+                    review_id,
+                ),
+            )
+            return cursor.lastrowid
+
+    def due(self, now: float, limit: int = 100) -> list[OutboxEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, url, body, headers, attempts, review_id FROM callback_outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (self.PENDING, now, limit),
+            ).fetchall()
+        return [
+            OutboxEntry(
+                id=row[0],
+                url=row[1],
+                body=json.loads(row[2]),
+                headers=json.loads(row[3]),
+                attempts=row[4],
+                review_id=row[5],
+            )
+            for row in rows
+        ]
+
+    def claim(
+        self,
+        now: float,
+        lease_seconds: float,
+        limit: int = 100,
+        due_before: Optional[float] = None,
+    ) -> list[OutboxEntry]:
+        """`due_before`(기본은 now)까지 예약된 payload 중 lease가 없는 것을 가져간다.
+
+        shutdown drain은 `due_before=inf`로 backoff 대기 중인 payload도 가져간다.
+        다른 프로세스가 lease를 잡고 전송 중인 payload는 건너뛴다.
+        """
+        due_before = now if due_before is None else due_before
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._connection.execute(
+                    "SELECT id, url, body, headers, attempts, review_id FROM callback_outbox "
+                    "WHERE status = ? AND next_attempt_at <= ? "
+                    "AND (lease_until IS NULL OR lease_until < ?) ORDER BY id LIMIT ?",
+                    (self.PENDING, due_before, now, limit),
+                ).fetchall()
+                self._connection.executemany(
+                    "UPDATE callback_outbox SET lease_until = ? WHERE id = ?",
+                    [(now + lease_seconds, row[0]) for row in rows],
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return [
+            OutboxEntry(
+                id=row[0],
+                url=row[1],
+                body=json.loads(row[2]),
+                headers=json.loads(row[3]),
+                attempts=row[4],
+                review_id=row[5],
+            )
+            for row in rows
+        ]
+
+    def next_due_at(self) -> Optional[float]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MIN(next_attempt_at) FROM callback_outbox WHERE status = ?",
+                (self.PENDING,),
+            ).fetchone()
+        return row[0]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM callback_outbox WHERE status = ?",
+                (self.PENDING,),
+            ).fetchone()
+        return row[0]
+
+    def mark_delivered(self, entry_id: int) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM callback_outbox WHERE id = ?", (entry_id,)
+            )
+
+    def mark_retry(
+        self, entry_id: int, attempts: int, next_attempt_at: float, error: str
+    ) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE callback_outbox SET attempts = ?, next_attempt_at = ?, "
+                "last_error = ?, lease_until = NULL WHERE id = ?",
+                (attempts, next_attempt_at, error, entry_id),
+            )
+
+    def mark_dead(self, entry_id: int, attempts: int, error: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE callback_outbox "
+                "SET status = ?, attempts = ?, last_error = ? WHERE id = ?",
+                (self.DEAD, attempts, error, entry_id),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class CallbackDispatcher:
+    """outbox에 쌓인 콜백을 백그라운드에서 재시도하며 전송한다.
+
+    outbox는 worker 프로세스와 같은 SQLite 파일을 `BEGIN IMMEDIATE`로 잠그므로, lock을 기다리는
+    동안 이벤트 루프가 멈추지 않게 outbox 호출은 모두 `asyncio.to_thread`로 보낸다.
+
+    `batch_window_seconds`가 0보다 크면 COMPLETED 결과는 window 경계에 전송을 예약하고,
+    같은 때 전송할 결과를 모아 배치 콜백 한 번으로 보낸다. 결과는 먼저 outbox에 기록되므로
+    배치 전송이 실패해도 항목마다 개별 콜백과 같은 backoff로 다시 시도한다.
+    """
+
+    FETCH_LIMIT = 100
+    IDLE_POLL_SECONDS = 1.0
+
+    def __init__(
+        self,
+        outbox: CallbackOutbox,
+        http_client=None,
+        max_attempts: int = settings.CALLBACK_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.CALLBACK_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = settings.CALLBACK_RETRY_MAX_SECONDS,
+        max_concurrency_per_host: int = settings.CALLBACK_MAX_CONCURRENCY_PER_HOST,
+        drain_timeout_seconds: float = settings.CALLBACK_DRAIN_TIMEOUT_SECONDS,
+        lease_seconds: float = settings.CALLBACK_LEASE_SECONDS,
+        batch_window_seconds: float = settings.CALLBACK_BATCH_WINDOW_MS / 1000,
+        batch_max_size: int = settings.CALLBACK_BATCH_MAX_SIZE,
+        base_url: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        jitter: Callable[[], float] = random.random,
+    ):
+        if outbox is None:
+            raise ConfigurationError("CallbackDispatcher requires a CallbackOutbox.")
+        if http_client is None:
+            raise ConfigurationError("CallbackDispatcher requires an http client.")
+        self.outbox = outbox
+        self.http_client = http_client
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.lease_seconds = lease_seconds
+        self.batch_window_seconds = batch_window_seconds
+        self.batch_max_size = max(1, batch_max_size)
+        self.batch_url = batch_callback_url(base_url)
+        self._clock = clock
+        self._jitter = jitter
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._in_flight: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def enqueue(
+        self,
+        url: str,
+        body: dict[str, Any],
+        headers: Optional[dict[str, str]] = None,
+        review_id: Optional[int] = None,
+    ) -> None:
+        now = self._clock()
+        next_attempt_at = None
+        if self._batchable(body, review_id):
+            # 같은 window에 들어온 결과가 같은 시각에 due가 되도록 window 경계에 맞춘다.
+            next_attempt_at = math.ceil(now / self.batch_window_seconds) * self.batch_window_seconds
+        try:
+            await asyncio.to_thread(
+                self.outbox.add,
+                url,
+                body,
+                headers,
+                now=now,
+                review_id=review_id,
+                next_attempt_at=next_attempt_at,
+            )
+        except sqlite3.Error as exc:
+            raise CallbackError(f"Callback outbox write failed: {exc}") from exc
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self.drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Callback outbox drain timed out: pending=%s",
+                await asyncio.to_thread(self.outbox.pending_count),
+            )
+        for task in list(self._in_flight.values()):
+            task.cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight.values(), return_exceptions=True)
+
+    async def dispatch_due(self, now: Optional[float] = None) -> int:
+        now = self._clock() if now is None else now
+        claimed = await asyncio.to_thread(
+            self.outbox.claim, now, self.lease_seconds, self.FETCH_LIMIT
+        )
+        entries = [entry for entry in claimed if entry.id not in self._in_flight]
+        for entry_ids, delivery in self._deliveries(entries):
+            task = asyncio.create_task(delivery)
+            for entry_id in entry_ids:
+                self._in_flight[entry_id] = task
+            task.add_done_callback(
+                lambda _, entry_ids=entry_ids: [
+                    self._in_flight.pop(entry_id, None) for entry_id in entry_ids
+                ]
+            )
+        return len(entries)
+
+    def _deliveries(
+        self, entries: list[OutboxEntry]
+    ) -> list[tuple[list[int], Coroutine[Any, Any, None]]]:
+        """개별 전송과, COMPLETED 결과를 `batch_max_size`씩 묶은 배치 전송으로 나눈다."""
+        batchable = [entry for entry in entries if self._batchable(entry.body, entry.review_id)]
+        batched_ids = {entry.id for entry in batchable}
+        deliveries = [
+            ([entry.id], self._deliver(entry)) for entry in entries if entry.id not in batched_ids
+        ]
+        for start in range(0, len(batchable), self.batch_max_size):
+            batch = batchable[start : start + self.batch_max_size]
+            deliveries.append(([entry.id for entry in batch], self._deliver_batch(batch)))
+        return deliveries
+
+    def _batchable(self, body: dict[str, Any], review_id: Optional[int]) -> bool:
+        # FAILED 결과는 사용자에게 바로 알려야 하므로 배치로 미루지 않는다.
+        return (
+            self.batch_window_seconds > 0
+            and review_id is not None
+            and body.get("status") == "COMPLETED"
+        )
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.dispatch_due()
+            except Exception as exc:
+                logger.exception("Callback outbox dispatch failed: %s", exc)
+            await self._wait_for_work()
+
+    async def _wait_for_work(self) -> None:
+        timeout = self.IDLE_POLL_SECONDS
+        next_due_at = await asyncio.to_thread(self.outbox.next_due_at)
+        if next_due_at is not None:
+            timeout = min(timeout, max(next_due_at - self._clock(), 0.0))
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _drain(self) -> None:
+        # 종료 시에는 backoff 예약 시각과 관계없이 남은 payload를 한 번씩 더 시도한다.
+        attempted: set[int] = set()
+        while True:
+            if self._in_flight:
+                await asyncio.gather(*self._in_flight.values(), return_exceptions=True)
+            claimed = await asyncio.to_thread(
+                self.outbox.claim,
+                self._clock(),
+                self.lease_seconds,
+                self.FETCH_LIMIT,
+                due_before=float("inf"),
+            )
+            entries = [entry for entry in claimed if entry.id not in attempted]
+            if not entries:
+                return
+            attempted.update(entry.id for entry in entries)
+            await asyncio.gather(*(delivery for _, delivery in self._deliveries(entries)))
+
+    async def _deliver(self, entry: OutboxEntry) -> None:
+        async with self._host_semaphore(entry.url):
+            try:
+                await post_callback(
+                    self.http_client, entry.url, entry.body, entry.headers
+                )
+            except CallbackError as exc:
+                await self._record_failure(entry, str(exc))
+                return
+        await asyncio.to_thread(self.outbox.mark_delivered, entry.id)
+
+    async def _deliver_batch(self, entries: list[OutboxEntry]) -> None:
+        # 배치 요청은 traceparent를 하나만 실을 수 있어 첫 결과의 trace에 batch span을 잇는다.
+        parent = parse_traceparent(entries[0].headers.get(TRACEPARENT_HEADER))
+        body = batch_callback_body((entry.review_id, entry.body) for entry in entries)
+        async with self._host_semaphore(self.batch_url):
+            with tracer.start_span(
+                "spring.callback.batch", parent=parent, url=self.batch_url, size=len(entries)
+            ):
+                try:
+                    await post_callback(self.http_client, self.batch_url, body, inject_headers())
+                except CallbackError as exc:
+                    for entry in entries:
+                        await self._record_failure(entry, str(exc))
+                    return
+        for entry in entries:
+            await asyncio.to_thread(self.outbox.mark_delivered, entry.id)
+
+    async def _record_failure(self, entry: OutboxEntry, error: str) -> None:
+        attempts = entry.attempts + 1
+        if attempts >= self.max_attempts:
+            await asyncio.to_thread(self.outbox.mark_dead, entry.id, attempts, error)
+            ERRORS_TOTAL.labels(RecommendationErrorCode.CALLBACK_FAILED.value).inc()
+            logger.error(
+                "Spring callback abandoned: errorCode=%s, url=%s, attempts=%s, error=%s",
+                RecommendationErrorCode.CALLBACK_FAILED.value,
+                entry.url,
+                attempts,
+                error,
+            )
+            return
+        delay = self._backoff_seconds(attempts)
+        await asyncio.to_thread(
+            self.outbox.mark_retry, entry.id, attempts, self._clock() + delay, error
+        )
+        logger.warning(
+            "Spring callback retry scheduled: url=%s, attempts=%s, delay=%.2fs, error=%s",
+            entry.url,
+            attempts,
+            delay,
+            error,
+        )
+
+    def _backoff_seconds(self, attempts: int) -> float:
+        # equal jitter: 지수 backoff 상한의 절반은 보장하고 나머지 절반만 무작위로 분산한다.
+        ceiling = min(
+            self.retry_max_seconds, self.retry_base_seconds * (2 ** (attempts - 1))
+        )
+        return ceiling / 2 + self._jitter() * ceiling / 2
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
@@ -1,32 +1,75 @@
-from typing import Iterable, Optional
+import gzip
+import json
+from typing import Any, Iterable, Optional
 
+from app.clients.callback_batcher import CALLBACK_PATH_TEMPLATE
 from app.core.config import settings
 from app.core.error_codes import RecommendationErrorCode
 from app.core.exceptions import CallbackError, ConfigurationError
+from app.core.tracing import inject_headers, tracer
 from app.schemas.recommendation import (
     RecommendationCallbackItem,
     RecommendationCallbackRequest,
 )
 
 
+def encode_callback_body(
+    body: dict[str, Any], gzip_min_bytes: int = settings.CALLBACK_GZIP_MIN_BYTES
+) -> tuple[bytes, dict[str, str]]:
+    content = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    # 추천 사유가 긴 payload만 압축한다. 0이면 Spring 쪽 압축 해제 설정이 없다고 보고 끈다.
+    if gzip_min_bytes > 0 and len(content) >= gzip_min_bytes:
+        content = gzip.compress(content, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return content, headers
+
+
+async def post_callback(
+    http_client, url: str, body: dict[str, Any], headers: Optional[dict[str, str]] = None
+) -> None:
+    content, request_headers = encode_callback_body(body)
+    request_headers.update(headers or {})
+    try:
+        response = await http_client.post(url, content=content, headers=request_headers)
+        if not 200 <= response.status_code < 300:
+            raise CallbackError(
+                f"Spring callback failed: status={response.status_code}, body={response.text}"
+            )
+    except CallbackError:
+        raise
+    except Exception as exc:
+        raise CallbackError(str(exc)) from exc
+
+
 class SpringCallbackClient:
 
-    CALLBACK_PATH_TEMPLATE = "/api/user-reviews/{review_id}/recommendations"
+    CALLBACK_PATH_TEMPLATE = CALLBACK_PATH_TEMPLATE
 
     def __init__(
         self,
         base_url: Optional[str] = None,
         http_client=None,
+        callback_dispatcher=None,
+        callback_batcher=None,
     ):
         if http_client is None:
             raise ConfigurationError("SpringCallbackClient requires an http client.")
         self.base_url = (base_url or settings.SPRING_BASE_URL).rstrip("/")
         self.http_client = http_client
+        self.callback_dispatcher = callback_dispatcher
+        self.callback_batcher = callback_batcher
 
     async def send_completed_result(
         self, review_id: int, recommendations: Iterable[RecommendationCallbackItem]
     ) -> None:
-        await self._post_callback(review_id, RecommendationCallbackRequest.completed(recommendations))
+        payload = RecommendationCallbackRequest.completed(recommendations)
+        if self.callback_batcher is not None:
+            await self.callback_batcher.add(
+                review_id, payload.model_dump(by_alias=True, mode="json"), inject_headers()
+            )
+            return
+        await self._post_callback(review_id, payload)
 
     async def send_failed_result(
         self, review_id: int, error_code: RecommendationErrorCode, message: str
@@ -38,14 +81,17 @@ class SpringCallbackClient:
     ) -> None:
 
         url = f"{self.base_url}{self.CALLBACK_PATH_TEMPLATE.format(review_id=review_id)}"
+        await self.deliver(url, payload.model_dump(by_alias=True, mode="json"), review_id)
 
-        try:
-            response = await self.http_client.post(url, json=payload.model_dump(by_alias=True, mode="json"))
-            if not 200 <= response.status_code < 300:
-                raise CallbackError(
-                    f"Spring callback failed: status={response.status_code}, body={response.text}"
-                )
-        except CallbackError:
-            raise
-        except Exception as exc:
-            raise CallbackError(str(exc)) from exc
+    async def deliver(
+        self, url: str, body: dict[str, Any], review_id: Optional[int] = None
+    ) -> None:
+        with tracer.start_span("spring.callback", url=url):
+            # outbox에 headers도 함께 남겨 재시도 전송도 같은 trace에 이어진다.
+            headers = inject_headers()
+            # outbox가 설정되어 있으면 기록까지만 동기로 수행하고 전송은 dispatcher가 재시도한다.
+            # review_id를 함께 남겨 dispatcher가 COMPLETED 결과를 배치 콜백으로 묶을 수 있다.
+            if self.callback_dispatcher is not None:
+                await self.callback_dispatcher.enqueue(url, body, headers, review_id=review_id)
+                return
+            await post_callback(self.http_client, url, body, headers)
@@ -13,6 +13,108 @@ class Settings:
     SPRING_BASE_URL = os.getenv("SPRING_BASE_URL")
     OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS"))
     OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    VECTOR_INDEX_PAGE_SIZE = int(os.getenv("VECTOR_INDEX_PAGE_SIZE", "1000"))
+    VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "900"))
+    VECTOR_INDEX_RETRY_BASE_SECONDS = float(
+        os.getenv("VECTOR_INDEX_RETRY_BASE_SECONDS", "5")
+    )
+    VECTOR_INDEX_RETRY_MAX_SECONDS = float(
+        os.getenv("VECTOR_INDEX_RETRY_MAX_SECONDS", "300")
+    )
+    HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+    HYBRID_FETCH_MULTIPLIER = int(os.getenv("HYBRID_FETCH_MULTIPLIER", "3"))
+    RECOMMENDATION_PAGE_SIZE = int(os.getenv("RECOMMENDATION_PAGE_SIZE", "3"))
+    RECOMMENDATION_MAX_PAGES = int(os.getenv("RECOMMENDATION_MAX_PAGES", "4"))
+    CANDIDATE_PAGE_STORE_PATH = os.getenv("CANDIDATE_PAGE_STORE_PATH", "candidate_pages.sqlite3")
+    CANDIDATE_PAGE_CACHE_SIZE = int(os.getenv("CANDIDATE_PAGE_CACHE_SIZE", "10000"))
+    CANDIDATE_PAGE_TTL_SECONDS = float(os.getenv("CANDIDATE_PAGE_TTL_SECONDS", "86400"))
+    CANDIDATE_FETCH_MULTIPLIER = int(os.getenv("CANDIDATE_FETCH_MULTIPLIER", "3"))
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+    MAX_ALBUMS_PER_ARTIST = int(os.getenv("MAX_ALBUMS_PER_ARTIST", "1"))
+    EXCLUSION_RECENT_REVIEWS = int(os.getenv("EXCLUSION_RECENT_REVIEWS", "50"))
+    USER_TASTE_STORE_PATH = os.getenv("USER_TASTE_STORE_PATH", "user_taste.sqlite3")
+    USER_TASTE_DECAY = float(os.getenv("USER_TASTE_DECAY", "0.8"))
+    USER_TASTE_BLEND_WEIGHT = float(os.getenv("USER_TASTE_BLEND_WEIGHT", "0.25"))
+    ALBUM_KNN_GRAPH_PATH = os.getenv("ALBUM_KNN_GRAPH_PATH", "album_knn.npz")
+    ALBUM_KNN_NEIGHBORS = int(os.getenv("ALBUM_KNN_NEIGHBORS", "20"))
+    ALBUM_KNN_RELOAD_INTERVAL_SECONDS = float(
+        os.getenv("ALBUM_KNN_RELOAD_INTERVAL_SECONDS", "60")
+    )
+    ALBUM_CATEGORY_INDEX_PATH = os.getenv("ALBUM_CATEGORY_INDEX_PATH", "album_categories.npz")
+    CANDIDATE_RERANKER_PATH = os.getenv("CANDIDATE_RERANKER_PATH", "candidate_reranker.json")
+    RECOMMENDATION_QUEUE_PATH = os.getenv("RECOMMENDATION_QUEUE_PATH", "")
+    RECOMMENDATION_QUEUE_LEASE_SECONDS = float(
+        os.getenv("RECOMMENDATION_QUEUE_LEASE_SECONDS", "300")
+    )
+    RECOMMENDATION_QUEUE_MAX_ATTEMPTS = int(
+        os.getenv("RECOMMENDATION_QUEUE_MAX_ATTEMPTS", "3")
+    )
+    RECOMMENDATION_WORKER_CONCURRENCY = int(
+        os.getenv("RECOMMENDATION_WORKER_CONCURRENCY", "16")
+    )
+    RECOMMENDATION_WORKER_METRICS_PORT = int(
+        os.getenv("RECOMMENDATION_WORKER_METRICS_PORT", "9101")
+    )
+    RECOMMENDATION_WORKER_POLL_SECONDS = float(
+        os.getenv("RECOMMENDATION_WORKER_POLL_SECONDS", "0.2")
+    )
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+    BULK_REASON_CONCURRENCY = int(os.getenv("BULK_REASON_CONCURRENCY", "32"))
+    BULK_JOB_RETENTION = int(os.getenv("BULK_JOB_RETENTION", "100"))
+    ECONOMY_BATCH_STORE_PATH = os.getenv(
+        "ECONOMY_BATCH_STORE_PATH", "economy_batches.sqlite3"
+    )
+    ECONOMY_BATCH_INTERVAL_SECONDS = float(
+        os.getenv("ECONOMY_BATCH_INTERVAL_SECONDS", "300")
+    )
+    ECONOMY_BATCH_MAX_REQUESTS = int(os.getenv("ECONOMY_BATCH_MAX_REQUESTS", "50000"))
+    ECONOMY_BATCH_MAX_FAILURES = int(os.getenv("ECONOMY_BATCH_MAX_FAILURES", "5"))
+    ECONOMY_BATCH_MAX_ATTEMPTS = int(os.getenv("ECONOMY_BATCH_MAX_ATTEMPTS", "3"))
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+    REASON_CACHE_SIZE = int(os.getenv("REASON_CACHE_SIZE", "4096"))
+    RECOMMENDATION_RESULT_CACHE_SIZE = int(
+        os.getenv("RECOMMENDATION_RESULT_CACHE_SIZE", "1024")
+    )
+    REASON_PROMPT_TOKEN_BUDGET = int(os.getenv("REASON_PROMPT_TOKEN_BUDGET", "1200"))
+    REASON_REVIEW_TOKEN_BUDGET = int(os.getenv("REASON_REVIEW_TOKEN_BUDGET", "400"))
+    REASON_SUMMARY_TOKEN_BUDGET = int(os.getenv("REASON_SUMMARY_TOKEN_BUDGET", "150"))
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    SPRING_HTTP2 = os.getenv("SPRING_HTTP2", "true").lower() == "true"
+    SPRING_TIMEOUT_SECONDS = float(os.getenv("SPRING_TIMEOUT_SECONDS", "10"))
+    SPRING_CONNECT_TIMEOUT_SECONDS = float(
+        os.getenv("SPRING_CONNECT_TIMEOUT_SECONDS", "3")
+    )
+    SPRING_MAX_CONNECTIONS = int(os.getenv("SPRING_MAX_CONNECTIONS", "100"))
+    SPRING_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.getenv("SPRING_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    SPRING_KEEPALIVE_EXPIRY_SECONDS = float(
+        os.getenv("SPRING_KEEPALIVE_EXPIRY_SECONDS", "30")
+    )
+    CALLBACK_GZIP_MIN_BYTES = int(os.getenv("CALLBACK_GZIP_MIN_BYTES", "0"))
+    CALLBACK_BATCH_WINDOW_MS = int(os.getenv("CALLBACK_BATCH_WINDOW_MS", "0"))
+    CALLBACK_BATCH_MAX_SIZE = int(os.getenv("CALLBACK_BATCH_MAX_SIZE", "50"))
+    CALLBACK_OUTBOX_PATH = os.getenv("CALLBACK_OUTBOX_PATH", "callback_outbox.sqlite3")
+    CALLBACK_MAX_ATTEMPTS = int(os.getenv("CALLBACK_MAX_ATTEMPTS", "8"))
+    CALLBACK_RETRY_BASE_SECONDS = float(os.getenv("CALLBACK_RETRY_BASE_SECONDS", "1"))
+    CALLBACK_RETRY_MAX_SECONDS = float(os.getenv("CALLBACK_RETRY_MAX_SECONDS", "60"))
+    CALLBACK_MAX_CONCURRENCY_PER_HOST = int(
+        os.getenv("CALLBACK_MAX_CONCURRENCY_PER_HOST", "4")
+    )
+    CALLBACK_DRAIN_TIMEOUT_SECONDS = float(
+        os.getenv("CALLBACK_DRAIN_TIMEOUT_SECONDS", "10")
+    )
+    # 전송 한 번(SPRING_TIMEOUT_SECONDS)보다 길어야 다른 프로세스가 같은 payload를 가져가지 않는다.
+    CALLBACK_LEASE_SECONDS = float(os.getenv("CALLBACK_LEASE_SECONDS", "60"))
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "").lower()
+    TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+    TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "traces.jsonl")
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318")
+    DEBUG_PROFILER_TOKEN = os.getenv("DEBUG_PROFILER_TOKEN")
+    DEBUG_PROFILER_MAX_SECONDS = float(os.getenv("DEBUG_PROFILER_MAX_SECONDS", "60"))
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
 
 
 settings = Settings()
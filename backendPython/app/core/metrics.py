@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# OpenAI 호출은 수 초까지 걸리므로 일반 HTTP 기본 bucket보다 상한을 넓게 둔다.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Timer:
+    def __init__(self, histogram: "_HistogramChild"):
+        self._histogram = histogram
+        self._started_at = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._started_at)
+
+
+class _ValueChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """scrape 시점에 값을 읽어 오는 함수. 큐 길이처럼 이미 다른 곳에 있는 값에 쓴다."""
+        self.function = function
+
+    def read(self) -> float:
+        if self.function is None:
+            return self.value
+        return float(self.function())
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # 누적 합산은 render 때 한 번만 하고, 관측 시에는 bucket 하나만 올린다.
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *labelvalues: Any):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {labelvalues}."
+            )
+        key = tuple(str(value) for value in labelvalues)
+        child = self._children.get(key)
+        if child is None:
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _render_samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        lines.extend(self._render_samples())
+        return lines
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def _new_child(self) -> _ValueChild:
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _render_samples(self) -> Iterator[str]:
+        for labelvalues, child in list(self._children.items()):
+            try:
+                value = child.read()
+            except Exception as exc:
+                logger.warning("Metric collection failed: %s, %s", self.name, exc)
+                continue
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    TYPE = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_samples(self) -> Iterator[str]:
+        bucket_labelnames = self.labelnames + ("le",)
+        for labelvalues, child in list(self._children.items()):
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                labels = _format_labels(
+                    bucket_labelnames, labelvalues + (_format_value(upper_bound),)
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class MetricsRegistry:
+    """프로세스 단위 metric 모음. 이벤트 루프 안에서만 갱신하므로 lock을 두지 않는다."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = MetricsRegistry()
+
+
+STAGE_SECONDS = registry.histogram(
+    "recommendation_stage_seconds",
+    "Latency of each recommendation pipeline stage.",
+    ("stage",),
+)
+RECOMMENDATIONS_TOTAL = registry.counter(
+    "recommendation_results_total",
+    "Recommendation results sent to Spring by status.",
+    ("status",),
+)
+ERRORS_TOTAL = registry.counter(
+    "recommendation_errors_total",
+    "Recommendation failures by RecommendationErrorCode.",
+    ("error_code",),
+)
+REASON_FALLBACKS_TOTAL = registry.counter(
+    "recommendation_reason_fallbacks_total",
+    "Recommendation reasons replaced with the rule-based fallback.",
+)
+OPENAI_TOKENS_TOTAL = registry.counter(
+    "openai_tokens_total",
+    "OpenAI tokens reported in API usage.",
+    ("model", "type"),
+)
+CACHE_HITS_TOTAL = registry.counter(
+    "recommendation_cache_hits_total",
+    "App-scoped cache hits.",
+    ("cache",),
+)
+CACHE_MISSES_TOTAL = registry.counter(
+    "recommendation_cache_misses_total",
+    "App-scoped cache misses.",
+    ("cache",),
+)
+QUEUE_DEPTH = registry.gauge(
+    "recommendation_queue_depth",
+    "Items waiting in background queues.",
+    ("queue",),
+)
+
+
+def record_token_usage(model: Optional[str], usage: Any) -> None:
+    """OpenAI 응답의 usage를 model별 prompt/completion token counter에 더한다.
+
+    Batch API 결과 파일의 usage는 SDK 객체가 아니라 dict로 들어온다.
+    """
+    if usage is None:
+        return
+    if isinstance(usage, dict):
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+    else:
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+    model = model or ""
+    if prompt_tokens:
+        OPENAI_TOKENS_TOTAL.labels(model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        OPENAI_TOKENS_TOTAL.labels(model, "completion").inc(completion_tokens)
+
+
+async def start_metrics_server(
+    host: str, port: int, metrics_registry: Optional[MetricsRegistry] = None
+) -> asyncio.AbstractServer:
+    """HTTP 서버가 없는 worker 프로세스용 `/metrics` listener. `GET /metrics`만 응답한다."""
+    metrics_registry = metrics_registry or registry
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()).strip():
+                pass
+            if request_line[:2] == ["GET", "/metrics"]:
+                status, body = "200 OK", metrics_registry.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b""
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {PROMETHEUS_CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            logger.debug("Metrics request failed: %s", exc)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Iterable, Optional
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _collapse(frames: Iterable[FrameType], root: str) -> str:
+    # flamegraph collapsed 형식은 바깥 frame부터 ';'로 잇는다.
+    return ";".join([root, *(_frame_label(frame) for frame in frames)])
+
+
+def _outer_to_inner(frame: Optional[FrameType]) -> list[FrameType]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class SamplingProfiler:
+    """일정 간격으로 stack을 표본 추출해 collapsed stack 횟수로 모은다.
+
+    - `cpu`: 별도 thread에서 `sys._current_frames()`로 event loop thread와 worker thread의
+      실행 중인 stack을 읽는다. 대기 중인 coroutine은 보이지 않는다.
+    - `async`: event loop 위에서 주기적으로 돌며 모든 asyncio task가 어디서 await 중인지 읽는다.
+    """
+
+    def __init__(self, interval_seconds: float = 0.005):
+        self.interval_seconds = interval_seconds
+        self.samples: Counter[str] = Counter()
+
+    def sample_threads(self, exclude_thread_ids: Iterable[int] = ()) -> None:
+        excluded = set(exclude_thread_ids)
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in excluded:
+                continue
+            root = names.get(thread_id, f"thread-{thread_id}")
+            self.samples[_collapse(_outer_to_inner(frame), root)] += 1
+
+    def sample_tasks(self, loop: asyncio.AbstractEventLoop) -> None:
+        current = asyncio.current_task(loop)
+        for task in asyncio.all_tasks(loop):
+            if task is current:
+                continue
+            # get_stack()은 suspend된 coroutine의 바깥 frame부터 돌려준다.
+            frames = task.get_stack()
+            if frames:
+                self.samples[_collapse(frames, f"task:{task.get_name()}")] += 1
+
+    def profile_threads(self, duration_seconds: float) -> None:
+        """호출한 thread를 제외한 모든 thread를 duration 동안 표본 추출한다. blocking 함수다."""
+        own_thread_id = threading.get_ident()
+        deadline = time.monotonic() + duration_seconds
+        while time.monotonic() < deadline:
+            self.sample_threads(exclude_thread_ids=(own_thread_id,))
+            time.sleep(self.interval_seconds)
+
+    async def profile_tasks(self, duration_seconds: float) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration_seconds
+        while loop.time() < deadline:
+            self.sample_tasks(loop)
+            await asyncio.sleep(self.interval_seconds)
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT_PATTERN = re.compile(
+    r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str]
+    start_time_ns: int
+    end_time_ns: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.context.sampled:
+            self.attributes[key] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_time_ns,
+            "endTimeUnixNano": self.end_time_ns,
+            "durationMs": round((self.end_time_ns - self.start_time_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """W3C traceparent 헤더를 읽는다. 형식이 틀리면 새 trace로 시작하도록 None을 돌려준다."""
+    if not value:
+        return None
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return SpanContext(trace_id, span_id, sampled=bool(int(flags, 16) & 0x01))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    flags = "01" if context.sampled else "00"
+    return f"00-{context.trace_id}-{context.span_id}-{flags}"
+
+
+def current_span_context() -> Optional[SpanContext]:
+    span = _current_span.get()
+    return None if span is None else span.context
+
+
+def inject_headers(headers: Optional[dict[str, str]] = None) -> dict[str, str]:
+    """현재 span을 부모로 하는 traceparent 헤더를 덧붙인다."""
+    headers = dict(headers or {})
+    context = current_span_context()
+    if context is not None:
+        headers[TRACEPARENT_HEADER] = format_traceparent(context)
+    return headers
+
+
+class JsonlSpanExporter:
+    """종료된 span을 한 줄에 하나씩 JSON으로 기록한다. buffer가 차거나 close할 때 쓴다."""
+
+    def __init__(self, path: str, buffer_size: int = 64):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span.to_dict())
+            if len(self._buffer) < self.buffer_size:
+                return
+            spans, self._buffer = self._buffer, []
+        self._write(spans)
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if spans:
+            self._write(spans)
+
+    async def aclose(self) -> None:
+        self.flush()
+
+    def _write(self, spans: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, ensure_ascii=False) + "\n" for span in spans)
+        try:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(lines)
+        except OSError as exc:
+            logger.warning("Trace export failed: path=%s, %s", self.path, exc)
+
+
+class OtlpHttpSpanExporter:
+    """OTLP/HTTP JSON 형식으로 로컬 collector(`/v1/traces`)에 span을 보낸다."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        http_client,
+        service_name: str = "jazzmate-recommendation",
+        buffer_size: int = 64,
+    ):
+        self.url = f"{endpoint.rstrip('/')}/v1/traces"
+        self.http_client = http_client
+        self.service_name = service_name
+        self.buffer_size = buffer_size
+        self._buffer: list[Span] = []
+        self._pending: set = set()
+
+    def export(self, span: Span) -> None:
+        self._buffer.append(span)
+        if len(self._buffer) >= self.buffer_size:
+            self._schedule_flush()
+
+    async def flush(self) -> None:
+        spans, self._buffer = self._buffer, []
+        if not spans:
+            return
+        try:
+            response = await self.http_client.post(self.url, json=self.build_payload(spans))
+            if response.status_code >= 300:
+                logger.warning("Trace export rejected: status=%s", response.status_code)
+        except Exception as exc:
+            logger.warning("Trace export failed: url=%s, %s", self.url, exc)
+
+    async def aclose(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.flush()
+        await self.http_client.aclose()
+
+    def build_payload(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_otlp_attribute("service.name", self.service_name)]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def _schedule_flush(self) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    payload = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_time_ns),
+        "endTimeUnixNano": str(span.end_time_ns),
+        "attributes": [
+            _otlp_attribute(key, value) for key, value in span.attributes.items()
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_span_id:
+        payload["parentSpanId"] = span.parent_span_id
+    return payload
+
+
+class Tracer:
+    """요청 단위 span을 만들고 sampling된 trace만 exporter로 넘긴다.
+
+    exporter가 없으면 span 객체를 만들지 않고 바로 빠져나가므로 꺼 둔 상태의 비용은 무시할 만하다.
+    """
+
+    def __init__(
+        self,
+        exporter=None,
+        sample_rate: float = 1.0,
+        random_source: Callable[[], float] = random.random,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._random = random_source
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter=None, sample_rate: float = 1.0) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def start_span(
+        self, name: str, parent: Optional[SpanContext] = None, **attributes: Any
+    ) -> Iterator[Optional[Span]]:
+        if self.exporter is None:
+            yield None
+            return
+
+        current = _current_span.get()
+        if parent is None and current is not None:
+            parent = current.context
+        if parent is None:
+            context = SpanContext(
+                trace_id=os.urandom(16).hex(),
+                span_id=os.urandom(8).hex(),
+                sampled=self._random() < self.sample_rate,
+            )
+        else:
+            # 상위(Spring 포함)의 sampling 결정을 따라야 trace가 중간에 끊기지 않는다.
+            context = SpanContext(parent.trace_id, os.urandom(8).hex(), parent.sampled)
+
+        span = Span(
+            name=name,
+            context=context,
+            parent_span_id=None if parent is None else parent.span_id,
+            start_time_ns=time.time_ns(),
+            attributes=attributes if context.sampled else {},
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            _current_span.reset(token)
+            if context.sampled:
+                span.end_time_ns = time.time_ns()
+                self.exporter.export(span)
+
+    def bind(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        name: str,
+        parent: Optional[SpanContext] = None,
+    ) -> Callable[..., Awaitable[Any]]:
+        """BackgroundTasks처럼 요청 context 밖에서 실행될 coroutine 함수에 부모 span을 묶는다."""
+        if self.exporter is None:
+            return func
+        parent = parent or current_span_context()
+
+        @wraps(func)
+        async def traced(*args, **kwargs):
+            with self.start_span(name, parent=parent):
+                return await func(*args, **kwargs)
+
+        return traced
+
+
+tracer = Tracer()
@@ -0,0 +1,134 @@
+"""평론 카테고리별 벡터로 앨범 multi-vector 인덱스를 만들어 파일로 저장하는 오프라인 작업.
+
+    cd backendPython
+    python -m app.jobs.album_category_job
+
+GPT 요약 단계가 평론을 나눈 카테고리(instrumentation, performance_note, vocal_style 등)마다
+한 앨범의 평론 본문을 모아 한 번씩 임베딩하고, int8로 양자화해 저장한다. 카테고리 본문은
+view row의 `categories` 열(processed_summary의 categories JSON)에서 읽는다.
+
+FastAPI 서버는 기동 시 `ALBUM_CATEGORY_INDEX_PATH`를 읽어 검색 fusion에 쓴다.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.repositories.album_category_index import AlbumCategoryIndex
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.services.embedding_service import EmbeddingService
+from app.services.prompt_budget import truncate_to_tokens
+
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_NAMES = (
+    "instrumentation",
+    "performance_note",
+    "vocal_style",
+    "composition_influence",
+    "cultural_context",
+    "reviewer_opinion",
+)
+# 평론이 많은 앨범도 Embeddings API 입력 한도(8191 token) 안에 들도록 자른다.
+MAX_CATEGORY_TOKENS = 2000
+
+
+def category_text(value: Any) -> str:
+    # GPT 요약은 카테고리마다 {"english": ..., "korean": ...}다. 감상문이 한국어라 korean을 쓴다.
+    if isinstance(value, dict):
+        return str(value.get("korean") or value.get("english") or "")
+    return str(value or "")
+
+
+def collect_category_texts(
+    rows: Iterable[dict[str, Any]], categories: Sequence[str] = CATEGORY_NAMES
+) -> dict[tuple[str, str], str]:
+    """(앨범 id, 카테고리)마다 그 앨범 평론들의 카테고리 본문을 잇는다."""
+    parts: dict[tuple[str, str], list[str]] = {}
+    for row in rows:
+        raw = row.get("categories")
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                continue
+        if not isinstance(raw, dict):
+            continue
+        album_id = str(row.get("album_id", ""))
+        for name in categories:
+            text = category_text(raw.get(name)).strip()
+            if text:
+                parts.setdefault((album_id, name), []).append(text)
+    return {
+        key: truncate_to_tokens("\n".join(texts), MAX_CATEGORY_TOKENS)
+        for key, texts in parts.items()
+    }
+
+
+async def build_index(
+    repository: AlbumEmbeddingRepository,
+    embedding_service: EmbeddingService,
+    categories: Sequence[str] = CATEGORY_NAMES,
+) -> Optional[AlbumCategoryIndex]:
+    texts = collect_category_texts(await repository.fetch_view_rows(), categories)
+    if not texts:
+        return None
+    keys = list(texts)
+    embeddings = await embedding_service.embed_reviews([texts[key] for key in keys])
+    album_ids = list(dict.fromkeys(album_id for album_id, _ in keys))
+    numbers = {album_id: number for number, album_id in enumerate(album_ids)}
+    return AlbumCategoryIndex.build(
+        album_ids,
+        list(categories),
+        [numbers[album_id] for album_id, _ in keys],
+        [categories.index(name) for _, name in keys],
+        np.asarray(embeddings, dtype=np.float32),
+    )
+
+
+def save_atomically(index: AlbumCategoryIndex, path: str) -> None:
+    # 서버가 읽는 도중 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체한다.
+    temporary_path = f"{path}.tmp"
+    index.save(temporary_path)
+    os.replace(temporary_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=settings.ALBUM_CATEGORY_INDEX_PATH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    from app.main import create_database_client, create_openai_embedding_client
+
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    started = time.perf_counter()
+    repository = AlbumEmbeddingRepository(database=create_database_client())
+    embedding_service = EmbeddingService(openai_client=create_openai_embedding_client())
+    index = asyncio.run(build_index(repository, embedding_service))
+    if index is None:
+        logger.warning("No category summaries found in %s; nothing saved.", repository.VIEW_NAME)
+        return
+    save_atomically(index, args.output)
+    logger.info(
+        "Album category index saved: path=%s, albums=%s, vectors=%s, %.1fMB, %.1fs",
+        args.output,
+        len(index),
+        len(index.vectors),
+        index.vectors.nbytes / 1e6,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
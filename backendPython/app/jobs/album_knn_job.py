@@ -0,0 +1,80 @@
+"""앨범 kNN 그래프를 만들어 파일로 저장하는 오프라인 작업.
+
+    cd backendPython
+    python -m app.jobs.album_knn_job                 # 기존 파일이 있으면 새 앨범만 갱신
+    python -m app.jobs.album_knn_job --full          # 전체 재계산 (삭제된 앨범 반영)
+
+FastAPI 서버는 기동 시 `ALBUM_KNN_GRAPH_PATH`를 읽어 메모리에서 조회한다.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_knn_graph import AlbumKnnGraph, album_matrix
+
+
+logger = logging.getLogger(__name__)
+
+
+async def build_graph(
+    repository: AlbumEmbeddingRepository,
+    previous: Optional[AlbumKnnGraph],
+    neighbors: int,
+    block_size: int,
+) -> AlbumKnnGraph:
+    index = await repository.load_vector_index()
+    album_ids, matrix = album_matrix(index)
+    if previous is None:
+        return AlbumKnnGraph.build(album_ids, matrix, neighbors, block_size)
+    return previous.refreshed(album_ids, matrix, changed_album_ids=(), block_size=block_size)
+
+
+def save_atomically(graph: AlbumKnnGraph, path: str) -> None:
+    # 서버가 읽는 도중 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체한다.
+    temporary_path = f"{path}.tmp"
+    graph.save(temporary_path)
+    os.replace(temporary_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=settings.ALBUM_KNN_GRAPH_PATH)
+    parser.add_argument("--neighbors", type=int, default=settings.ALBUM_KNN_NEIGHBORS)
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--full", action="store_true", help="기존 그래프를 무시하고 다시 만든다.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    from app.main import create_database_client
+
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    previous = None
+    if not args.full and os.path.exists(args.output):
+        previous = AlbumKnnGraph.load(args.output)
+        if previous.k != args.neighbors:
+            previous = None
+
+    started = time.perf_counter()
+    repository = AlbumEmbeddingRepository(database=create_database_client())
+    graph = asyncio.run(build_graph(repository, previous, args.neighbors, args.block_size))
+    save_atomically(graph, args.output)
+    logger.info(
+        "Album kNN graph saved: path=%s, albums=%s, k=%s, incremental=%s, %.1fs",
+        args.output,
+        len(graph),
+        graph.k,
+        previous is not None,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
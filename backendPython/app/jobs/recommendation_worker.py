@@ -0,0 +1,104 @@
+"""추천 요청 큐를 처리하는 worker 프로세스.
+
+    cd backendPython
+    export RECOMMENDATION_QUEUE_PATH=recommendation_jobs.sqlite3
+    uvicorn app.main:app                                         # 검증 후 큐에 넣고 202만 반환
+    python -m app.jobs.recommendation_worker --worker-id worker-1 --metrics-port 9101
+    python -m app.jobs.recommendation_worker --worker-id worker-2 --metrics-port 9102
+
+worker는 FastAPI와 같은 lifespan으로 client/캐시/인덱스를 만들고 RecommendationService를 실행한다.
+콜백 outbox는 front end와 같은 파일을 claim/lease로 나눠 쓴다. economy batch 저장소는
+프로세스끼리 나눠 쓰지 않도록 worker id를 붙인 파일을 쓴다.
+metric은 프로세스마다 따로 쌓이므로 worker마다 `--metrics-port`로 `/metrics`를 연다.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError
+from app.core.metrics import start_metrics_server
+from app.services.recommendation_queue import RecommendationWorker
+
+
+logger = logging.getLogger(__name__)
+
+
+def use_worker_local_stores(worker_id: str) -> None:
+    # 두 프로세스가 같은 batch 파일을 읽으면 같은 batch를 중복으로 제출한다.
+    for name in ("ECONOMY_BATCH_STORE_PATH",):
+        path = getattr(settings, name)
+        if path and path != ":memory:":
+            setattr(settings, name, f"{path}.{worker_id}")
+
+
+async def run_worker(worker_id: str, concurrency: int, metrics_port: int = 0) -> None:
+    from fastapi import FastAPI
+
+    from app.main import lifespan
+
+    holder = FastAPI()
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stopping.set)
+
+    async with lifespan(holder):
+        queue = holder.state.recommendation_queue
+        if queue is None:
+            raise ConfigurationError("RECOMMENDATION_QUEUE_PATH must be configured.")
+        worker = RecommendationWorker(
+            queue,
+            holder.state.services.recommendation_service,
+            worker_id=worker_id,
+            concurrency=concurrency,
+        )
+        metrics_server = None
+        if settings.METRICS_ENABLED and metrics_port > 0:
+            metrics_server = await start_metrics_server("0.0.0.0", metrics_port)
+        await worker.start()
+        logger.info(
+            "Recommendation worker started: id=%s, concurrency=%s, metrics_port=%s",
+            worker_id,
+            concurrency,
+            metrics_port if metrics_server is not None else None,
+        )
+        try:
+            await stopping.wait()
+        finally:
+            await worker.stop()
+            if metrics_server is not None:
+                metrics_server.close()
+                await metrics_server.wait_closed()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--worker-id",
+        required=True,
+        help="재시작해도 같은 값을 써야 남은 economy batch를 이어서 수집한다.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.RECOMMENDATION_WORKER_CONCURRENCY
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.RECOMMENDATION_WORKER_METRICS_PORT,
+        help="worker의 /metrics 포트. 한 호스트의 worker마다 달라야 하며 0이면 열지 않는다.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    use_worker_local_stores(args.worker_id)
+    asyncio.run(run_worker(args.worker_id, args.concurrency, args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
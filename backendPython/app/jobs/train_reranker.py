@@ -0,0 +1,104 @@
+"""클릭/채택 로그로 후보 reranker를 학습해 파일로 저장하는 오프라인 작업.
+
+    cd backendPython
+    python -m app.jobs.train_reranker --examples reranker_examples.jsonl
+
+학습 예제는 JSONL 한 줄에 감상문 하나다. 후보는 추천에 노출된 앨범이고, 사용자가
+클릭했거나 채택한 앨범의 label이 1이다.
+
+    {"review_content": "...", "candidates": [
+        {"similarity": 0.82, "review_summary": "...", "review_content": "...",
+         "rating": 4.5, "published_date": "2019-03-01", "label": 1}, ...]}
+
+FastAPI 서버는 기동 시 `CANDIDATE_RERANKER_PATH`를 읽는다.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Iterable
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.recommendation import AlbumCandidate
+from app.services.candidate_reranker import (
+    FEATURE_NAMES,
+    LinearReranker,
+    candidate_features,
+    fit_linear_reranker,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_examples(lines: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """감상문별 노출 후보를 feature 행렬과 label로 펼친다. 서빙과 같은 feature 함수를 쓴다."""
+    feature_blocks = []
+    labels: list[float] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        example = json.loads(line)
+        rows = example.get("candidates") or []
+        if not rows:
+            continue
+        candidates = [AlbumCandidate.from_row(row) for row in rows]
+        feature_blocks.append(candidate_features(example.get("review_content", ""), candidates))
+        labels.extend(float(bool(row.get("label"))) for row in rows)
+    if not feature_blocks:
+        return np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.float32)
+    return np.vstack(feature_blocks), np.asarray(labels, dtype=np.float32)
+
+
+def log_loss(reranker: LinearReranker, features: np.ndarray, labels: np.ndarray) -> float:
+    probabilities = np.clip(reranker.score(features), 1e-7, 1 - 1e-7)
+    return float(
+        -np.mean(labels * np.log(probabilities) + (1 - labels) * np.log(1 - probabilities))
+    )
+
+
+def save_atomically(reranker: LinearReranker, path: str) -> None:
+    # 서버가 읽는 도중 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체한다.
+    temporary_path = f"{path}.tmp"
+    reranker.save(temporary_path)
+    os.replace(temporary_path, path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--examples", required=True, help="학습 예제 JSONL 파일")
+    parser.add_argument("--output", default=settings.CANDIDATE_RERANKER_PATH)
+    parser.add_argument("--l2", type=float, default=1e-3)
+    parser.add_argument("--epochs", type=int, default=500)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    started = time.perf_counter()
+    with open(args.examples, encoding="utf-8") as file:
+        features, labels = load_examples(file)
+    if not len(labels):
+        raise SystemExit(f"No training examples in {args.examples}")
+
+    reranker = fit_linear_reranker(features, labels, l2=args.l2, epochs=args.epochs)
+    save_atomically(reranker, args.output)
+    logger.info(
+        "Candidate reranker saved: path=%s, examples=%s, positives=%s, "
+        "log_loss=%.4f, weights=%s, %.1fs",
+        args.output,
+        len(labels),
+        int(labels.sum()),
+        log_loss(reranker, features, labels),
+        dict(zip(FEATURE_NAMES, reranker.weights.round(3).tolist())),
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,45 @@
+import asyncio
+import logging
+import os
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
-import httpx
 from fastapi import FastAPI
-from openai import AsyncOpenAI
 
+from app.api.album_router import router as album_router
+from app.api.dependencies import build_service_container
+from app.api.debug_router import router as debug_router
+from app.api.metrics_router import router as metrics_router
 from app.api.recommend_router import router as recommend_router
+from app.clients.callback_batcher import CallbackBatcher
+from app.clients.callback_outbox import CallbackDispatcher, CallbackOutbox
+from app.clients.spring_callback_client import SpringCallbackClient, post_callback
+from app.core.cache import LruCache
 from app.core.config import settings
-from app.core.exceptions import ConfigurationError
+from app.core.exceptions import ConfigurationError, RepositoryError
+from app.core.metrics import CACHE_HITS_TOTAL, CACHE_MISSES_TOTAL, QUEUE_DEPTH
+from app.core.tracing import JsonlSpanExporter, OtlpHttpSpanExporter, tracer
+from app.repositories.album_category_index import AlbumCategoryIndex
+from app.repositories.album_knn_graph import AlbumKnnGraph, AlbumKnnGraphWatcher
+from app.repositories.album_vector_index import AlbumVectorIndexLoader
+from app.repositories.user_taste_store import UserTasteStore
+from app.services.bulk_recommendation_service import BulkJobRegistry
+from app.services.candidate_page_store import CandidatePageStore
+from app.services.candidate_reranker import LinearReranker
+from app.services.economy_reason_service import (
+    EconomyBatchStore,
+    EconomyReasonScheduler,
+)
+from app.services.prompt_budget import preload_encoding
+from app.services.recommendation_queue import RecommendationJobQueue
+from app.services.recommendation_reason_service import RecommendationReasonService
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+
+logger = logging.getLogger(__name__)
 
 
 def create_database_client():
@@ -24,19 +57,211 @@ def create_database_client():
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
 
 
-def create_openai_embedding_client() -> AsyncOpenAI:
+# openai/httpx는 import만 수백 ms가 걸린다. client를 만드는 시점에 import해서
+# app.main을 import만 하는 job/worker CLI와 테스트가 비용을 내지 않게 한다.
+def create_openai_embedding_client() -> "AsyncOpenAI":
+    from openai import AsyncOpenAI
+
     return AsyncOpenAI()
 
 
-def create_openai_chat_client() -> AsyncOpenAI:
+def create_openai_chat_client() -> "AsyncOpenAI":
+    from openai import AsyncOpenAI
+
     return AsyncOpenAI(
         timeout=settings.OPENAI_TIMEOUT_SECONDS,
         max_retries=settings.OPENAI_MAX_RETRIES,
     )
 
 
-def create_spring_http_client() -> httpx.AsyncClient:
-    return httpx.AsyncClient()
+def create_spring_http_client() -> "httpx.AsyncClient":
+    import httpx
+
+    # 콜백은 같은 Spring 호스트로만 나가므로 keep-alive 연결을 재사용하고 HTTP/2로 다중화한다.
+    return httpx.AsyncClient(
+        http2=settings.SPRING_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.SPRING_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SPRING_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SPRING_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.SPRING_TIMEOUT_SECONDS,
+            connect=settings.SPRING_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def create_trace_exporter():
+    if not settings.TRACING_EXPORTER:
+        return None
+    if settings.TRACING_EXPORTER == "jsonl":
+        return JsonlSpanExporter(settings.TRACING_JSONL_PATH)
+    if settings.TRACING_EXPORTER == "otlp":
+        import httpx
+
+        return OtlpHttpSpanExporter(
+            settings.TRACING_OTLP_ENDPOINT, httpx.AsyncClient(timeout=5.0)
+        )
+    raise ConfigurationError(
+        f"Unsupported TRACING_EXPORTER: {settings.TRACING_EXPORTER}"
+    )
+
+
+def create_embedding_cache() -> LruCache:
+    return LruCache(settings.EMBEDDING_CACHE_SIZE, settings.CACHE_TTL_SECONDS)
+
+
+def create_reason_cache() -> LruCache:
+    return LruCache(settings.REASON_CACHE_SIZE, settings.CACHE_TTL_SECONDS)
+
+
+def create_recommendation_result_cache() -> LruCache:
+    return LruCache(settings.RECOMMENDATION_RESULT_CACHE_SIZE, settings.CACHE_TTL_SECONDS)
+
+
+def create_candidate_page_cache():
+    # 다음 page 요청은 첫 page를 만든 프로세스가 아닌 곳으로 올 수 있어 SQLite로 공유한다.
+    # 경로를 비우면 단일 프로세스용 메모리 캐시를 쓴다.
+    if not settings.CANDIDATE_PAGE_STORE_PATH:
+        return LruCache(
+            settings.CANDIDATE_PAGE_CACHE_SIZE, settings.CANDIDATE_PAGE_TTL_SECONDS
+        )
+    return CandidatePageStore(settings.CANDIDATE_PAGE_STORE_PATH)
+
+
+def create_callback_outbox():
+    if not settings.CALLBACK_OUTBOX_PATH:
+        return None
+    return CallbackOutbox(settings.CALLBACK_OUTBOX_PATH)
+
+
+def create_callback_dispatcher(outbox, http_client):
+    if outbox is None:
+        return None
+    return CallbackDispatcher(outbox=outbox, http_client=http_client)
+
+
+def create_callback_batcher(http_client, dispatcher):
+    # outbox가 있으면 결과를 먼저 기록하고 dispatcher가 전송 시점에 배치로 묶는다.
+    if settings.CALLBACK_BATCH_WINDOW_MS <= 0 or dispatcher is not None:
+        return None
+
+    async def deliver(url, body, headers):
+        await post_callback(http_client, url, body, headers)
+
+    return CallbackBatcher(deliver=deliver)
+
+
+def create_economy_batch_store():
+    if not settings.ECONOMY_BATCH_STORE_PATH:
+        return None
+    return EconomyBatchStore(settings.ECONOMY_BATCH_STORE_PATH)
+
+
+def create_recommendation_queue():
+    if not settings.RECOMMENDATION_QUEUE_PATH:
+        return None
+    return RecommendationJobQueue(settings.RECOMMENDATION_QUEUE_PATH)
+
+
+def load_album_knn_graph():
+    # 그래프는 app.jobs.album_knn_job이 오프라인으로 만든다. 없으면 엔드포인트만 503을 준다.
+    path = settings.ALBUM_KNN_GRAPH_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return AlbumKnnGraph.load(path)
+    except RepositoryError as exc:
+        logger.warning("Album kNN graph is unavailable: %s", exc)
+        return None
+
+
+def create_album_knn_graph_watcher(state):
+    # job이 그래프를 다시 만들면 재시작 없이 app.state의 그래프를 통째로 바꾼다.
+    if not settings.ALBUM_KNN_GRAPH_PATH:
+        return None
+    return AlbumKnnGraphWatcher(
+        settings.ALBUM_KNN_GRAPH_PATH,
+        on_reload=lambda graph: setattr(state, "album_knn_graph", graph),
+    )
+
+
+def load_album_category_index():
+    # 인덱스는 app.jobs.album_category_job이 오프라인으로 만든다. 없으면 카테고리 fusion만 빠진다.
+    path = settings.ALBUM_CATEGORY_INDEX_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return AlbumCategoryIndex.load(path)
+    except RepositoryError as exc:
+        logger.warning("Album category index is unavailable: %s", exc)
+        return None
+
+
+def load_candidate_reranker():
+    # 모델은 app.jobs.train_reranker가 오프라인으로 학습한다. 없으면 similarity 순서 그대로 쓴다.
+    path = settings.CANDIDATE_RERANKER_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return LinearReranker.load(path)
+    except RepositoryError as exc:
+        logger.warning("Candidate reranker is unavailable: %s", exc)
+        return None
+
+
+def create_user_taste_store():
+    if not settings.USER_TASTE_STORE_PATH:
+        return None
+    return UserTasteStore(settings.USER_TASTE_STORE_PATH, decay=settings.USER_TASTE_DECAY)
+
+
+def create_economy_reason_scheduler(
+    store, chat_client, reason_cache, http_client, dispatcher, batcher
+):
+    if store is None:
+        return None
+    # 결과 수신 시점에는 요청 scope가 없으므로 scheduler 전용 client들을 app-scoped로 둔다.
+    return EconomyReasonScheduler(
+        store=store,
+        openai_client=chat_client,
+        recommendation_reason_service=RecommendationReasonService(
+            openai_client=chat_client, cache=reason_cache
+        ),
+        spring_callback_client=SpringCallbackClient(
+            http_client=http_client,
+            callback_dispatcher=dispatcher,
+            callback_batcher=batcher,
+        ),
+    )
+
+
+def bind_app_metrics(state) -> None:
+    # 캐시 적중 수와 큐 길이는 이미 각 객체가 들고 있으므로 scrape 시점에 읽기만 한다.
+    for name, cache in (
+        ("embedding", state.embedding_cache),
+        ("reason", state.reason_cache),
+        ("result", state.recommendation_result_cache),
+    ):
+        CACHE_HITS_TOTAL.labels(name).set_function(lambda cache=cache: cache.hits)
+        CACHE_MISSES_TOTAL.labels(name).set_function(lambda cache=cache: cache.misses)
+    queues = (
+        ("callback_outbox", state.callback_outbox),
+        ("callback_batch", state.callback_batcher),
+        ("economy_batch", state.economy_batch_store),
+        ("recommendation_jobs", getattr(state, "recommendation_queue", None)),
+    )
+    for name, queue in queues:
+        if queue is not None:
+            QUEUE_DEPTH.labels(name).set_function(
+                lambda queue=queue: queue.pending_count()
+            )
+
+
+def unbind_app_metrics() -> None:
+    for metric in (CACHE_HITS_TOTAL, CACHE_MISSES_TOTAL, QUEUE_DEPTH):
+        metric.clear()
 
 
 async def _close_resource(resource) -> None:
@@ -54,14 +279,78 @@ async def _close_resource(resource) -> None:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # with 블록 진입 시 실행 (startup)
+    app.state.trace_exporter = create_trace_exporter()
+    tracer.configure(app.state.trace_exporter, settings.TRACING_SAMPLE_RATE)
     app.state.database = create_database_client()
     app.state.openai_embedding_client = create_openai_embedding_client()
     app.state.openai_chat_client = create_openai_chat_client()
     app.state.spring_http_client = create_spring_http_client()
+    app.state.embedding_cache = create_embedding_cache()
+    app.state.reason_cache = create_reason_cache()
+    app.state.recommendation_result_cache = create_recommendation_result_cache()
+    app.state.candidate_page_cache = create_candidate_page_cache()
+    app.state.album_vector_index_loader = AlbumVectorIndexLoader()
+    app.state.bulk_job_registry = BulkJobRegistry()
+    app.state.bulk_reason_limiter = asyncio.Semaphore(settings.BULK_REASON_CONCURRENCY)
+    app.state.callback_outbox = create_callback_outbox()
+    app.state.callback_dispatcher = create_callback_dispatcher(
+        app.state.callback_outbox, app.state.spring_http_client
+    )
+    app.state.callback_batcher = create_callback_batcher(
+        app.state.spring_http_client, app.state.callback_dispatcher
+    )
+    app.state.economy_batch_store = create_economy_batch_store()
+    app.state.economy_reason_scheduler = create_economy_reason_scheduler(
+        app.state.economy_batch_store,
+        app.state.openai_chat_client,
+        app.state.reason_cache,
+        app.state.spring_http_client,
+        app.state.callback_dispatcher,
+        app.state.callback_batcher,
+    )
+    app.state.user_taste_store = create_user_taste_store()
+    # watcher가 mtime을 먼저 기록해야 적재 직후 교체된 파일을 놓치지 않는다.
+    app.state.album_knn_graph_watcher = create_album_knn_graph_watcher(app.state)
+    app.state.album_knn_graph = load_album_knn_graph()
+    app.state.album_category_index = load_album_category_index()
+    app.state.candidate_reranker = load_candidate_reranker()
+    app.state.recommendation_queue = create_recommendation_queue()
+    # tiktoken은 encoding을 처음 쓸 때 BPE 파일을 내려받으므로 첫 요청 전에 적재해 둔다.
+    await asyncio.to_thread(preload_encoding, settings.OPENAI_CHAT_MODEL)
+    # 요청마다 service를 조립하지 않도록 리소스가 모두 준비된 뒤 한 번 만든다.
+    app.state.services = build_service_container(app.state)
+    bind_app_metrics(app.state)
+    if app.state.callback_dispatcher is not None:
+        await app.state.callback_dispatcher.start()
+    if app.state.economy_reason_scheduler is not None:
+        await app.state.economy_reason_scheduler.start()
+    if app.state.album_knn_graph_watcher is not None:
+        await app.state.album_knn_graph_watcher.start()
     try:
         yield  # ← 앱이 실행되는 구간. with 블록 내부 동안 일시정지
     finally:
         # with 블록 탈출 시 실행 (shutdown)
+        unbind_app_metrics()
+        watcher = getattr(app.state, "album_knn_graph_watcher", None)
+        if watcher is not None:
+            await watcher.stop()
+        scheduler = getattr(app.state, "economy_reason_scheduler", None)
+        if scheduler is not None:
+            await scheduler.stop()
+        await _close_resource(getattr(app.state, "economy_batch_store", None))
+        await _close_resource(getattr(app.state, "user_taste_store", None))
+        await _close_resource(getattr(app.state, "recommendation_queue", None))
+        await _close_resource(getattr(app.state, "candidate_page_cache", None))
+        # batcher -> outbox 순서로 비워야 HTTP client가 닫히기 전에 남은 콜백을 보낼 수 있다.
+        batcher = getattr(app.state, "callback_batcher", None)
+        if batcher is not None:
+            await batcher.stop()
+        dispatcher = getattr(app.state, "callback_dispatcher", None)
+        if dispatcher is not None:
+            await dispatcher.stop()
+        await _close_resource(getattr(app.state, "callback_outbox", None))
+        tracer.configure(None)
+        await _close_resource(getattr(app.state, "trace_exporter", None))
         await _close_resource(getattr(app.state, "spring_http_client", None))
         await _close_resource(getattr(app.state, "openai_chat_client", None))
         await _close_resource(getattr(app.state, "openai_embedding_client", None))
@@ -73,3 +362,7 @@ app = FastAPI(
     lifespan=lifespan,
 )
 app.include_router(recommend_router)
+app.include_router(album_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+app.include_router(debug_router)
@@ -0,0 +1,141 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.core.exceptions import RepositoryError
+from app.repositories.album_vector_index import normalize_rows
+
+
+def quantize_rows(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """행마다 정규화한 뒤 scale 하나를 둔 대칭 int8로 양자화한다. `int8 * scale`이 원래 값이다."""
+    matrix = normalize_rows(np.asarray(matrix, dtype=np.float32))
+    scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0)
+    scales = np.asarray(scales, dtype=np.float32)
+    scales[scales == 0] = 1.0
+    quantized = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+
+class AlbumCategoryIndex:
+    """앨범마다 평론 카테고리(instrumentation, performance_note 등)별 벡터를 하나씩 둔 multi-vector 인덱스.
+
+    벡터는 int8로 양자화해 float32의 1/4 메모리만 쓴다. 벡터는 앨범 순서로 정렬돼 있고
+    `album_offsets`로 앨범별 구간을 찾는다. 점수는 MaxSim(ColBERT식 late interaction)이다.
+    """
+
+    def __init__(
+        self,
+        album_ids: Sequence[str],
+        categories: Sequence[str],
+        vector_albums: np.ndarray,
+        vector_categories: np.ndarray,
+        vectors: np.ndarray,
+        scales: np.ndarray,
+    ):
+        self.album_ids = list(album_ids)
+        self.categories = list(categories)
+        self.vector_albums = np.asarray(vector_albums, dtype=np.int32)
+        self.vector_categories = np.asarray(vector_categories, dtype=np.int16)
+        self.vectors = np.asarray(vectors, dtype=np.int8)
+        self.scales = np.asarray(scales, dtype=np.float32)
+        count = len(self.vector_albums)
+        if not (len(self.vector_categories) == len(self.vectors) == len(self.scales) == count):
+            raise RepositoryError("Album category index arrays have mismatched shapes.")
+        if np.any(np.diff(self.vector_albums) < 0):
+            raise RepositoryError("Album category vectors must be sorted by album.")
+        self.album_offsets = np.searchsorted(
+            self.vector_albums, np.arange(len(self.album_ids) + 1)
+        )
+        if np.any(np.diff(self.album_offsets) == 0):
+            raise RepositoryError("Every album in the category index needs a vector.")
+        self._album_numbers = {
+            album_id: number for number, album_id in enumerate(self.album_ids)
+        }
+
+    @classmethod
+    def build(
+        cls,
+        album_ids: Sequence[str],
+        categories: Sequence[str],
+        vector_albums: Sequence[int],
+        vector_categories: Sequence[int],
+        matrix: np.ndarray,
+    ) -> "AlbumCategoryIndex":
+        order = np.argsort(np.asarray(vector_albums), kind="stable")
+        vectors, scales = quantize_rows(np.asarray(matrix, dtype=np.float32)[order])
+        return cls(
+            album_ids,
+            categories,
+            np.asarray(vector_albums)[order],
+            np.asarray(vector_categories)[order],
+            vectors,
+            scales,
+        )
+
+    def __len__(self) -> int:
+        return len(self.album_ids)
+
+    def maxsim(
+        self, queries: np.ndarray, album_numbers: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """앨범마다 `sum_q max_c cos(q, c)`. 질의 벡터가 하나면 가장 가까운 카테고리 유사도다.
+
+        대상 앨범(기본은 전체)의 카테고리 벡터를 한 번에 모아 (질의 x 벡터) 행렬곱 한 번으로
+        점수를 구하고, 앨범별 최댓값은 `np.maximum.reduceat`으로 구간마다 줄인다.
+        """
+        queries = normalize_rows(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if album_numbers is None:
+            album_numbers = np.arange(len(self))
+        album_numbers = np.asarray(album_numbers, dtype=np.int64)
+        if len(album_numbers) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        starts = self.album_offsets[album_numbers]
+        counts = self.album_offsets[album_numbers + 1] - starts
+        segment_starts = np.cumsum(counts) - counts
+        rows = np.repeat(starts - segment_starts, counts) + np.arange(counts.sum())
+        # scale은 벡터(열)마다 하나라 행렬곱 뒤 점수에 곱하면 int8 행렬을 한 번만 펼친다.
+        scores = (queries @ self.vectors[rows].T.astype(np.float32)) * self.scales[rows]
+        return np.maximum.reduceat(scores, segment_starts, axis=1).sum(axis=0)
+
+    def rank(
+        self, album_ids: Sequence[str], queries: np.ndarray
+    ) -> List[tuple[str, float]]:
+        """후보 앨범을 MaxSim 점수(질의 벡터 수로 나눈 평균) DESC로 정렬한다.
+
+        카테고리 벡터가 없는 앨범은 빠진다. 전체 앨범을 훑지 않고 검색이 over-fetch한
+        후보만 late interaction으로 다시 점수 매긴다.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        known = [album_id for album_id in album_ids if album_id in self._album_numbers]
+        numbers = np.asarray([self._album_numbers[album_id] for album_id in known], dtype=np.int64)
+        scores = self.maxsim(queries, numbers) / len(queries)
+        order = np.argsort(-scores, kind="stable")
+        return [(known[position], float(scores[position])) for position in order]
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                album_ids=np.asarray(self.album_ids, dtype=str),
+                categories=np.asarray(self.categories, dtype=str),
+                vector_albums=self.vector_albums,
+                vector_categories=self.vector_categories,
+                vectors=self.vectors,
+                scales=self.scales,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "AlbumCategoryIndex":
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    data["album_ids"].tolist(),
+                    data["categories"].tolist(),
+                    data["vector_albums"],
+                    data["vector_categories"],
+                    data["vectors"],
+                    data["scales"],
+                )
+        except (OSError, KeyError, ValueError) as exc:
+            raise RepositoryError(f"Album category index load failed: {exc}") from exc
@@ -1,25 +1,184 @@
-from typing import Any, List, Optional
+import asyncio
+from typing import Any, Collection, List, Optional, Sequence
 
+import numpy as np
+
+from app.core.config import settings
 from app.core.exceptions import ConfigurationError, RepositoryError
+from app.repositories.album_category_index import AlbumCategoryIndex
+from app.repositories.album_lexical_index import reciprocal_rank_fusion
+from app.repositories.album_vector_index import AlbumVectorIndex, AlbumVectorIndexLoader
 from app.schemas.recommendation import AlbumCandidate
 
 
 class AlbumEmbeddingRepository:
     VIEW_NAME = "v_embedding_with_album"
 
-    def __init__(self, database: Optional[Any] = None):
+    def __init__(
+        self,
+        database: Optional[Any] = None,
+        vector_index_loader: Optional[AlbumVectorIndexLoader] = None,
+        hybrid_search_enabled: bool = settings.HYBRID_SEARCH_ENABLED,
+        rrf_k: int = settings.HYBRID_RRF_K,
+        hybrid_fetch_multiplier: int = settings.HYBRID_FETCH_MULTIPLIER,
+        category_index: Optional[AlbumCategoryIndex] = None,
+    ):
         if database is None:
             raise ConfigurationError("AlbumEmbeddingRepository requires a database client.")
         self.database = database
+        self.vector_index_loader = vector_index_loader
+        self.hybrid_search_enabled = hybrid_search_enabled
+        self.rrf_k = rrf_k
+        self.hybrid_fetch_multiplier = max(1, hybrid_fetch_multiplier)
+        self.category_index = category_index
+
+    @property
+    def index_version(self) -> int:
+        """검색에 쓰는 메모리 인덱스 세대. 인덱스가 없으면(RPC 검색) 0이다."""
+        if self.vector_index_loader is None:
+            return 0
+        return self.vector_index_loader.version
 
     async def find_similar_albums(
-        self, embedding: list[float], top_k: int
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        query_text: Optional[str] = None,
+        exclude_album_ids: Collection[str] = (),
+    ) -> List[AlbumCandidate]:
+        """벡터 검색 결과에 query_text의 BM25 결과와 카테고리 multi-vector 결과를
+        reciprocal rank fusion으로 섞는다.
+
+        인덱스가 아직 적재되지 않았으면 match_albums RPC 결과만 돌려준다.
+        인덱스가 있으면 메모리에서 앨범 단위로 검색해 결과마다 서로 다른 앨범을 돌려주고,
+        다양성 rerank에 쓰도록 후보에 벡터를 붙인다.
+        `exclude_album_ids`는 메모리 인덱스 scan 단계에서 가려 결과 칸을 차지하지 않는다.
+        """
+        index = None
+        if self.vector_index_loader is not None:
+            index = self.vector_index_loader.peek(self)
+        if index is None:
+            return self._match_albums_excluding(embedding, top_k, exclude_album_ids)
+        return self.search_index(index, embedding, top_k, query_text, exclude_album_ids)
+
+    def search_index(
+        self,
+        index: AlbumVectorIndex,
+        embedding: np.ndarray,
+        top_k: int,
+        query_text: Optional[str] = None,
+        exclude_album_ids: Collection[str] = (),
+    ) -> List[AlbumCandidate]:
+        """적재된 인덱스에서 벡터, BM25, 카테고리 결과를 섞어 찾는다. CPU 작업만 한다."""
+        return self.search_index_many(
+            index, np.asarray([embedding], dtype=np.float32), top_k, [query_text], [exclude_album_ids]
+        )[0]
+
+    def search_index_many(
+        self,
+        index: AlbumVectorIndex,
+        embeddings: np.ndarray,
+        top_k: int,
+        query_texts: Sequence[Optional[str]],
+        exclusions: Sequence[Collection[str]],
+    ) -> List[List[AlbumCandidate]]:
+        """질의마다 `search_index`와 같은 후보를 찾는다. bulk 재추천이 쓴다.
+
+        제외 목록이 없고 fetch 크기가 같은 질의의 벡터 검색은 행렬 검색 한 번으로 묶고,
+        fusion은 질의마다 한다.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        plans = [
+            self._search_plan(index, top_k, query_text) for query_text in query_texts
+        ]
+        excludes = [
+            index.exclusion_positions(excluded) if excluded else None for excluded in exclusions
+        ]
+        # 인덱스가 있으면 match_albums RPC(메타데이터 전체 payload) 대신 메모리 행렬에서
+        # 위치와 점수만 뽑고, 최종 TOP K만 후보로 만든다.
+        vector_results: list[tuple[np.ndarray, np.ndarray]] = [None] * len(embeddings)
+        shared: dict[int, list[int]] = {}
+        for slot, ((_, fetch_k), exclude) in enumerate(zip(plans, excludes)):
+            if exclude is None:
+                shared.setdefault(fetch_k, []).append(slot)
+            else:
+                [vector_results[slot]] = index.search_positions(
+                    embeddings[slot : slot + 1], fetch_k, exclude
+                )
+        for fetch_k, slots in shared.items():
+            for slot, result in zip(slots, index.search_positions(embeddings[slots], fetch_k)):
+                vector_results[slot] = result
+
+        return [
+            self._rank(
+                index,
+                embedding,
+                positions,
+                scores,
+                top_k,
+                fetch_k,
+                query_text if lexical else None,
+                exclude,
+            )
+            for embedding, (positions, scores), (lexical, fetch_k), query_text, exclude in zip(
+                embeddings, vector_results, plans, query_texts, excludes
+            )
+        ]
+
+    def _search_plan(
+        self, index: AlbumVectorIndex, top_k: int, query_text: Optional[str]
+    ) -> tuple[bool, int]:
+        """(BM25를 섞을지, 벡터 검색에서 받을 후보 수)."""
+        lexical = bool(query_text and self.hybrid_search_enabled and index.lexical is not None)
+        category = self.hybrid_search_enabled and self.category_index is not None
+        fetch_k = top_k * self.hybrid_fetch_multiplier if lexical or category else top_k
+        return lexical, fetch_k
+
+    def _rank(
+        self,
+        index: AlbumVectorIndex,
+        embedding: np.ndarray,
+        positions: np.ndarray,
+        scores: np.ndarray,
+        top_k: int,
+        fetch_k: int,
+        query_text: Optional[str],
+        exclude: Optional[np.ndarray],
+    ) -> List[AlbumCandidate]:
+        """벡터 결과에 BM25와 카테고리 순위를 RRF로 섞는다. 섞을 것이 없으면 벡터 결과 그대로다."""
+        ranked_lists = []
+        if query_text:
+            hits = index.lexical.search(query_text, fetch_k, exclude=exclude)
+            ranked_lists.append([position for position, _ in hits])
+        if self.hybrid_search_enabled and self.category_index is not None:
+            ranked_lists.append(
+                self._category_ranking(index, embedding, [positions.tolist(), *ranked_lists])
+            )
+        ranked_lists = [ranked for ranked in ranked_lists if ranked]
+        if not ranked_lists:
+            return index.candidates(positions[:top_k], scores[:top_k])
+        return self._fuse(index, embedding, positions, scores, ranked_lists, top_k)
+
+    def _match_albums_excluding(
+        self, embedding: np.ndarray, top_k: int, exclude_album_ids: Collection[str]
     ) -> List[AlbumCandidate]:
+        # 인덱스 적재 전에만 타는 경로. 제외 수만큼 더 받아 걸러야 TOP K가 채워진다.
+        if not exclude_album_ids:
+            return self._match_albums(embedding, top_k)
+        candidates = self._match_albums(embedding, top_k + len(exclude_album_ids))
+        return [
+            candidate
+            for candidate in candidates
+            if candidate.album_id not in exclude_album_ids
+        ][:top_k]
+
+    def _match_albums(self, embedding: np.ndarray, top_k: int) -> List[AlbumCandidate]:
         try:
             response = self.database.rpc(
                 "match_albums",
                 {
-                    "query_embedding": embedding,   # 사용자 감상문 벡터
+                    # RPC 인자는 JSON이라 ndarray 질의 벡터도 이 경계에서만 float list로 바꾼다.
+                    "query_embedding": np.asarray(embedding, dtype=np.float32).tolist(),
                     "match_count": top_k,
                 }
             ).execute()
@@ -32,3 +191,103 @@ class AlbumEmbeddingRepository:
             rows, key=lambda row: float(row.get("similarity", 0)), reverse=True
         )
         return [AlbumCandidate.from_row(row) for row in sorted_rows[:top_k]]
+
+    def _category_ranking(
+        self,
+        index: AlbumVectorIndex,
+        embedding: np.ndarray,
+        ranked_lists: list[list[int]],
+    ) -> list[int]:
+        """over-fetch한 후보 앨범을 카테고리 multi-vector MaxSim 순서로 다시 세운다."""
+        metadata = index.metadata
+        album_numbers = dict.fromkeys(
+            int(metadata.row_albums[position]) for ranked in ranked_lists for position in ranked
+        )
+        ranked = self.category_index.rank(
+            [metadata.album_ids[number] for number in album_numbers], embedding
+        )
+        return index.album_positions([album_id for album_id, _ in ranked], embedding).tolist()
+
+    def _fuse(
+        self,
+        index: AlbumVectorIndex,
+        embedding: np.ndarray,
+        positions: np.ndarray,
+        scores: np.ndarray,
+        ranked_lists: list[list[int]],
+        top_k: int,
+    ) -> List[AlbumCandidate]:
+        """벡터 결과와 다른 검색 결과(BM25, 카테고리 MaxSim)의 평론 row 순위를 RRF로 섞는다."""
+        vector_positions = positions.tolist()
+        similarity = dict(zip(vector_positions, scores.tolist()))
+        row_albums = index.metadata.row_albums
+        # BM25는 평론 row 단위라 한 앨범이 여러 번 나올 수 있다. 앨범마다 가장 높은 순위
+        # 한 번만 남기고, 벡터 결과에 있는 앨범은 벡터 검색이 고른 평론 row로 맞춘다.
+        vector_by_album = {int(row_albums[position]): position for position in vector_positions}
+        fused_lists = [vector_positions]
+        for ranked in ranked_lists:
+            album_positions = []
+            seen_albums = set()
+            for position in ranked:
+                album = int(row_albums[position])
+                if album not in seen_albums:
+                    seen_albums.add(album)
+                    album_positions.append(vector_by_album.get(album, position))
+            fused_lists.append(album_positions)
+
+        # 벡터 TOP에 없던 앨범도 callback 점수가 필요하므로 메모리 행렬로 유사도를 채운다.
+        missing = list(
+            dict.fromkeys(
+                position
+                for ranked in fused_lists[1:]
+                for position in ranked
+                if position not in similarity
+            )
+        )
+        if missing:
+            similarity.update(
+                zip(missing, index.similarities(embedding, missing).tolist())
+            )
+
+        fused = reciprocal_rank_fusion(fused_lists, k=self.rrf_k)[:top_k]
+        return index.candidates(
+            [position for position, _ in fused],
+            [similarity[position] for position, _ in fused],
+        )
+
+    async def load_vector_index(
+        self, page_size: int = settings.VECTOR_INDEX_PAGE_SIZE
+    ) -> AlbumVectorIndex:
+        """view를 읽어 인덱스를 만든다.
+
+        embedding 파싱, 정규화, BM25와 centroid 계산이 수만 row에서 수 초씩 걸리므로
+        row fetch와 마찬가지로 이벤트 루프 밖에서 만든다.
+        """
+        rows = await self.fetch_view_rows(page_size)
+        return await asyncio.to_thread(AlbumVectorIndex.from_rows, rows)
+
+    async def fetch_view_rows(
+        self, page_size: int = settings.VECTOR_INDEX_PAGE_SIZE
+    ) -> list[dict[str, Any]]:
+        """view 전체 row를 page 단위로 읽는다. 인덱스 적재와 오프라인 작업이 쓴다."""
+        try:
+            return await asyncio.to_thread(self._fetch_all_rows, page_size)
+        except Exception as exc:
+            raise RepositoryError(str(exc)) from exc
+
+    def _fetch_all_rows(self, page_size: int) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        start = 0
+        while True:
+            response = (
+                self.database.from_(self.VIEW_NAME)
+                .select("*")
+                .range(start, start + page_size - 1)
+                .execute()
+            )
+            page = list(response.data or [])
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            start += page_size
+
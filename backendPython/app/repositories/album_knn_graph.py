@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import os
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.exceptions import RepositoryError
+from app.repositories.album_vector_index import AlbumVectorIndex, normalize_rows
+
+
+logger = logging.getLogger(__name__)
+
+
+def album_matrix(index: AlbumVectorIndex) -> tuple[list[str], np.ndarray]:
+    """앨범 id와 앨범 벡터. 앨범 벡터는 인덱스가 만들어 둔 평론 벡터 평균(centroid)이다."""
+    if index.metadata.album_count == 0:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return list(index.metadata.album_ids), index.album_matrix
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(top, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1),
+    )
+
+
+class AlbumKnnGraph:
+    """앨범마다 코사인 유사도 상위 k개 이웃을 미리 계산해 둔 그래프.
+
+    이웃 위치는 int32, 점수는 float16으로 보관하므로 앨범 1만 개 x k=20이면 약 1.2MB다.
+    조회는 앨범 id -> 행 위치 dict 한 번과 slice 한 번이다.
+    """
+
+    def __init__(
+        self,
+        album_ids: Sequence[str],
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+    ):
+        if len(album_ids) != len(neighbors) or neighbors.shape != scores.shape:
+            raise RepositoryError("Album kNN graph arrays have mismatched shapes.")
+        self.album_ids = list(album_ids)
+        self.neighbors = np.asarray(neighbors, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float16)
+        self._positions = {album_id: row for row, album_id in enumerate(self.album_ids)}
+
+    def __len__(self) -> int:
+        return len(self.album_ids)
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1] if self.neighbors.ndim == 2 else 0
+
+    def __contains__(self, album_id: str) -> bool:
+        return album_id in self._positions
+
+    def similar(self, album_id: str, limit: Optional[int] = None) -> List[tuple[str, float]]:
+        row = self._positions.get(album_id)
+        if row is None:
+            return []
+        end = self.k if limit is None else min(limit, self.k)
+        return [
+            (self.album_ids[neighbor], float(score))
+            for neighbor, score in zip(self.neighbors[row, :end], self.scores[row, :end])
+            if neighbor >= 0
+        ]
+
+    @classmethod
+    def build(
+        cls,
+        album_ids: Sequence[str],
+        matrix: np.ndarray,
+        k: int,
+        block_size: int = 1024,
+    ) -> "AlbumKnnGraph":
+        """전체 (n x n) 유사도 행렬을 만들지 않고 block_size 행씩 곱해 이웃을 고른다."""
+        matrix = normalize_rows(np.asarray(matrix, dtype=np.float32))
+        count = len(album_ids)
+        k = min(k, max(count - 1, 0))
+        neighbors = np.full((count, k), -1, dtype=np.int32)
+        scores = np.zeros((count, k), dtype=np.float16)
+        if k == 0:
+            return cls(album_ids, neighbors, scores)
+
+        for start in range(0, count, block_size):
+            block = matrix[start : start + block_size] @ matrix.T
+            rows = np.arange(len(block))
+            block[rows, start + rows] = -np.inf  # 자기 자신은 이웃이 아니다.
+            top, top_scores = _top_k_rows(block, k)
+            neighbors[start : start + len(block)] = top
+            scores[start : start + len(block)] = top_scores
+        return cls(album_ids, neighbors, scores)
+
+    def refreshed(
+        self,
+        album_ids: Sequence[str],
+        matrix: np.ndarray,
+        changed_album_ids: Iterable[str],
+        block_size: int = 1024,
+    ) -> "AlbumKnnGraph":
+        """새로 들어오거나 벡터가 바뀐 앨범만 다시 계산한 그래프를 돌려준다.
+
+        - 바뀐 앨범의 행과, 기존 이웃에 바뀌거나 사라진 앨범이 있던 행은 전체와 다시 곱한다.
+        - 나머지 행은 기존 이웃과 바뀐 앨범과의 새 점수를 합쳐 상위 k를 남긴다. (n x m)
+        - 새 앨범은 `changed_album_ids`에 없어도 바뀐 앨범으로 본다.
+        """
+        matrix = normalize_rows(np.asarray(matrix, dtype=np.float32))
+        album_ids = list(album_ids)
+        positions = {album_id: row for row, album_id in enumerate(album_ids)}
+        changed = sorted(
+            {positions[album_id] for album_id in changed_album_ids if album_id in positions}
+            | {row for row, album_id in enumerate(album_ids) if album_id not in self}
+        )
+        count = len(album_ids)
+        k = min(self.k or 0, max(count - 1, 0))
+        if not changed or k == 0 or self.k == 0:
+            if changed or count != len(self):
+                return AlbumKnnGraph.build(album_ids, matrix, self.k or k, block_size)
+            return self
+
+        changed_rows = np.asarray(changed, dtype=np.int64)
+        is_changed = np.zeros(count, dtype=bool)
+        is_changed[changed_rows] = True
+
+        # 기존 그래프를 새 album_ids 위치 기준으로 옮긴다. 없어진 앨범은 -1이 된다.
+        remap = np.append(
+            np.array([positions.get(album_id, -1) for album_id in self.album_ids], dtype=np.int64),
+            -1,
+        )
+        old_rows = np.array(
+            [self._positions.get(album_id, -1) for album_id in album_ids], dtype=np.int64
+        )
+        old_neighbors = remap[np.where(self.neighbors >= 0, self.neighbors, -1)][old_rows]
+        old_neighbors[old_rows < 0] = -1
+        # 기존 이웃이 바뀌거나 사라진 행은 빈 자리를 무엇이 채울지 모르므로 다시 계산한다.
+        lost = ((old_neighbors < 0) | is_changed[np.maximum(old_neighbors, 0)]).any(axis=1)
+        recompute = is_changed | lost
+        merge_rows = np.flatnonzero(~recompute)
+
+        neighbors = np.full((count, k), -1, dtype=np.int32)
+        scores = np.zeros((count, k), dtype=np.float16)
+        changed_vectors = matrix[changed_rows]
+        for start in range(0, len(merge_rows), block_size):
+            rows = merge_rows[start : start + block_size]
+            # 기존 이웃 + 바뀐 앨범과의 새 점수 중 상위 k
+            candidate_ids = np.concatenate(
+                [old_neighbors[rows], np.broadcast_to(changed_rows, (len(rows), len(changed_rows)))],
+                axis=1,
+            )
+            candidate_scores = np.concatenate(
+                [
+                    self.scores[old_rows[rows]].astype(np.float32),
+                    matrix[rows] @ changed_vectors.T,
+                ],
+                axis=1,
+            )
+            top, top_scores = _top_k_rows(candidate_scores, k)
+            neighbors[rows] = np.take_along_axis(candidate_ids, top, axis=1)
+            scores[rows] = top_scores
+
+        recompute_rows = np.flatnonzero(recompute)
+        for start in range(0, len(recompute_rows), block_size):
+            rows = recompute_rows[start : start + block_size]
+            block = matrix[rows] @ matrix.T
+            block[np.arange(len(rows)), rows] = -np.inf
+            top, top_scores = _top_k_rows(block, k)
+            neighbors[rows] = top
+            scores[rows] = top_scores
+        return AlbumKnnGraph(album_ids, neighbors, scores)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                album_ids=np.asarray(self.album_ids, dtype=str),
+                neighbors=self.neighbors,
+                scores=self.scores,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "AlbumKnnGraph":
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    data["album_ids"].tolist(), data["neighbors"], data["scores"]
+                )
+        except (OSError, KeyError, ValueError) as exc:
+            raise RepositoryError(f"Album kNN graph load failed: {exc}") from exc
+
+
+class AlbumKnnGraphWatcher:
+    """그래프 파일의 mtime을 주기적으로 확인하고, 바뀌면 다시 읽어 `on_reload`로 넘긴다.
+
+    album_knn_job은 임시 파일에 쓴 뒤 rename으로 교체하므로 반쯤 쓰인 파일을 읽지 않는다.
+    생성 시점의 mtime을 기준으로 잡으므로, 그 직후 적재한 그래프는 다시 읽지 않는다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_reload: Callable[[AlbumKnnGraph], None],
+        interval_seconds: float = settings.ALBUM_KNN_RELOAD_INTERVAL_SECONDS,
+    ):
+        self.path = path
+        self.on_reload = on_reload
+        self.interval_seconds = interval_seconds
+        self._loaded_mtime = self._mtime()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def check(self) -> bool:
+        mtime = self._mtime()
+        if mtime is None or mtime == self._loaded_mtime:
+            return False
+        # 같은 파일을 매 주기 다시 읽지 않도록 실패해도 mtime은 기록하고 이전 그래프를 유지한다.
+        self._loaded_mtime = mtime
+        try:
+            graph = await asyncio.to_thread(AlbumKnnGraph.load, self.path)
+        except RepositoryError as exc:
+            logger.warning("Album kNN graph reload failed, keeping previous graph: %s", exc)
+            return False
+        self.on_reload(graph)
+        logger.info("Album kNN graph reloaded: path=%s, albums=%s", self.path, len(graph))
+        return True
+
+    async def start(self) -> None:
+        if self._runner is None and self.interval_seconds > 0:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.check()
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
@@ -0,0 +1,128 @@
+import re
+from collections import Counter
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+# 감상문에 섞여 나오는 영문 이름("Bill Evans")과 한글 표기("빌 에반스")를 함께 잡는다.
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[가-힣]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]+")
+
+# 제목/아티스트/참여 연주자는 이름 검색의 핵심이라 요약보다 tf를 크게 준다.
+FIELD_WEIGHTS = (
+    ("album_title", 2),
+    ("artist_name", 3),
+    ("album_artist", 3),
+    ("personnel", 3),
+    ("review_summary", 1),
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """영문/숫자는 단어 단위, 한글은 조사가 붙어도 맞도록 음절 bigram으로 자른다."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall((text or "").lower()):
+        if len(token) > 2 and _HANGUL_PATTERN.fullmatch(token):
+            tokens.extend(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _field_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value if item)
+    return str(value)
+
+
+def row_terms(row: dict[str, Any]) -> Counter:
+    terms: Counter = Counter()
+    for field_name, weight in FIELD_WEIGHTS:
+        for token in tokenize(_field_text(row.get(field_name))):
+            terms[token] += weight
+    return terms
+
+
+class AlbumLexicalIndex:
+    """앨범 메타데이터 BM25 역색인.
+
+    문서별 BM25 가중치를 적재할 때 posting마다 미리 계산해 두므로, 질의는 질의 token의
+    posting 배열을 점수 배열에 더하는 것으로 끝난다.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Counter],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.size = len(documents)
+        lengths = np.array(
+            [sum(terms.values()) for terms in documents], dtype=np.float32
+        )
+        average_length = float(lengths.mean()) if self.size and lengths.sum() else 1.0
+
+        postings: dict[str, tuple[list[int], list[float]]] = {}
+        for position, terms in enumerate(documents):
+            for token, frequency in terms.items():
+                ids, frequencies = postings.setdefault(token, ([], []))
+                ids.append(position)
+                frequencies.append(frequency)
+
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for token, (ids, frequencies) in postings.items():
+            ids_array = np.asarray(ids, dtype=np.int32)
+            tf = np.asarray(frequencies, dtype=np.float32)
+            idf = np.log(1.0 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = k1 * (1.0 - b + b * lengths[ids_array] / average_length)
+            weights = (idf * tf * (k1 + 1.0) / (tf + norm)).astype(np.float32)
+            self.postings[token] = (ids_array, weights)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]], **kwargs) -> "AlbumLexicalIndex":
+        return cls([row_terms(row) for row in rows], **kwargs)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def search(
+        self, query: str, top_k: int, exclude: Optional[np.ndarray] = None
+    ) -> List[tuple[int, float]]:
+        """(문서 위치, BM25 점수)를 점수 DESC로 반환한다. 겹치는 token이 없으면 빈 목록.
+
+        `exclude` 위치는 점수를 0으로 만들어 후보에서 뺀다.
+        """
+        matched = [
+            self.postings[token]
+            for token in set(tokenize(query))
+            if token in self.postings
+        ]
+        if not matched or top_k <= 0:
+            return []
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for ids, weights in matched:
+            scores[ids] += weights
+        if exclude is not None and len(exclude):
+            scores[exclude] = 0.0
+        hits = np.flatnonzero(scores)
+        if len(hits) == 0:
+            return []
+        k = min(top_k, len(hits))
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(position), float(scores[position])) for position in top]
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[Any]], k: int = 60
+) -> List[tuple[Any, float]]:
+    """여러 순위 목록을 key별 sum(1 / (k + rank))로 합친다. rank는 1부터 센다."""
+    fused: dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
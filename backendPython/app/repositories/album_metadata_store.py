@@ -0,0 +1,166 @@
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.exceptions import RepositoryError
+from app.schemas.recommendation import AlbumCandidate, row_published_year, row_rating
+
+
+class AlbumMetadataStore:
+    """검색 후보 메타데이터를 열 단위로 보관한다.
+
+    앨범 단위 값(id, 제목, 아티스트)은 dense 앨범 번호로 한 번씩만 저장하고, 평론 row는
+    앨범 번호(int32)와 평론 단위 문자열만 가진다. 검색은 row 위치와 점수만 다루고,
+    `AlbumCandidate`는 응답에 실제로 쓰는 TOP K만 `materialize`로 만든다.
+    """
+
+    def __init__(
+        self,
+        album_ids: Sequence[str],
+        album_titles: Sequence[str],
+        artist_names: Sequence[str],
+        row_albums: np.ndarray,
+        critics_review_ids: Sequence[str],
+        review_summaries: Sequence[str],
+        review_contents: Sequence[str],
+        ratings: Optional[np.ndarray] = None,
+        published_years: Optional[np.ndarray] = None,
+    ):
+        if not (len(album_ids) == len(album_titles) == len(artist_names)):
+            raise RepositoryError("Album metadata columns have mismatched lengths.")
+        if not (
+            len(row_albums)
+            == len(critics_review_ids)
+            == len(review_summaries)
+            == len(review_contents)
+        ):
+            raise RepositoryError("Review metadata columns have mismatched lengths.")
+        self.album_ids = list(album_ids)
+        self.album_titles = list(album_titles)
+        self.artist_names = list(artist_names)
+        self.row_albums = np.asarray(row_albums, dtype=np.int32)
+        self.critics_review_ids = list(critics_review_ids)
+        self.review_summaries = list(review_summaries)
+        self.review_contents = list(review_contents)
+        # reranker feature. 값이 없는 row는 NaN / 0이다.
+        self.ratings = (
+            np.full(len(self.row_albums), np.nan, dtype=np.float32)
+            if ratings is None
+            else np.asarray(ratings, dtype=np.float32)
+        )
+        self.published_years = (
+            np.zeros(len(self.row_albums), dtype=np.int32)
+            if published_years is None
+            else np.asarray(published_years, dtype=np.int32)
+        )
+        if not (len(self.ratings) == len(self.published_years) == len(self.row_albums)):
+            raise RepositoryError("Review metadata columns have mismatched lengths.")
+        self._album_numbers = {
+            album_id: number for number, album_id in enumerate(self.album_ids)
+        }
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> "AlbumMetadataStore":
+        album_ids: list[str] = []
+        album_titles: list[str] = []
+        artist_names: list[str] = []
+        numbers: dict[str, int] = {}
+        row_albums: list[int] = []
+        critics_review_ids: list[str] = []
+        review_summaries: list[str] = []
+        review_contents: list[str] = []
+        ratings: list[float] = []
+        published_years: list[int] = []
+        for row in rows:
+            album_id = str(row.get("album_id", ""))
+            number = numbers.get(album_id)
+            if number is None:
+                number = numbers[album_id] = len(album_ids)
+                album_ids.append(album_id)
+                album_titles.append(str(row.get("album_title", "")))
+                artist_names.append(
+                    str(row.get("artist_name") or row.get("album_artist", ""))
+                )
+            row_albums.append(number)
+            critics_review_ids.append(str(row.get("critics_review_id", "")))
+            review_summaries.append(str(row.get("review_summary", "")))
+            review_contents.append(str(row.get("review_content", "")))
+            rating = row_rating(row)
+            ratings.append(np.nan if rating is None else rating)
+            published_years.append(row_published_year(row) or 0)
+        return cls(
+            album_ids,
+            album_titles,
+            artist_names,
+            np.asarray(row_albums, dtype=np.int32),
+            critics_review_ids,
+            review_summaries,
+            review_contents,
+            np.asarray(ratings, dtype=np.float32),
+            np.asarray(published_years, dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.row_albums)
+
+    @property
+    def album_count(self) -> int:
+        return len(self.album_ids)
+
+    def album_id(self, position: int) -> str:
+        return self.album_ids[self.row_albums[position]]
+
+    def key(self, position: int) -> tuple[str, str]:
+        # view는 평론 단위 row라 같은 앨범이 평론마다 따로 나온다.
+        return self.album_id(position), self.critics_review_ids[position]
+
+    def album_numbers(self, album_ids: Iterable[str]) -> np.ndarray:
+        """앨범 id를 입력 순서대로 dense 앨범 번호로 바꾼다. 모르는 id는 건너뛴다."""
+        return np.asarray(
+            [
+                self._album_numbers[album_id]
+                for album_id in album_ids
+                if album_id in self._album_numbers
+            ],
+            dtype=np.int32,
+        )
+
+    def positions_of(self, album_ids: Iterable[str]) -> np.ndarray:
+        """앨범 id 집합에 속한 평론 row 위치를 정렬된 int32 배열로 돌려준다."""
+        numbers = self.album_numbers(album_ids)
+        if not len(numbers):
+            return np.zeros(0, dtype=np.int32)
+        return np.flatnonzero(np.isin(self.row_albums, numbers)).astype(np.int32)
+
+    def materialize(
+        self, position: int, similarity: float, embedding: Optional[Any] = None
+    ) -> AlbumCandidate:
+        number = self.row_albums[position]
+        rating = self.ratings[position]
+        return AlbumCandidate(
+            album_id=self.album_ids[number],
+            similarity=float(similarity),
+            album_title=self.album_titles[number],
+            artist_name=self.artist_names[number],
+            review_summary=self.review_summaries[position],
+            review_content=self.review_contents[position],
+            critics_review_id=self.critics_review_ids[position],
+            rating=None if np.isnan(rating) else float(rating),
+            published_year=int(self.published_years[position]) or None,
+            embedding=embedding,
+        )
+
+    def materialize_many(
+        self,
+        positions: Sequence[int],
+        similarities: Sequence[float],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> List[AlbumCandidate]:
+        return [
+            self.materialize(
+                position,
+                similarity,
+                None if embeddings is None else embeddings[position],
+            )
+            for position, similarity in zip(positions, similarities)
+        ]
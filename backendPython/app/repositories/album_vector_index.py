@@ -0,0 +1,319 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.exceptions import RepositoryError
+from app.repositories.album_lexical_index import AlbumLexicalIndex
+from app.repositories.album_metadata_store import AlbumMetadataStore
+from app.schemas.recommendation import AlbumCandidate
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_embedding(value: Any) -> np.ndarray:
+    # pgvector 컬럼은 PostgREST를 거치면 "[0.1,0.2,...]" 문자열로 내려온다.
+    # view가 `vector_send(embedding)`(bytea)를 내보내면 "\x..." hex 문자열로 온다.
+    # 텍스트의 40% 크기이고 JSON 파싱 없이 bytes에서 바로 읽어 훨씬 빠르다.
+    if isinstance(value, str) and value.startswith("\\x"):
+        value = bytes.fromhex(value[2:])
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return parse_pgvector_binary(bytes(value))
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def parse_pgvector_binary(raw: bytes) -> np.ndarray:
+    """pgvector 바이너리 형식: uint16 차원 수, uint16 예약 칸, big-endian float4 값들."""
+    dimensions = int.from_bytes(raw[:2], "big")
+    if len(raw) < 4 or len(raw) != 4 + 4 * dimensions:
+        raise RepositoryError(f"Invalid pgvector binary embedding: {len(raw)} bytes.")
+    return np.frombuffer(raw, dtype=">f4", offset=4).astype(np.float32)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def album_centroids(metadata: AlbumMetadataStore, matrix: np.ndarray) -> np.ndarray:
+    """평론 row 벡터를 앨범마다 평균 내 다시 정규화한다. 행 번호는 dense 앨범 번호다."""
+    if metadata.album_count == 0:
+        return np.zeros((0, matrix.shape[1] if matrix.ndim == 2 else 0), dtype=np.float32)
+    sums = np.zeros((metadata.album_count, matrix.shape[1]), dtype=np.float32)
+    np.add.at(sums, metadata.row_albums, matrix)
+    return normalize_rows(sums)
+
+
+class AlbumVectorIndex:
+    """v_embedding_with_album 전체를 메모리에 올린 코사인 유사도 검색 인덱스.
+
+    view는 평론 단위 row지만 검색은 앨범 단위 centroid 행렬(`album_matrix`)을 훑는다.
+    결과 칸은 모두 서로 다른 앨범이고, 앨범마다 질의와 가장 가까운 평론 row를 골라
+    그 위치를 돌려준다. 메타데이터는 열 단위 저장소(`metadata`)에서 TOP K만 후보로
+    만든다. 같은 row로 만든 BM25 역색인(`lexical`)은 평론 row 위치를 쓴다.
+    """
+
+    # 한 번에 계산하는 (query x corpus) 유사도 행렬을 약 64MB로 제한한다.
+    MAX_SCORE_BLOCK_CELLS = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        metadata: AlbumMetadataStore,
+        matrix: np.ndarray,
+        lexical: Optional[AlbumLexicalIndex] = None,
+    ):
+        if len(metadata) != len(matrix):
+            raise RepositoryError("Vector index metadata and matrix size differ.")
+        if lexical is not None and len(lexical) != len(metadata):
+            raise RepositoryError("Lexical index and vector index size differ.")
+        self.metadata = metadata
+        self.matrix = normalize_rows(np.asarray(matrix, dtype=np.float32))
+        self.lexical = lexical
+        self.album_matrix = album_centroids(metadata, self.matrix)
+        # 앨범 번호별 평론 row 위치(CSR). 검색 결과 앨범의 대표 평론을 고를 때 쓴다.
+        self._album_rows = np.argsort(metadata.row_albums, kind="stable").astype(np.int32)
+        self._album_offsets = np.searchsorted(
+            metadata.row_albums[self._album_rows], np.arange(metadata.album_count + 1)
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> "AlbumVectorIndex":
+        indexed_rows = [row for row in rows if row.get("embedding") is not None]
+        if not indexed_rows:
+            return cls(
+                AlbumMetadataStore.from_rows([]),
+                np.zeros((0, 0), dtype=np.float32),
+                AlbumLexicalIndex([]),
+            )
+        return cls(
+            AlbumMetadataStore.from_rows(indexed_rows),
+            np.vstack([parse_embedding(row["embedding"]) for row in indexed_rows]),
+            AlbumLexicalIndex.from_rows(indexed_rows),
+        )
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def fingerprint(self) -> str:
+        """검색 결과를 바꾸는 내용(벡터와 후보 메타데이터)의 hash. 같은 view를 다시 읽으면 같다."""
+        metadata = self.metadata
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.matrix).tobytes())
+        digest.update(metadata.row_albums.tobytes())
+        digest.update(metadata.ratings.tobytes())
+        digest.update(metadata.published_years.tobytes())
+        for column in (
+            metadata.album_ids,
+            metadata.album_titles,
+            metadata.artist_names,
+            metadata.critics_review_ids,
+            metadata.review_summaries,
+            metadata.review_contents,
+        ):
+            digest.update("\x00".join(map(str, column)).encode("utf-8"))
+            digest.update(b"\x01")
+        return digest.hexdigest()
+
+    def exclusion_positions(self, album_ids: Iterable[str]) -> np.ndarray:
+        """앨범 id 집합을 인덱스 위치의 정렬된 int32 배열로 바꾼다. 평론 row가 여럿이면 모두 포함한다."""
+        return self.metadata.positions_of(album_ids)
+
+    def album_positions(self, album_ids: Iterable[str], query: Sequence[float]) -> np.ndarray:
+        """앨범 id마다 질의와 가장 가까운 평론 row 위치. 순서를 유지하고 모르는 id는 건너뛴다."""
+        query = normalize_rows(np.asarray(query, dtype=np.float32))
+        return self._closest_reviews(query, self.metadata.album_numbers(album_ids))
+
+    def candidates(
+        self, positions: Sequence[int], similarities: Sequence[float]
+    ) -> List[AlbumCandidate]:
+        """위치와 점수로 후보를 만든다. 다양성 rerank용 벡터는 행렬 row view로 붙인다."""
+        return self.metadata.materialize_many(positions, similarities, self.matrix)
+
+    def similarities(self, query: Sequence[float], positions: Sequence[int]) -> np.ndarray:
+        """지정한 평론 row가 속한 앨범의 centroid와 질의 사이 코사인 유사도. 검색 점수와 같은 기준이다."""
+        query = normalize_rows(np.asarray(query, dtype=np.float32))
+        albums = self.metadata.row_albums[np.asarray(positions, dtype=np.int64)]
+        return self.album_matrix[albums] @ query
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        exclude: Optional[np.ndarray] = None,
+    ) -> List[AlbumCandidate]:
+        return self.search_many(np.asarray([query], dtype=np.float32), top_k, exclude)[0]
+
+    def search_many(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        exclude: Optional[np.ndarray] = None,
+    ) -> List[List[AlbumCandidate]]:
+        return [
+            self.candidates(positions, scores)
+            for positions, scores in self.search_positions(queries, top_k, exclude)
+        ]
+
+    def search_positions(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        exclude: Optional[np.ndarray] = None,
+    ) -> List[tuple[np.ndarray, np.ndarray]]:
+        """질의마다 서로 다른 앨범 TOP K의 (평론 row 위치, 점수) 배열을 점수 DESC로 찾는다.
+
+        점수는 앨범 centroid 유사도다. `exclude`(평론 row 위치)가 속한 앨범은
+        argpartition 전에 -inf로 가려 결과 칸을 쓰지 않는다.
+        """
+        queries = normalize_rows(np.asarray(queries, dtype=np.float32))
+        album_count = len(self.album_matrix)
+        excluded_albums = np.zeros(0, dtype=np.int32)
+        if exclude is not None and len(exclude):
+            excluded_albums = np.unique(self.metadata.row_albums[exclude])
+        k = min(top_k, album_count - len(excluded_albums))
+        if album_count == 0 or k <= 0:
+            empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+            return [empty for _ in range(len(queries))]
+
+        block_size = max(1, self.MAX_SCORE_BLOCK_CELLS // album_count)
+        results = []
+        for start in range(0, len(queries), block_size):
+            block = queries[start : start + block_size]
+            scores = block @ self.album_matrix.T
+            if len(excluded_albums):
+                scores[:, excluded_albums] = -np.inf
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            results.extend(
+                (self._closest_reviews(query, albums), album_scores)
+                for query, albums, album_scores in zip(block, top, top_scores)
+            )
+        return results
+
+    def _closest_reviews(self, query: np.ndarray, albums: np.ndarray) -> np.ndarray:
+        """앨범마다 질의와 가장 가까운 평론 row 위치. 평론이 하나인 앨범은 계산하지 않는다."""
+        positions = np.empty(len(albums), dtype=np.int64)
+        for slot, album in enumerate(albums):
+            rows = self._album_rows[self._album_offsets[album] : self._album_offsets[album + 1]]
+            if len(rows) == 1:
+                positions[slot] = rows[0]
+            else:
+                positions[slot] = rows[np.argmax(self.matrix[rows] @ query)]
+        return positions
+
+
+class AlbumVectorIndexLoader:
+    """app-scoped로 인덱스를 적재해 요청 간에 공유하고, 주기적으로 다시 적재한다.
+
+    `refresh_seconds`가 지난 인덱스는 그대로 쓰면서 백그라운드에서 view를 다시 읽고,
+    완성된 새 인덱스로 참조만 바꾼다. 검색 중인 요청은 이전 인덱스를 끝까지 쓴다.
+    `version`은 적재한 인덱스의 내용(`fingerprint`)이 이전과 달라지거나 인덱스를 버릴 때마다
+    1씩 오른다. 재적재한 view가 그대로면 오르지 않는다. 검색 결과를 캐시하는 쪽은 이 값으로
+    결과가 어느 인덱스에서 나왔는지 구분한다.
+    """
+
+    def __init__(
+        self,
+        retry_base_seconds: float = settings.VECTOR_INDEX_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = settings.VECTOR_INDEX_RETRY_MAX_SECONDS,
+        refresh_seconds: float = settings.VECTOR_INDEX_REFRESH_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._index: Optional[AlbumVectorIndex] = None
+        self.version = 0
+        self._lock = asyncio.Lock()
+        self._loading: Optional[asyncio.Task] = None
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._failures = 0
+        self._retry_at = 0.0
+        self._loaded_at = 0.0
+        self._fingerprint: Optional[str] = None
+
+    async def get(self, repository) -> AlbumVectorIndex:
+        if self._index is not None:
+            self._start_background_load(repository)
+            return self._index
+        async with self._lock:
+            if self._index is None:
+                await self._swap(await repository.load_vector_index())
+        return self._index
+
+    def peek(self, repository) -> Optional[AlbumVectorIndex]:
+        """적재된 인덱스를 바로 돌려준다. 아직 없으면 백그라운드 적재만 시작하고 None을 준다.
+
+        실시간 요청이 첫 적재(전체 view paging)를 기다리지 않게 하기 위한 경로다.
+        인덱스가 오래됐으면 이전 인덱스를 돌려주면서 백그라운드 재적재를 시작한다.
+        적재가 실패하면 지수 backoff 시간이 지날 때까지 다시 시도하지 않는다.
+        """
+        self._start_background_load(repository)
+        return self._index
+
+    async def refresh(self, repository) -> AlbumVectorIndex:
+        """view를 다시 읽어 새 인덱스로 바꾼다. 적재하는 동안 이전 인덱스는 계속 쓰인다."""
+        index = await repository.load_vector_index()
+        await self._swap(index)
+        return index
+
+    def _start_background_load(self, repository) -> None:
+        if self._loading is not None and not self._loading.done():
+            return
+        now = self._clock()
+        if now < self._retry_at:
+            return
+        if self._index is None:
+            load = self.get(repository)
+        elif self.refresh_seconds > 0 and now - self._loaded_at >= self.refresh_seconds:
+            load = self.refresh(repository)
+        else:
+            return
+        self._loading = asyncio.get_running_loop().create_task(self._load(load))
+
+    async def _load(self, load) -> None:
+        try:
+            await load
+        except Exception as exc:
+            self._failures += 1
+            delay = min(
+                self.retry_max_seconds,
+                self.retry_base_seconds * 2 ** (self._failures - 1),
+            )
+            self._retry_at = self._clock() + delay
+            logger.warning(
+                "Vector index load failed: failures=%s, retry_in=%.1fs, %s",
+                self._failures,
+                delay,
+                exc,
+            )
+            return
+        self._failures = 0
+        self._retry_at = 0.0
+
+    async def _swap(self, index: AlbumVectorIndex) -> None:
+        # 전체 행렬을 hash하므로 이벤트 루프 밖에서 계산한다.
+        fingerprint = await asyncio.to_thread(index.fingerprint)
+        # 참조 하나만 바꾸므로 읽는 쪽은 이전/새 인덱스 중 하나를 온전히 본다.
+        self._index = index
+        self._loaded_at = self._clock()
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self.version += 1
+
+    def invalidate(self) -> None:
+        self._index = None
+        self._fingerprint = None
+        self.version += 1
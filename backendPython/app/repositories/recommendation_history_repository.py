@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError, RepositoryError
+
+
+class RecommendationHistoryRepository:
+    """Spring이 저장한 추천 결과(`recommend_album`)를 읽기 전용으로 조회한다."""
+
+    REVIEW_TABLE = "user_reviews"
+    RECOMMENDATION_TABLE = "recommend_album"
+
+    def __init__(
+        self,
+        database: Optional[Any] = None,
+        recent_reviews: int = settings.EXCLUSION_RECENT_REVIEWS,
+    ):
+        if database is None:
+            raise ConfigurationError(
+                "RecommendationHistoryRepository requires a database client."
+            )
+        self.database = database
+        self.recent_reviews = recent_reviews
+
+    async def recommended_album_ids(
+        self, user_id: str, exclude_review_id: Optional[int] = None
+    ) -> frozenset[str]:
+        """사용자의 최근 감상문들에 이미 추천된 앨범 id.
+
+        재시도 요청이 이전 결과와 달라지지 않도록 현재 감상문(`exclude_review_id`)의 추천은 뺀다.
+        """
+        if self.recent_reviews <= 0:
+            return frozenset()
+        try:
+            return await asyncio.to_thread(
+                self._fetch_album_ids, user_id, exclude_review_id
+            )
+        except Exception as exc:
+            raise RepositoryError(str(exc)) from exc
+
+    def _fetch_album_ids(
+        self, user_id: str, exclude_review_id: Optional[int]
+    ) -> frozenset[str]:
+        query = self.database.from_(self.REVIEW_TABLE).select("id").eq("user_id", user_id)
+        if exclude_review_id is not None:
+            query = query.neq("id", exclude_review_id)
+        reviews = (
+            query.order("created_at", desc=True).limit(self.recent_reviews).execute()
+        )
+        review_ids = [row["id"] for row in reviews.data or []]
+        if not review_ids:
+            return frozenset()
+
+        recommendations = (
+            self.database.from_(self.RECOMMENDATION_TABLE)
+            .select("album_id")
+            .in_("user_review_id", review_ids)
+            .execute()
+        )
+        return frozenset(str(row["album_id"]) for row in recommendations.data or [])
@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.exceptions import ConfigurationError
+
+
+@dataclass
+class UserTaste:
+    vector: np.ndarray
+    weight: float
+    review_count: int
+
+
+class UserTasteStore:
+    """사용자별 감상문 임베딩의 지수 감쇠 평균(taste vector)을 보관한다.
+
+    감쇠 가중합 `S' = decay * S + x`, `W' = decay * W + 1`에서 평균만 남기면
+    `m' = m + (x - m) / W'`이므로 새 감상문마다 O(d)로 갱신된다. 벡터는 float16으로 저장한다.
+    """
+
+    def __init__(self, path: str, decay: float = 0.8):
+        if not path:
+            raise ConfigurationError("UserTasteStore requires a database path.")
+        if not 0.0 <= decay < 1.0:
+            raise ConfigurationError("UserTasteStore decay must be in [0, 1).")
+        self.path = path
+        self.decay = decay
+        self._lock = threading.Lock()
+        # worker 프로세스와 같은 파일을 쓰므로 갱신은 BEGIN IMMEDIATE로 직렬화한다.
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS user_taste_vectors (
+                user_id TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                weight REAL NOT NULL,
+                review_count INTEGER NOT NULL,
+                last_review_id INTEGER,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        # 반영한 review_id를 모두 남긴다. 마지막 id만 비교하면 재시도가 다른 감상문
+        # 뒤에 도착했을 때 같은 감상문이 두 번 반영된다.
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS user_taste_reviews (
+                user_id TEXT NOT NULL,
+                review_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, review_id)
+            )
+            """
+        )
+        # review 목록이 생기기 전 파일은 마지막으로 반영한 id만 남아 있다.
+        self._connection.execute(
+            "INSERT OR IGNORE INTO user_taste_reviews (user_id, review_id) "
+            "SELECT user_id, last_review_id FROM user_taste_vectors "
+            "WHERE last_review_id IS NOT NULL"
+        )
+
+    def get(self, user_id: str) -> Optional[UserTaste]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT vector, weight, review_count FROM user_taste_vectors "
+                "WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return UserTaste(
+            vector=np.frombuffer(row[0], dtype=np.float16).astype(np.float32),
+            weight=row[1],
+            review_count=row[2],
+        )
+
+    def update(
+        self, user_id: str, embedding: Sequence[float], review_id: Optional[int] = None
+    ) -> UserTaste:
+        """감상문 임베딩 하나를 반영한다. 같은 review_id 재시도는 두 번 세지 않는다."""
+        value = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                taste = self._update(user_id, value, review_id)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return taste
+
+    def _update(
+        self, user_id: str, value: np.ndarray, review_id: Optional[int]
+    ) -> UserTaste:
+        row = self._connection.execute(
+            "SELECT vector, weight, review_count "
+            "FROM user_taste_vectors WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if review_id is not None:
+            inserted = self._connection.execute(
+                "INSERT OR IGNORE INTO user_taste_reviews (user_id, review_id) VALUES (?, ?)",
+                (user_id, review_id),
+            ).rowcount
+            if not inserted and row is not None:
+                return UserTaste(
+                    np.frombuffer(row[0], dtype=np.float16).astype(np.float32),
+                    row[1],
+                    row[2],
+                )
+
+        if row is None:
+            mean, weight, count = value, 1.0, 1
+        else:
+            previous = np.frombuffer(row[0], dtype=np.float16).astype(np.float32)
+            weight = self.decay * row[1] + 1.0
+            mean = previous + (value - previous) / weight
+            count = row[2] + 1
+        self._connection.execute(
+            "INSERT OR REPLACE INTO user_taste_vectors "
+            "(user_id, vector, weight, review_count, last_review_id, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                user_id,
+                mean.astype(np.float16).tobytes(),
+                weight,
+                count,
+                review_id,
+                time.time(),
+            ),
+        )
+        return UserTaste(mean, weight, count)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def blend_taste(
+    embedding: np.ndarray, taste: np.ndarray, weight: float
+) -> np.ndarray:
+    """감상문 벡터와 taste vector를 단위 벡터로 맞춘 뒤 섞는다. weight는 taste 쪽 비중이다.
+
+    검색 질의로 바로 쓰므로 float list로 바꾸지 않고 float32 배열로 돌려준다.
+    """
+    query = np.asarray(embedding, dtype=np.float32)
+    query_norm = np.linalg.norm(query)
+    taste_norm = np.linalg.norm(taste)
+    if query_norm == 0 or taste_norm == 0 or weight <= 0:
+        return query
+    blended = (1.0 - weight) * query / query_norm + weight * taste / taste_norm
+    return (blended / np.linalg.norm(blended)).astype(np.float32)
@@ -1,19 +1,59 @@
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
 from typing import Annotated, Any, Iterable, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, StringConstraints
 
+from app.core.config import settings
 from app.core.error_codes import RecommendationErrorCode
 
 
+_YEAR_PATTERN = re.compile(r"\d{4}")
+
+RecommendationMode = Literal["realtime", "economy", "paged"]
+
+
 class RecommendByReviewRequest(BaseModel):
     review_id: Annotated[int, Field(gt=0)]
     review_content: Annotated[
         str,
         StringConstraints(strip_whitespace=True, min_length=1),
     ]
+    mode: RecommendationMode = "realtime"
+    # 있으면 이 사용자에게 이미 추천한 앨범을 검색에서 뺀다.
+    user_id: Optional[str] = None
+
+
+class BulkRecommendByReviewsRequest(BaseModel):
+    items: Annotated[
+        List[RecommendByReviewRequest],
+        Field(min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    ]
+    mode: RecommendationMode = "realtime"
+
+
+class BulkRecommendationJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str
+    status: Literal["RUNNING", "COMPLETED", "PARTIAL", "FAILED"]
+    total: int
+    embedded: int
+    searched: int
+    completed: int
+    failed: int
+
+
+class SimilarAlbum(BaseModel):
+    album_id: str
+    similarity: float
+
+
+class SimilarAlbumsResponse(BaseModel):
+    album_id: str
+    similar_albums: List[SimilarAlbum]
 
 
 class RecommendationCallbackItem(BaseModel):
@@ -27,6 +67,15 @@ class RecommendationCallbackItem(BaseModel):
     critics_review_id: str = Field(alias="criticsReviewId")
 
 
+class RecommendationPageResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    review_id: int = Field(alias="reviewId")
+    page: int
+    recommendations: List[RecommendationCallbackItem]
+    has_next: bool = Field(alias="hasNext")
+
+
 class RecommendationCallbackRequest(BaseModel):
     model_config = ConfigDict(populate_by_name=True, use_enum_values=False)
 
@@ -62,6 +111,11 @@ class AlbumCandidate:
     review_summary: str = ""
     review_content: str = ""
     critics_review_id: str = ""
+    # reranker feature. view에 평점/발행일 열이 없으면 None이다.
+    rating: Optional[float] = None
+    published_year: Optional[int] = None
+    # 다양성 rerank용 벡터. 메모리 인덱스가 있을 때만 채우며 저장/직렬화 대상이 아니다.
+    embedding: Optional[Any] = field(default=None, repr=False, compare=False)
 
     @classmethod
     def from_row(cls, row: dict[str, Any]) -> "AlbumCandidate":
@@ -73,9 +127,24 @@ class AlbumCandidate:
             review_summary=str(row.get("review_summary", "")),
             review_content=str(row.get("review_content", "")),
             critics_review_id=str(row.get("critics_review_id", "")),
+            rating=row_rating(row),
+            published_year=row_published_year(row),
         )
 
 
+def row_rating(row: dict[str, Any]) -> Optional[float]:
+    try:
+        return float(row["rating"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def row_published_year(row: dict[str, Any]) -> Optional[int]:
+    # published_date는 "YYYY-MM-DD" 문자열이거나 비어 있다.
+    match = _YEAR_PATTERN.match(str(row.get("published_date") or ""))
+    return int(match.group()) if match else None
+
+
 @dataclass
 class RecommendationReason:
     album_id: str
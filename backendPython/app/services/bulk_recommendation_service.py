@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+
+from app.clients.spring_callback_client import SpringCallbackClient
+from app.core.config import settings
+from app.core.error_codes import RecommendationErrorCode
+from app.core.exceptions import ConfigurationError, EmbeddingError, RepositoryError
+from app.core.metrics import ERRORS_TOTAL, RECOMMENDATIONS_TOTAL
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_vector_index import AlbumVectorIndex, AlbumVectorIndexLoader
+from app.schemas.recommendation import (
+    AlbumCandidate,
+    RecommendationMode,
+    RecommendByReviewRequest,
+)
+from app.services.candidate_diversifier import diversify_candidates
+from app.services.embedding_service import EmbeddingService
+from app.services.recommendation_reason_service import RecommendationReasonService
+from app.services.recommendation_service import (
+    FAILURE_MESSAGES,
+    build_callback_items,
+    rerank_scores,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkRecommendationJob:
+    job_id: str
+    total: int
+    status: Literal["RUNNING", "COMPLETED", "PARTIAL", "FAILED"] = "RUNNING"
+    embedded: int = 0
+    searched: int = 0
+    completed: int = 0
+    failed: int = 0
+
+
+def final_status(job: BulkRecommendationJob) -> str:
+    """모든 리뷰가 성공하면 COMPLETED, 모두 실패하면 FAILED, 섞여 있으면 PARTIAL."""
+    if job.failed == 0:
+        return "COMPLETED"
+    if job.completed == 0:
+        return "FAILED"
+    return "PARTIAL"
+
+
+class BulkJobRegistry:
+    """진행 중이거나 최근 끝난 bulk 작업의 진행률을 보관한다."""
+
+    def __init__(self, retention: int = settings.BULK_JOB_RETENTION):
+        self.retention = retention
+        self._jobs: OrderedDict[str, BulkRecommendationJob] = OrderedDict()
+
+    def create(self, total: int) -> BulkRecommendationJob:
+        job = BulkRecommendationJob(job_id=uuid.uuid4().hex, total=total)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.retention:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkRecommendationJob]:
+        return self._jobs.get(job_id)
+
+
+class BulkRecommendationService:
+    """과거 감상문 재추천용. 임베딩을 묶어 만들고 메모리 인덱스에서 한 번에 행렬 검색한다."""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        album_embedding_repository: AlbumEmbeddingRepository,
+        vector_index_loader: AlbumVectorIndexLoader,
+        recommendation_reason_service: RecommendationReasonService,
+        spring_callback_client: SpringCallbackClient,
+        top_k: int = settings.RECOMMENDATION_TOP_K,
+        economy_reason_scheduler=None,
+        recommendation_history_repository=None,
+        candidate_fetch_multiplier: int = settings.CANDIDATE_FETCH_MULTIPLIER,
+        mmr_lambda: float = settings.MMR_LAMBDA,
+        max_albums_per_artist: int = settings.MAX_ALBUMS_PER_ARTIST,
+        candidate_reranker=None,
+        embedding_batch_size: int = settings.EMBEDDING_BATCH_SIZE,
+    ):
+        if vector_index_loader is None:
+            raise ConfigurationError(
+                "BulkRecommendationService requires an AlbumVectorIndexLoader."
+            )
+        self.embedding_service = embedding_service
+        self.album_embedding_repository = album_embedding_repository
+        self.vector_index_loader = vector_index_loader
+        self.recommendation_reason_service = recommendation_reason_service
+        self.spring_callback_client = spring_callback_client
+        self.top_k = top_k
+        self.economy_reason_scheduler = economy_reason_scheduler
+        self.candidate_fetch_multiplier = max(1, candidate_fetch_multiplier)
+        self.mmr_lambda = mmr_lambda
+        self.max_albums_per_artist = max_albums_per_artist
+        self.recommendation_history_repository = recommendation_history_repository
+        self.candidate_reranker = candidate_reranker
+        self.embedding_batch_size = max(1, embedding_batch_size)
+
+    async def run(
+        self,
+        job: BulkRecommendationJob,
+        items: Sequence[RecommendByReviewRequest],
+        mode: RecommendationMode = "realtime",
+    ) -> None:
+        try:
+            await self._run(job, list(items), mode)
+            job.status = final_status(job)
+        except Exception as exc:
+            logger.exception("Bulk recommendation job failed: job_id=%s, %s", job.job_id, exc)
+            job.status = "FAILED"
+        logger.info(
+            "Bulk recommendation job finished: job_id=%s, status=%s, completed=%s, failed=%s",
+            job.job_id,
+            job.status,
+            job.completed,
+            job.failed,
+        )
+
+    async def _run(
+        self,
+        job: BulkRecommendationJob,
+        items: list[RecommendByReviewRequest],
+        mode: RecommendationMode,
+    ) -> None:
+        items, embeddings = await self._embed(job, items)
+        if not items:
+            return
+        job.embedded = len(items)
+
+        exclusions = await self._exclusions(items)
+        try:
+            index = await self.vector_index_loader.get(self.album_embedding_repository)
+            # 수천 건 행렬 검색과 rerank는 CPU 작업이라 event loop를 막지 않도록 thread에서 돈다.
+            candidate_lists = await asyncio.to_thread(
+                self._candidate_lists, index, items, embeddings, exclusions
+            )
+        except RepositoryError:
+            await self._fail_all(job, items, RecommendationErrorCode.SEARCH_FAILED)
+            return
+        job.searched = len(items)
+
+        # 동시 LLM 호출 수는 reason service의 limiter가 제한하므로 리뷰 단위는 모두 띄운다.
+        # 한 리뷰의 실패가 작업 전체를 FAILED로 만들지 않도록 결과는 리뷰마다 센다.
+        results = await asyncio.gather(
+            *(
+                self._complete_review(job, item, candidates, mode)
+                for item, candidates in zip(items, candidate_lists)
+            ),
+            return_exceptions=True,
+        )
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Bulk review failed: job_id=%s, review_id=%s, %s",
+                    job.job_id,
+                    item.review_id,
+                    result,
+                    exc_info=result,
+                )
+                job.failed += 1
+
+    async def _embed(
+        self, job: BulkRecommendationJob, items: list[RecommendByReviewRequest]
+    ) -> tuple[list[RecommendByReviewRequest], list[np.ndarray]]:
+        """Embeddings API 호출 단위로 임베딩한다. 실패한 호출의 리뷰만 FAILED로 보내고 나머지는 계속한다."""
+        embedded_items: list[RecommendByReviewRequest] = []
+        embeddings: list[np.ndarray] = []
+        for start in range(0, len(items), self.embedding_batch_size):
+            batch = items[start : start + self.embedding_batch_size]
+            try:
+                embeddings.extend(
+                    await self.embedding_service.embed_reviews(
+                        [item.review_content for item in batch]
+                    )
+                )
+            except EmbeddingError as exc:
+                logger.warning(
+                    "Bulk embedding batch failed: job_id=%s, size=%s, %s",
+                    job.job_id,
+                    len(batch),
+                    exc,
+                )
+                await self._fail_all(job, batch, RecommendationErrorCode.EMBEDDING_FAILED)
+                continue
+            embedded_items.extend(batch)
+        return embedded_items, embeddings
+
+    def _candidate_lists(
+        self,
+        index: AlbumVectorIndex,
+        items: list[RecommendByReviewRequest],
+        embeddings: list[np.ndarray],
+        exclusions: list[frozenset[str]],
+    ) -> list[list[AlbumCandidate]]:
+        return [
+            diversify_candidates(
+                candidates,
+                self.top_k,
+                mmr_lambda=self.mmr_lambda,
+                max_per_artist=self.max_albums_per_artist,
+                relevance=rerank_scores(self.candidate_reranker, item.review_content, candidates),
+            )
+            for item, candidates in zip(
+                items,
+                self._search(index, items, np.asarray(embeddings, dtype=np.float32), exclusions),
+            )
+        ]
+
+    async def _exclusions(
+        self, items: list[RecommendByReviewRequest]
+    ) -> list[frozenset[str]]:
+        if self.recommendation_history_repository is None:
+            return [frozenset()] * len(items)
+
+        async def lookup(item: RecommendByReviewRequest) -> frozenset[str]:
+            if not item.user_id:
+                return frozenset()
+            try:
+                return await self.recommendation_history_repository.recommended_album_ids(
+                    item.user_id, exclude_review_id=item.review_id
+                )
+            except RepositoryError as exc:
+                logger.warning(
+                    "Recommendation history lookup failed: user_id=%s, %s", item.user_id, exc
+                )
+                return frozenset()
+
+        return list(await asyncio.gather(*(lookup(item) for item in items)))
+
+    def _search(
+        self,
+        index: AlbumVectorIndex,
+        items: list[RecommendByReviewRequest],
+        queries: np.ndarray,
+        exclusions: list[frozenset[str]],
+    ) -> list[list[AlbumCandidate]]:
+        """실시간 검색과 같은 BM25/카테고리 fusion을 거친다. 벡터 검색만 행렬 하나로 묶는다."""
+        return self.album_embedding_repository.search_index_many(
+            index,
+            queries,
+            self.top_k * self.candidate_fetch_multiplier,
+            [item.review_content for item in items],
+            exclusions,
+        )
+
+    async def _complete_review(
+        self,
+        job: BulkRecommendationJob,
+        item: RecommendByReviewRequest,
+        candidates: list[AlbumCandidate],
+        mode: RecommendationMode,
+    ) -> None:
+        if not candidates:
+            await self._send_failed(job, item.review_id, RecommendationErrorCode.NO_CANDIDATES)
+            return
+
+        if mode == "economy" and self.economy_reason_scheduler is not None:
+            # 콜백은 Batch API 결과가 파싱된 뒤 scheduler가 보낸다.
+            await self.economy_reason_scheduler.enqueue(
+                item.review_id, item.review_content, candidates
+            )
+            job.completed += 1
+            return
+
+        reasons = await self.recommendation_reason_service.generate_reasons(
+            item.review_content, candidates
+        )
+        try:
+            await self.spring_callback_client.send_completed_result(
+                item.review_id, build_callback_items(candidates, reasons)
+            )
+            job.completed += 1
+            RECOMMENDATIONS_TOTAL.labels("COMPLETED").inc()
+        except Exception as exc:
+            ERRORS_TOTAL.labels(RecommendationErrorCode.CALLBACK_FAILED.value).inc()
+            logger.exception("Spring callback failed: review_id=%s, %s", item.review_id, exc)
+            job.failed += 1
+
+    async def _fail_all(
+        self,
+        job: BulkRecommendationJob,
+        items: list[RecommendByReviewRequest],
+        error_code: RecommendationErrorCode,
+    ) -> None:
+        for item in items:
+            await self._send_failed(job, item.review_id, error_code)
+
+    async def _send_failed(
+        self, job: BulkRecommendationJob, review_id: int, error_code: RecommendationErrorCode
+    ) -> None:
+        job.failed += 1
+        ERRORS_TOTAL.labels(error_code.value).inc()
+        RECOMMENDATIONS_TOTAL.labels("FAILED").inc()
+        try:
+            await self.spring_callback_client.send_failed_result(
+                review_id, error_code, FAILURE_MESSAGES[error_code]
+            )
+        except Exception as exc:
+            logger.exception("Spring callback failed: review_id=%s, %s", review_id, exc)
@@ -0,0 +1,103 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.schemas.recommendation import AlbumCandidate
+
+
+def _artist_key(candidate: AlbumCandidate) -> str:
+    return " ".join(str(getattr(candidate, "artist_name", "") or "").lower().split())
+
+
+def _embedding_matrix(candidates: Sequence[AlbumCandidate]) -> Optional[np.ndarray]:
+    vectors = [getattr(candidate, "embedding", None) for candidate in candidates]
+    if any(vector is None for vector in vectors):
+        return None
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def scale_to_similarity(
+    scores: Sequence[float], candidates: Sequence[AlbumCandidate]
+) -> np.ndarray:
+    """후보 집합 안에서 min-max로 맞춘 점수를 그 후보들의 similarity 범위로 옮긴다.
+
+    reranker의 sigmoid 확률은 0~1 전체에 퍼지고 코사인 유사도는 좁은 구간에 몰려 있어,
+    그대로 MMR 관련도로 쓰면 중복 항(코사인)보다 관련도가 훨씬 크게 작용한다.
+    순서는 reranker 점수 그대로 두고 크기만 similarity를 쓸 때와 같게 맞춘다.
+    similarity가 모두 같으면 0~1 범위를 쓴다.
+    """
+    scores = np.asarray(scores, dtype=np.float32)
+    spread = float(scores.max() - scores.min()) if scores.size else 0.0
+    if spread <= 0:
+        return np.asarray([float(candidate.similarity) for candidate in candidates], np.float32)
+    normalized = (scores - scores.min()) / spread
+    similarity = np.asarray([float(candidate.similarity) for candidate in candidates], np.float32)
+    low, high = float(similarity.min()), float(similarity.max())
+    if high <= low:
+        return normalized
+    return low + normalized * (high - low)
+
+
+def diversify_candidates(
+    candidates: Sequence[AlbumCandidate],
+    top_k: int,
+    mmr_lambda: float = 0.7,
+    max_per_artist: int = 1,
+    relevance: Optional[Sequence[float]] = None,
+) -> list[AlbumCandidate]:
+    """over-fetch한 후보에서 maximal marginal relevance로 서로 다른 top_k를 고른다.
+
+    - 점수: `lambda * similarity - (1 - lambda) * max(이미 고른 후보와의 코사인 유사도)`
+    - 같은 앨범(평론만 다른 row)은 한 번만 고른다.
+    - 아티스트당 `max_per_artist`개까지만 고르고, 그래도 top_k가 차지 않으면 제약을 풀어 채운다.
+    - 후보 임베딩이 하나라도 없으면 중복 항은 빼고 similarity 순서에 제약만 적용한다.
+    - `relevance`를 주면(reranker 점수) similarity 대신 그 값을 관련도로 쓴다.
+      similarity와 같은 크기여야 하므로 reranker 점수는 `scale_to_similarity`를 거친다.
+    """
+    count = len(candidates)
+    if count == 0 or top_k <= 0:
+        return []
+
+    if relevance is None:
+        relevance = [float(candidate.similarity) for candidate in candidates]
+    relevance = np.asarray(relevance, dtype=np.float32)
+    embeddings = _embedding_matrix(candidates)
+    # 후보 수(수십 개) x 후보 수 유사도 행렬은 한 번에 계산해도 작다.
+    pairwise = None if embeddings is None else embeddings @ embeddings.T
+    max_redundancy = np.zeros(count, dtype=np.float32)
+
+    artists = [_artist_key(candidate) for candidate in candidates]
+    album_ids = [candidate.album_id for candidate in candidates]
+    available = np.ones(count, dtype=bool)
+    artist_counts: dict[str, int] = {}
+    selected: list[int] = []
+
+    for relaxed in (False, True):
+        while len(selected) < top_k:
+            eligible = available.copy()
+            if not relaxed:
+                for position in np.flatnonzero(eligible):
+                    artist = artists[position]
+                    if artist and artist_counts.get(artist, 0) >= max_per_artist:
+                        eligible[position] = False
+            if not eligible.any():
+                break
+
+            scores = mmr_lambda * relevance - (1.0 - mmr_lambda) * max_redundancy
+            scores[~eligible] = -np.inf
+            chosen = int(np.argmax(scores))
+            selected.append(chosen)
+            artist_counts[artists[chosen]] = artist_counts.get(artists[chosen], 0) + 1
+
+            # 같은 앨범의 다른 평론 row는 제약을 풀어도 다시 고르지 않는다.
+            available[chosen] = False
+            for position in np.flatnonzero(available):
+                if album_ids[position] == album_ids[chosen]:
+                    available[position] = False
+            if pairwise is not None:
+                np.maximum(max_redundancy, pairwise[chosen], out=max_redundancy)
+
+    return [candidates[position] for position in selected]
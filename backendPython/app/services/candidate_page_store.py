@@ -0,0 +1,89 @@
+import dataclasses
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError
+from app.schemas.recommendation import AlbumCandidate
+from app.services.recommendation_service import PagedCandidates
+
+
+class CandidatePageStore:
+    """paged 모드로 검색해 둔 후보를 프로세스 간에 공유하는 로컬 SQLite 저장소.
+
+    첫 page를 만든 worker와 다음 page 요청을 받은 front end가 다른 프로세스여도 같은 후보를 읽는다.
+    `LruCache`와 같은 get/set 인터페이스라 service는 어느 쪽을 받아도 같게 동작한다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = settings.CANDIDATE_PAGE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not path:
+            raise ConfigurationError("CandidatePageStore requires a database path.")
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candidate_pages (
+                review_id INTEGER PRIMARY KEY,
+                review_content TEXT NOT NULL,
+                candidates TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, review_id: int) -> Optional[PagedCandidates]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT review_content, candidates FROM candidate_pages "
+                "WHERE review_id = ? AND expires_at > ?",
+                (review_id, self._clock()),
+            ).fetchone()
+        if row is None:
+            return None
+        return PagedCandidates(
+            row[0], [AlbumCandidate(**values) for values in json.loads(row[1])]
+        )
+
+    def set(self, review_id: int, paged: PagedCandidates) -> None:
+        now = self._clock()
+        candidates = json.dumps(
+            [dataclasses.asdict(candidate) for candidate in paged.candidates],
+            ensure_ascii=False,
+        )
+        with self._lock:
+            # 만료된 후보는 쓰는 쪽에서 지워 파일이 계속 커지지 않게 한다.
+            self._connection.execute(
+                "DELETE FROM candidate_pages WHERE expires_at <= ?", (now,)
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO candidate_pages "
+                "(review_id, review_content, candidates, expires_at) VALUES (?, ?, ?, ?)",
+                (review_id, paged.review_content, candidates, now + self.ttl_seconds),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM candidate_pages WHERE expires_at > ?",
+                (self._clock(),),
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,142 @@
+import datetime
+import json
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.exceptions import RepositoryError
+from app.repositories.album_lexical_index import tokenize
+from app.schemas.recommendation import AlbumCandidate
+
+
+FEATURE_NAMES = ("similarity", "lexical_overlap", "rating", "recency")
+
+# allthatjazz 평론 평점은 5점 만점이다.
+RATING_SCALE = 5.0
+RECENCY_HALF_LIFE_YEARS = 10.0
+# 평점/발행일이 없는 후보는 중간값으로 둬서 값이 있는 후보보다 불리하지 않게 한다.
+MISSING_FEATURE_VALUE = 0.5
+
+
+def lexical_overlap(query_terms: set[str], candidate: AlbumCandidate) -> float:
+    """감상문 token 중 후보 평론(요약 + 본문)에도 나오는 비율."""
+    if not query_terms:
+        return 0.0
+    terms = set(tokenize(f"{candidate.review_summary} {candidate.review_content}"))
+    return len(query_terms & terms) / len(query_terms)
+
+
+def candidate_features(
+    query_text: str,
+    candidates: Sequence[AlbumCandidate],
+    current_year: Optional[int] = None,
+) -> np.ndarray:
+    """후보마다 FEATURE_NAMES 순서의 feature 행을 만든다. 모든 값은 0~1 범위다."""
+    current_year = current_year or datetime.date.today().year
+    query_terms = set(tokenize(query_text or ""))
+    features = np.full(
+        (len(candidates), len(FEATURE_NAMES)), MISSING_FEATURE_VALUE, dtype=np.float32
+    )
+    for row, candidate in enumerate(candidates):
+        features[row, 0] = float(candidate.similarity)
+        features[row, 1] = lexical_overlap(query_terms, candidate)
+        if candidate.rating is not None:
+            features[row, 2] = min(max(candidate.rating / RATING_SCALE, 0.0), 1.0)
+        if candidate.published_year:
+            age = max(current_year - candidate.published_year, 0)
+            features[row, 3] = 0.5 ** (age / RECENCY_HALF_LIFE_YEARS)
+    return features
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -30.0, 30.0)))
+
+
+class LinearReranker:
+    """표준화한 feature의 로지스틱 회귀 점수로 검색 후보의 관련도를 다시 매긴다.
+
+    점수는 0~1 확률이라 코사인 유사도와 크기가 다르다. MMR 관련도로 쓰기 전에
+    `scale_to_similarity`로 후보들의 similarity 범위에 맞춘다. 가중치는
+    `app.jobs.train_reranker`가 클릭/채택 로그로 학습해 JSON 파일로 저장한다.
+    """
+
+    def __init__(
+        self,
+        weights: Sequence[float],
+        bias: float = 0.0,
+        mean: Optional[Sequence[float]] = None,
+        scale: Optional[Sequence[float]] = None,
+    ):
+        size = len(FEATURE_NAMES)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.mean = np.zeros(size, np.float32) if mean is None else np.asarray(mean, np.float32)
+        self.scale = np.ones(size, np.float32) if scale is None else np.asarray(scale, np.float32)
+        if not (self.weights.shape == self.mean.shape == self.scale.shape == (size,)):
+            raise RepositoryError("Reranker parameters do not match the feature set.")
+        self.scale[self.scale == 0] = 1.0
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        standardized = (np.asarray(features, dtype=np.float32) - self.mean) / self.scale
+        return _sigmoid(standardized @ self.weights + self.bias)
+
+    def rerank_scores(
+        self, query_text: str, candidates: Sequence[AlbumCandidate]
+    ) -> np.ndarray:
+        return self.score(candidate_features(query_text, candidates))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "model": "linear",
+                    "features": list(FEATURE_NAMES),
+                    "weights": self.weights.tolist(),
+                    "bias": self.bias,
+                    "mean": self.mean.tolist(),
+                    "scale": self.scale.tolist(),
+                },
+                file,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearReranker":
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("model") != "linear" or tuple(data["features"]) != FEATURE_NAMES:
+                raise ValueError(f"unsupported model: {data.get('model')}, {data['features']}")
+            return cls(data["weights"], data["bias"], data["mean"], data["scale"])
+        except (OSError, KeyError, TypeError, ValueError) as exc:
+            raise RepositoryError(f"Candidate reranker load failed: {exc}") from exc
+
+
+def fit_linear_reranker(
+    features: np.ndarray,
+    labels: np.ndarray,
+    l2: float = 1e-3,
+    epochs: int = 500,
+    learning_rate: float = 0.5,
+) -> LinearReranker:
+    """L2 정규화 로지스틱 회귀를 full-batch gradient descent로 학습한다.
+
+    학습 예제는 수만 건 이하라 후보 행렬 전체로 한 번에 gradient를 계산한다.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.float64)
+    if features.ndim != 2 or features.shape[1] != len(FEATURE_NAMES):
+        raise ValueError("features must have one column per reranker feature.")
+    if len(features) != len(labels) or len(labels) == 0:
+        raise ValueError("features and labels must be non-empty and aligned.")
+
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    standardized = (features - mean) / scale
+    weights = np.zeros(features.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        error = _sigmoid(standardized @ weights + bias) - labels
+        weights -= learning_rate * (standardized.T @ error / len(labels) + l2 * weights)
+        bias -= learning_rate * float(error.mean())
+    return LinearReranker(weights, bias, mean, scale)
@@ -0,0 +1,397 @@
+import asyncio
+import dataclasses
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError
+from app.schemas.recommendation import AlbumCandidate, RecommendationReason
+from app.services.openai_batch import (
+    TERMINAL_STATUSES,
+    build_batch_request,
+    create_batch_job,
+    parse_batch_results,
+)
+from app.services.recommendation_service import build_callback_items
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EconomyRequest:
+    review_id: int
+    review_content: str
+    candidates: list[AlbumCandidate]
+    batch_attempts: int = 0
+
+
+class EconomyBatchStore:
+    """Batch API 결과를 기다리는 추천 요청을 재시작 후에도 이어갈 수 있게 보관한다."""
+
+    def __init__(self, path: str):
+        if not path:
+            raise ConfigurationError("EconomyBatchStore requires a database path.")
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS economy_reason_requests (
+                review_id INTEGER PRIMARY KEY,
+                review_content TEXT NOT NULL,
+                candidates TEXT NOT NULL,
+                batch_id TEXT,
+                created_at REAL NOT NULL,
+                batch_failures INTEGER NOT NULL DEFAULT 0,
+                batch_attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {
+            row[1]
+            for row in self._connection.execute(
+                "PRAGMA table_info(economy_reason_requests)"
+            ).fetchall()
+        }
+        # 컬럼을 추가하기 전에 만든 store 파일도 그대로 이어서 쓴다.
+        for column in ("batch_failures", "batch_attempts"):
+            if column not in columns:
+                self._connection.execute(
+                    "ALTER TABLE economy_reason_requests "
+                    f"ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                )
+        self._connection.commit()
+
+    def add(
+        self, review_id: int, review_content: str, candidates: Sequence[AlbumCandidate]
+    ) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO economy_reason_requests "
+                "(review_id, review_content, candidates, batch_id, created_at) "
+                "VALUES (?, ?, ?, NULL, ?)",
+                (
+                    review_id,
+                    review_content,
+                    json.dumps(
+                        [
+                            dataclasses.asdict(dataclasses.replace(candidate, embedding=None))
+                            for candidate in candidates
+                        ],
+                        ensure_ascii=False,
+                    ),
+                    time.time(),
+                ),
+            )
+
+    def unsubmitted(self) -> list[EconomyRequest]:
+        return self._select("batch_id IS NULL", ())
+
+    def for_batch(self, batch_id: str) -> list[EconomyRequest]:
+        return self._select("batch_id = ?", (batch_id,))
+
+    def submitted_batch_ids(self) -> list[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT batch_id FROM economy_reason_requests "
+                "WHERE batch_id IS NOT NULL"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def assign_batch(self, review_ids: Sequence[int], batch_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE economy_reason_requests SET batch_id = ? WHERE review_id = ?",
+                [(batch_id, review_id) for review_id in review_ids],
+            )
+
+    def record_batch_failure(self, batch_id: str) -> int:
+        """batch 조회/수집 실패 횟수를 늘리고 늘어난 횟수를 돌려준다."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE economy_reason_requests SET batch_failures = batch_failures + 1 "
+                "WHERE batch_id = ?",
+                (batch_id,),
+            )
+            row = self._connection.execute(
+                "SELECT MAX(batch_failures) FROM economy_reason_requests WHERE batch_id = ?",
+                (batch_id,),
+            ).fetchone()
+        return row[0] or 0
+
+    def release_batch(self, batch_id: str) -> None:
+        """batch에 묶인 요청을 미제출 상태로 되돌려 다음 주기에 새 batch로 다시 제출한다."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE economy_reason_requests SET batch_id = NULL, batch_failures = 0 "
+                "WHERE batch_id = ?",
+                (batch_id,),
+            )
+
+    def retry(self, review_ids: Sequence[int]) -> None:
+        """결과 없이 끝난 batch의 요청을 시도 횟수를 늘려 미제출 상태로 되돌린다."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE economy_reason_requests SET batch_id = NULL, batch_failures = 0, "
+                "batch_attempts = batch_attempts + 1 WHERE review_id = ?",
+                [(review_id,) for review_id in review_ids],
+            )
+
+    def remove(self, review_ids: Sequence[int]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM economy_reason_requests WHERE review_id = ?",
+                [(review_id,) for review_id in review_ids],
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM economy_reason_requests"
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _select(self, where: str, params: tuple) -> list[EconomyRequest]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT review_id, review_content, candidates, batch_attempts "
+                f"FROM economy_reason_requests WHERE {where} ORDER BY created_at",
+                params,
+            ).fetchall()
+        return [
+            EconomyRequest(
+                review_id=row[0],
+                review_content=row[1],
+                candidates=[AlbumCandidate(**values) for values in json.loads(row[2])],
+                batch_attempts=row[3],
+            )
+            for row in rows
+        ]
+
+
+class EconomyReasonScheduler:
+    """추천 사유 프롬프트를 모아 OpenAI Batch API로 제출하고, 결과가 나오면 Spring에 콜백한다.
+
+    Realtime Chat API 대비 비용은 절반이지만 결과는 최대 24시간 뒤에 도착한다.
+    store는 동기 SQLite라 콜백 outbox와 같이 모든 호출을 `asyncio.to_thread`로 보낸다.
+    """
+
+    def __init__(
+        self,
+        store: EconomyBatchStore,
+        openai_client: Any,
+        recommendation_reason_service,
+        spring_callback_client,
+        interval_seconds: float = settings.ECONOMY_BATCH_INTERVAL_SECONDS,
+        max_requests_per_batch: int = settings.ECONOMY_BATCH_MAX_REQUESTS,
+        max_batch_failures: int = settings.ECONOMY_BATCH_MAX_FAILURES,
+        max_batch_attempts: int = settings.ECONOMY_BATCH_MAX_ATTEMPTS,
+    ):
+        if store is None:
+            raise ConfigurationError("EconomyReasonScheduler requires an EconomyBatchStore.")
+        if openai_client is None:
+            raise ConfigurationError("EconomyReasonScheduler requires an openai client.")
+        self.store = store
+        self.openai_client = openai_client
+        self.recommendation_reason_service = recommendation_reason_service
+        self.spring_callback_client = spring_callback_client
+        self.interval_seconds = interval_seconds
+        self.max_requests_per_batch = max_requests_per_batch
+        self.max_batch_failures = max(1, max_batch_failures)
+        self.max_batch_attempts = max(1, max_batch_attempts)
+        self._runner: Optional[asyncio.Task] = None
+
+    async def enqueue(
+        self, review_id: int, review_content: str, candidates: Sequence[AlbumCandidate]
+    ) -> None:
+        await asyncio.to_thread(self.store.add, review_id, review_content, candidates)
+
+    async def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # 제출/대기 중인 요청은 store에 남아 다음 기동 때 이어서 처리한다.
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def run_once(self) -> None:
+        # 수집이 실패해도 새 요청 제출은 막지 않는다.
+        try:
+            await self.collect_finished()
+        except Exception as exc:
+            logger.exception("Economy reason batch collection failed: %s", exc)
+        await self.submit_pending()
+
+    async def submit_pending(self) -> Optional[str]:
+        requests = self._take_within_limit(await asyncio.to_thread(self.store.unsubmitted))
+        if not requests:
+            return None
+
+        batch_requests = [
+            build_batch_request(
+                self._custom_id(request.review_id, index),
+                {
+                    "model": settings.OPENAI_CHAT_MODEL,
+                    "messages": self.recommendation_reason_service.build_messages(
+                        request.review_content, candidate
+                    ),
+                },
+            )
+            for request in requests
+            for index, candidate in enumerate(request.candidates)
+        ]
+        batch_id = await create_batch_job(
+            self.openai_client, "recommendation_reasons.jsonl", batch_requests
+        )
+        await asyncio.to_thread(
+            self.store.assign_batch, [request.review_id for request in requests], batch_id
+        )
+        logger.info(
+            "Economy reason batch submitted: batch_id=%s, reviews=%s, requests=%s",
+            batch_id,
+            len(requests),
+            len(batch_requests),
+        )
+        return batch_id
+
+    async def collect_finished(self) -> int:
+        collected = 0
+        for batch_id in await asyncio.to_thread(self.store.submitted_batch_ids):
+            # batch 하나의 조회 실패가 나머지 batch 수집을 막지 않게 batch마다 격리한다.
+            try:
+                collected += await self._collect_batch(batch_id)
+            except Exception as exc:
+                await self._record_failure(batch_id, exc)
+        return collected
+
+    async def _collect_batch(self, batch_id: str) -> int:
+        batch = await self.openai_client.batches.retrieve(batch_id)
+        if batch.status not in TERMINAL_STATUSES:
+            return 0
+        reasons = {}
+        if getattr(batch, "output_file_id", None):
+            content = await self.openai_client.files.content(batch.output_file_id)
+            reasons = parse_batch_results(content.text)
+        requests = await asyncio.to_thread(self.store.for_batch, batch_id)
+        if batch.status != "completed":
+            logger.warning(
+                "Economy reason batch ended early: batch_id=%s, status=%s, parsed=%s",
+                batch_id,
+                batch.status,
+                len(reasons),
+            )
+            requests = await self._retry_unanswered(batch_id, requests, reasons)
+        return await self._deliver(requests, reasons)
+
+    async def _retry_unanswered(
+        self, batch_id: str, requests: list[EconomyRequest], reasons: dict[str, str]
+    ) -> list[EconomyRequest]:
+        """결과를 하나도 받지 못한 요청은 시도 상한 전까지 새 batch로 다시 내고, 나머지만 돌려준다.
+
+        failed/expired/cancelled batch는 대개 일시적인 Batch API 장애라 바로 fallback 사유로
+        보내면 economy 경로를 버리게 된다.
+        """
+        retry_ids = {
+            request.review_id
+            for request in requests
+            if request.batch_attempts + 1 < self.max_batch_attempts
+            and not any(
+                self._custom_id(request.review_id, index) in reasons
+                for index in range(len(request.candidates))
+            )
+        }
+        if not retry_ids:
+            return requests
+        await asyncio.to_thread(self.store.retry, sorted(retry_ids))
+        logger.warning(
+            "Economy reason batch requests resubmitting: batch_id=%s, reviews=%s",
+            batch_id,
+            len(retry_ids),
+        )
+        return [request for request in requests if request.review_id not in retry_ids]
+
+    async def _record_failure(self, batch_id: str, exc: Exception) -> None:
+        failures = await asyncio.to_thread(self.store.record_batch_failure, batch_id)
+        logger.warning(
+            "Economy reason batch collection failed: batch_id=%s, failures=%s, %s",
+            batch_id,
+            failures,
+            exc,
+        )
+        if failures >= self.max_batch_failures:
+            # 계속 조회되지 않는 batch(삭제, 권한 변경 등)는 버리고 요청을 새 batch로 다시 낸다.
+            logger.error(
+                "Economy reason batch abandoned, resubmitting requests: batch_id=%s",
+                batch_id,
+            )
+            await asyncio.to_thread(self.store.release_batch, batch_id)
+
+    async def _deliver(
+        self, requests: list[EconomyRequest], reasons: dict[str, str]
+    ) -> int:
+        delivered = 0
+        for request in requests:
+            # 누락되거나 실패한 사유는 realtime 경로와 같은 fallback 문장으로 채운다.
+            request_reasons = [
+                RecommendationReason(
+                    album_id=candidate.album_id,
+                    recommendation_reason=reasons.get(
+                        self._custom_id(request.review_id, index)
+                    )
+                    or self.recommendation_reason_service.build_fallback_reason(
+                        request.review_content, candidate
+                    ),
+                )
+                for index, candidate in enumerate(request.candidates)
+            ]
+            try:
+                await self.spring_callback_client.send_completed_result(
+                    request.review_id,
+                    build_callback_items(request.candidates, request_reasons),
+                )
+            except Exception as exc:
+                logger.exception(
+                    "Spring callback failed: review_id=%s, %s", request.review_id, exc
+                )
+                continue
+            await asyncio.to_thread(self.store.remove, [request.review_id])
+            delivered += 1
+        return delivered
+
+    def _take_within_limit(self, requests: list[EconomyRequest]) -> list[EconomyRequest]:
+        taken = []
+        request_count = 0
+        for request in requests:
+            request_count += len(request.candidates)
+            if taken and request_count > self.max_requests_per_batch:
+                break
+            taken.append(request)
+        return taken
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:
+                logger.exception("Economy reason batch cycle failed: %s", exc)
+            await asyncio.sleep(self.interval_seconds)
+
+    @staticmethod
+    def _custom_id(review_id: int, index: int) -> str:
+        return f"reason-{review_id}-{index}"
@@ -1,21 +1,84 @@
-from typing import Any, List
+import base64
+from typing import Any, List, Optional
 
+import numpy as np
+
+from app.core.cache import LruCache, content_hash
 from app.core.config import settings
 from app.core.exceptions import ConfigurationError, EmbeddingError
+from app.core.metrics import record_token_usage
+
+
+def decode_embedding(value: Any) -> np.ndarray:
+    """`encoding_format="base64"` 응답(little-endian float32 bytes)을 복사 없이 ndarray로 읽는다.
+
+    base64를 지원하지 않는 호환 서버나 테스트 client가 float list를 주면 그대로 변환한다.
+    """
+    if isinstance(value, str):
+        return np.frombuffer(base64.b64decode(value), dtype="<f4")
+    return np.asarray(value, dtype=np.float32)
 
 
 class EmbeddingService:
-    def __init__(self, openai_client: Any):
+    def __init__(self, openai_client: Any, cache: Optional[LruCache] = None):
         if openai_client is None:
             raise ConfigurationError("EmbeddingService requires an openai client.")
         self.openai_client = openai_client
+        self.cache = cache
+
+    async def embed_review(self, review_content: str) -> np.ndarray:
+        cache_key = content_hash(settings.OPENAI_EMBEDDING_MODEL, review_content)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-    async def embed_review(self, review_content: str) -> List[float]:
         try:
             response = await self.openai_client.embeddings.create(
                 model=settings.OPENAI_EMBEDDING_MODEL,
                 input=review_content,
+                encoding_format="base64",
             )
-            return list(response.data[0].embedding)
+            embedding = decode_embedding(response.data[0].embedding)
         except Exception as exc:
             raise EmbeddingError(str(exc)) from exc
+        record_token_usage(settings.OPENAI_EMBEDDING_MODEL, getattr(response, "usage", None))
+
+        if self.cache is not None:
+            self.cache.set(cache_key, embedding)
+        return embedding
+
+    async def embed_reviews(
+        self, review_contents: List[str], batch_size: int = settings.EMBEDDING_BATCH_SIZE
+    ) -> List[np.ndarray]:
+        """여러 감상문을 batch_size 단위 Embeddings API 호출로 묶어 임베딩한다."""
+        keys = [
+            content_hash(settings.OPENAI_EMBEDDING_MODEL, content)
+            for content in review_contents
+        ]
+        embeddings: List[Optional[np.ndarray]] = [
+            self.cache.get(key) if self.cache is not None else None for key in keys
+        ]
+        missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start : start + batch_size]
+            try:
+                response = await self.openai_client.embeddings.create(
+                    model=settings.OPENAI_EMBEDDING_MODEL,
+                    input=[review_contents[index] for index in batch],
+                    encoding_format="base64",
+                )
+                # 응답 순서가 아니라 data[].index로 입력 위치를 맞춘다.
+                for item in response.data:
+                    embeddings[batch[item.index]] = decode_embedding(item.embedding)
+            except Exception as exc:
+                raise EmbeddingError(str(exc)) from exc
+            record_token_usage(
+                settings.OPENAI_EMBEDDING_MODEL, getattr(response, "usage", None)
+            )
+            if self.cache is not None:
+                for index in batch:
+                    self.cache.set(keys[index], embeddings[index])
+
+        return embeddings
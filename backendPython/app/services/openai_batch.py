@@ -0,0 +1,71 @@
+"""OpenAI Batch API 입력 JSONL 생성, 작업 제출, 결과 파싱.
+
+요청 줄 형식(custom_id/method/url/body)과 결과 파싱 규칙은 pipeline의
+`OpenAIService.build_batch_requests`/`parse_batch_results`와 같다. pipeline은 별도
+Airflow 이미지로 배포돼 여기서 import할 수 없으므로, backend에서는 이 모듈 하나만 쓴다.
+"""
+import json
+import logging
+from typing import Any, Iterable
+
+from app.core.metrics import record_token_usage
+
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def build_batch_request(
+    custom_id: str, body: dict[str, Any], endpoint: str = CHAT_COMPLETIONS_ENDPOINT
+) -> dict[str, Any]:
+    return {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body}
+
+
+def encode_batch_file(requests: Iterable[dict[str, Any]]) -> bytes:
+    return "\n".join(
+        json.dumps(request, ensure_ascii=False) for request in requests
+    ).encode("utf-8")
+
+
+async def create_batch_job(
+    openai_client: Any,
+    filename: str,
+    requests: Iterable[dict[str, Any]],
+    endpoint: str = CHAT_COMPLETIONS_ENDPOINT,
+) -> str:
+    """요청을 JSONL 파일로 올리고 Batch 작업을 만들어 batch id를 돌려준다."""
+    uploaded = await openai_client.files.create(
+        file=(filename, encode_batch_file(requests)),
+        purpose="batch",
+    )
+    batch = await openai_client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=endpoint,
+        completion_window=COMPLETION_WINDOW,
+    )
+    return batch.id
+
+
+def parse_batch_results(text: str) -> dict[str, str]:
+    """결과 JSONL에서 성공(status 200)한 응답의 message content를 custom_id별로 모은다."""
+    contents = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response["body"]
+            content = body["choices"][0]["message"]["content"].strip()
+        except Exception as exc:
+            logger.warning("Batch result parse failed: %s", exc)
+            continue
+        record_token_usage(body.get("model"), body.get("usage"))
+        if content:
+            contents[result["custom_id"]] = content
+    return contents
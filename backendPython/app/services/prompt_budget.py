@@ -0,0 +1,165 @@
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from app.repositories.album_lexical_index import tokenize
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 문자 수 기반 추정으로 센다.
+    tiktoken = None
+
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_PATTERN = re.compile(r"[^.!?。\n]+(?:[.!?。]+|\n|$)")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+# tiktoken 없이 셀 때의 문자당 token 추정치. 한글 음절은 대략 1 token, 그 외는 4자당 1 token.
+_HANGUL_TOKEN_COST = 1.0
+_OTHER_TOKEN_COST = 0.25
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]) -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def preload_encoding(model: Optional[str] = None) -> bool:
+    """tokenizer를 미리 적재한다. 처음 쓰는 encoding은 BPE 파일을 내려받으므로
+    첫 추천 요청이 그 시간을 기다리지 않도록 기동 시점에 부른다."""
+    try:
+        return _encoding(model) is not None
+    except Exception as exc:
+        logger.warning("Tokenizer preload failed, counting by characters until it loads: %s", exc)
+        return False
+
+
+def _char_costs(text: str) -> List[float]:
+    return [
+        0.0
+        if char.isspace()
+        else _HANGUL_TOKEN_COST
+        if _HANGUL_PATTERN.match(char)
+        else _OTHER_TOKEN_COST
+        for char in text
+    ]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(sum(_char_costs(text)))
+
+
+def truncate_to_tokens(text: str, budget: int, model: Optional[str] = None) -> str:
+    """앞에서부터 budget token까지만 남긴다."""
+    if budget <= 0 or not text:
+        return ""
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= budget else encoding.decode(tokens[:budget])
+
+    used = 0.0
+    for end, cost in enumerate(_char_costs(text)):
+        used += cost
+        if used > budget:
+            return text[:end].rstrip()
+    return text
+
+
+def split_sentences(text: str) -> List[str]:
+    return [
+        sentence.strip()
+        for sentence in _SENTENCE_PATTERN.findall(text or "")
+        if sentence.strip()
+    ]
+
+
+def _cosine(left: Counter, right: Counter) -> float:
+    if not left or not right:
+        return 0.0
+    dot = sum(count * right[token] for token, count in left.items() if token in right)
+    if dot == 0:
+        return 0.0
+    norm = math.sqrt(sum(v * v for v in left.values()) * sum(v * v for v in right.values()))
+    return dot / norm
+
+
+def select_excerpt(
+    text: str, reference: str, budget: int, model: Optional[str] = None
+) -> str:
+    """reference와 겹치는 문장을 budget 안에서 골라 원문 순서대로 잇는다.
+
+    관련도는 BM25 색인과 같은 token(한글 bigram)의 코사인 유사도다. 겹치는 문장이
+    없으면 앞 문장부터 채운다.
+    """
+    if budget <= 0:
+        return ""
+    sentences = split_sentences(text)
+    if not sentences:
+        return ""
+    reference_terms = Counter(tokenize(reference))
+    scored = [
+        (_cosine(Counter(tokenize(sentence)), reference_terms), -position, position)
+        for position, sentence in enumerate(sentences)
+    ]
+
+    chosen: list[int] = []
+    used = 0
+    for _, _, position in sorted(scored, reverse=True):
+        cost = count_tokens(sentences[position], model)
+        if used + cost <= budget:
+            chosen.append(position)
+            used += cost
+    if not chosen:
+        return truncate_to_tokens(sentences[0], budget, model)
+    return " ".join(sentences[position] for position in sorted(chosen))
+
+
+@dataclass
+class ReasonPromptParts:
+    review_content: str
+    review_summary: str
+    review_excerpt: str
+
+
+def budget_prompt_parts(
+    review_content: str,
+    review_summary: str,
+    critic_review: str,
+    total_budget: int,
+    review_budget: int,
+    summary_budget: int,
+    model: Optional[str] = None,
+) -> ReasonPromptParts:
+    """감상문, 평론 요약, 평론 발췌가 합쳐서 total_budget token을 넘지 않게 나눈다.
+
+    감상문과 요약은 각자 몫까지 앞에서 자르고, 쓰고 남은 token은 모두 평론 발췌에 준다.
+    발췌는 감상문과 관련도가 높은 문장을 고른다. total_budget이 0 이하면 자르지 않는다.
+    """
+    if total_budget <= 0:
+        return ReasonPromptParts(review_content, review_summary, critic_review)
+
+    review = truncate_to_tokens(review_content, min(review_budget, total_budget), model)
+    remaining = total_budget - count_tokens(review, model)
+    summary = truncate_to_tokens(review_summary, min(summary_budget, remaining), model)
+    remaining -= count_tokens(summary, model)
+    if count_tokens(critic_review, model) <= remaining:
+        excerpt = critic_review
+    else:
+        excerpt = select_excerpt(critic_review, review_content, remaining, model)
+    return ReasonPromptParts(review, summary, excerpt)
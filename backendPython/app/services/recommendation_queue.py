@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.exceptions import ConfigurationError
+from app.core.tracing import parse_traceparent, tracer
+from app.services.recommendation_service import recommendation_handler
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecommendationJob:
+    id: int
+    review_id: int
+    review_content: str
+    mode: str
+    user_id: Optional[str]
+    traceparent: Optional[str]
+    attempts: int
+
+
+class RecommendationJobQueue:
+    """HTTP front end와 추천 worker 프로세스가 공유하는 로컬 SQLite 작업 큐.
+
+    worker는 작업을 lease로 가져가고, lease가 끝나도록 완료하지 못하면(프로세스 종료 등)
+    다른 worker가 다시 가져간다. `max_attempts`번 가져간 작업은 DEAD로 남긴다.
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DEAD = "DEAD"
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = settings.RECOMMENDATION_QUEUE_LEASE_SECONDS,
+        max_attempts: int = settings.RECOMMENDATION_QUEUE_MAX_ATTEMPTS,
+    ):
+        if not path:
+            raise ConfigurationError("RecommendationJobQueue requires a database path.")
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        # 트랜잭션을 직접 연다. claim은 BEGIN IMMEDIATE로 다른 프로세스의 claim과 겹치지 않는다.
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS recommendation_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                review_id INTEGER NOT NULL,
+                review_content TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                user_id TEXT,
+                traceparent TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_until REAL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recommendation_jobs_status "
+            "ON recommendation_jobs (status, id)"
+        )
+
+    def add(
+        self,
+        review_id: int,
+        review_content: str,
+        mode: str = "realtime",
+        user_id: Optional[str] = None,
+        traceparent: Optional[str] = None,
+    ) -> int:
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO recommendation_jobs "
+                "(review_id, review_content, mode, user_id, traceparent, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (review_id, review_content, mode, user_id, traceparent, self.PENDING, time.time()),
+            )
+            return cursor.lastrowid
+
+    def claim(
+        self, worker_id: str, limit: int = 1, now: Optional[float] = None
+    ) -> list[RecommendationJob]:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._connection.execute(
+                    "SELECT id, review_id, review_content, mode, user_id, traceparent, attempts "
+                    "FROM recommendation_jobs "
+                    "WHERE status = ? OR (status = ? AND lease_until < ?) "
+                    "ORDER BY id LIMIT ?",
+                    (self.PENDING, self.RUNNING, now, limit),
+                ).fetchall()
+                jobs = []
+                for row in rows:
+                    if row[6] >= self.max_attempts:
+                        logger.error(
+                            "Recommendation job abandoned: review_id=%s, attempts=%s",
+                            row[1],
+                            row[6],
+                        )
+                        self._connection.execute(
+                            "UPDATE recommendation_jobs SET status = ? WHERE id = ?",
+                            (self.DEAD, row[0]),
+                        )
+                        continue
+                    self._connection.execute(
+                        "UPDATE recommendation_jobs "
+                        "SET status = ?, attempts = ?, worker_id = ?, lease_until = ? "
+                        "WHERE id = ?",
+                        (self.RUNNING, row[6] + 1, worker_id, now + self.lease_seconds, row[0]),
+                    )
+                    jobs.append(RecommendationJob(*row[:6], attempts=row[6] + 1))
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def complete(self, job_id: int) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM recommendation_jobs WHERE id = ?", (job_id,)
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM recommendation_jobs WHERE status IN (?, ?)",
+                (self.PENDING, self.RUNNING),
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class RecommendationWorker:
+    """큐에서 작업을 가져와 RecommendationService로 처리한다. 동시에 최대 `concurrency`건."""
+
+    def __init__(
+        self,
+        queue: RecommendationJobQueue,
+        recommendation_service: Any,
+        worker_id: str,
+        concurrency: int = settings.RECOMMENDATION_WORKER_CONCURRENCY,
+        poll_interval_seconds: float = settings.RECOMMENDATION_WORKER_POLL_SECONDS,
+    ):
+        if queue is None:
+            raise ConfigurationError("RecommendationWorker requires a job queue.")
+        if recommendation_service is None:
+            raise ConfigurationError("RecommendationWorker requires a RecommendationService.")
+        self.queue = queue
+        self.recommendation_service = recommendation_service
+        self.worker_id = worker_id
+        self.concurrency = max(1, concurrency)
+        self.poll_interval_seconds = poll_interval_seconds
+        self._active: set[asyncio.Task] = set()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # 처리 중인 작업은 끝까지 기다린다. 끝내지 못하고 종료되면 lease 만료 후 다시 처리된다.
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self._active:
+            await asyncio.gather(*self._active, return_exceptions=True)
+
+    async def run_once(self) -> int:
+        """빈 슬롯만큼 작업을 가져와 시작하고, 가져온 건수를 돌려준다."""
+        free = self.concurrency - len(self._active)
+        if free <= 0:
+            return 0
+        jobs = await asyncio.to_thread(self.queue.claim, self.worker_id, free)
+        for job in jobs:
+            task = asyncio.create_task(self.process(job))
+            self._active.add(task)
+            task.add_done_callback(self._active.discard)
+        return len(jobs)
+
+    async def process(self, job: RecommendationJob) -> None:
+        handler = recommendation_handler(self.recommendation_service, job.mode)
+        try:
+            with tracer.start_span(
+                "recommendation.worker",
+                parent=parse_traceparent(job.traceparent),
+                review_id=job.review_id,
+                mode=job.mode,
+                attempts=job.attempts,
+            ):
+                await handler(job.review_id, job.review_content, job.user_id)
+        except Exception as exc:
+            # BackgroundTasks와 같이 실패는 기록만 한다. FAILED 콜백은 service가 보낸다.
+            logger.exception(
+                "Recommendation job failed: review_id=%s, %s", job.review_id, exc
+            )
+        finally:
+            await asyncio.to_thread(self.queue.complete, job.id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception as exc:
+                logger.exception("Recommendation job claim failed: %s", exc)
+                claimed = 0
+            if not claimed:
+                await asyncio.sleep(self.poll_interval_seconds)
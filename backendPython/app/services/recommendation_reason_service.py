@@ -1,18 +1,48 @@
 import asyncio
-from typing import Any, Iterable, List
+from typing import Any, AsyncIterator, Iterable, List, Optional
 
+from app.core.cache import LruCache, content_hash
 from app.core.config import settings
 from app.core.exceptions import ConfigurationError
+from app.core.metrics import REASON_FALLBACKS_TOTAL, record_token_usage
+from app.core.tracing import tracer
 from app.schemas.recommendation import AlbumCandidate, RecommendationReason
+from app.services.prompt_budget import budget_prompt_parts
 
 
+SYSTEM_PROMPT = "재즈 앨범 추천 사유를 간결하고 구체적인 한국어로 작성한다."
+REASON_INSTRUCTION = "이 감상문과 앨범이 어울리는 이유를 짧은 한국어 문장으로 작성해 주세요."
+# 프롬프트 문구가 바뀌면 값이 바뀌어 추천 결과 캐시가 이전 문구로 만든 결과를 버린다.
+PROMPT_VERSION = content_hash(SYSTEM_PROMPT, REASON_INSTRUCTION)[:12]
+
 class RecommendationReasonService:
-    def __init__(self, openai_client: Any):
+    def __init__(
+        self,
+        openai_client: Any,
+        cache: Optional[LruCache] = None,
+        concurrency_limiter: Optional[asyncio.Semaphore] = None,
+        prompt_token_budget: int = settings.REASON_PROMPT_TOKEN_BUDGET,
+        review_token_budget: int = settings.REASON_REVIEW_TOKEN_BUDGET,
+        summary_token_budget: int = settings.REASON_SUMMARY_TOKEN_BUDGET,
+    ):
         if openai_client is None:
             raise ConfigurationError(
                 "RecommendationReasonService requires an openai client."
             )
         self.openai_client = openai_client
+        self.cache = cache
+        self.concurrency_limiter = concurrency_limiter
+        self.prompt_token_budget = prompt_token_budget
+        self.review_token_budget = review_token_budget
+        self.summary_token_budget = summary_token_budget
+
+    @property
+    def prompt_version(self) -> str:
+        """프롬프트 문구와 token 예산. 둘 중 하나라도 바뀌면 같은 입력의 사유가 달라진다."""
+        return (
+            f"{PROMPT_VERSION}:{self.prompt_token_budget}:"
+            f"{self.review_token_budget}:{self.summary_token_budget}"
+        )
 
     async def generate_reasons(
         self, review_content: str, candidates: Iterable[AlbumCandidate]
@@ -25,39 +55,95 @@ class RecommendationReasonService:
             ]
         )
 
+    async def iter_reasons(
+        self, review_content: str, candidates: Iterable[AlbumCandidate]
+    ) -> AsyncIterator[RecommendationReason]:
+        """후보별 추천 사유를 완료되는 순서대로 내보낸다."""
+        tasks = [
+            asyncio.ensure_future(self._generate_reason(review_content, candidate))
+            for candidate in candidates
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def _generate_reason(
         self, review_content: str, candidate: AlbumCandidate
     ) -> RecommendationReason:
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_CHAT_MODEL,
-                messages=self._build_messages(review_content, candidate),
-            )
-            content = response.choices[0].message.content.strip()
-            if not content:
-                content = self.build_fallback_reason(review_content, candidate)
-        except Exception:
-            content = self.build_fallback_reason(review_content, candidate)
+        cache_key = (
+            content_hash(settings.OPENAI_CHAT_MODEL or "", review_content),
+            candidate.album_id,
+            candidate.critics_review_id,
+        )
+        with tracer.start_span("recommendation.reason", album_id=candidate.album_id) as span:
+            content = self.cache.get(cache_key) if self.cache is not None else None
+            if span is not None:
+                span.set_attribute("cache_hit", content is not None)
+
+            if content is None:
+                try:
+                    content = await self._request_reason(review_content, candidate)
+                except Exception:
+                    content = ""
+                # fallback 사유는 캐시하지 않아 다음 요청에서 LLM 생성을 다시 시도한다.
+                if content and self.cache is not None:
+                    self.cache.set(cache_key, content)
+                if not content:
+                    REASON_FALLBACKS_TOTAL.inc()
+                    if span is not None:
+                        span.set_attribute("fallback", True)
+                    content = self.build_fallback_reason(review_content, candidate)
 
         return RecommendationReason(
             album_id=candidate.album_id,
             recommendation_reason=content,
         )
 
-    def _build_messages(
+    async def _request_reason(
+        self, review_content: str, candidate: AlbumCandidate
+    ) -> str:
+        if self.concurrency_limiter is None:
+            return await self._create_completion(review_content, candidate)
+        async with self.concurrency_limiter:
+            return await self._create_completion(review_content, candidate)
+
+    async def _create_completion(
+        self, review_content: str, candidate: AlbumCandidate
+    ) -> str:
+        response = await self.openai_client.chat.completions.create(
+            model=settings.OPENAI_CHAT_MODEL,
+            messages=self.build_messages(review_content, candidate),
+        )
+        record_token_usage(settings.OPENAI_CHAT_MODEL, getattr(response, "usage", None))
+        return response.choices[0].message.content.strip()
+
+    def build_messages(
         self, review_content: str, candidate: AlbumCandidate
     ) -> list[dict[str, str]]:
+        # 긴 평론 원문을 그대로 넣지 않고, 감상문과 관련된 문장만 token 예산 안에서 고른다.
+        parts = budget_prompt_parts(
+            review_content,
+            candidate.review_summary,
+            candidate.review_content,
+            total_budget=self.prompt_token_budget,
+            review_budget=self.review_token_budget,
+            summary_budget=self.summary_token_budget,
+            model=settings.OPENAI_CHAT_MODEL,
+        )
         user_prompt = (
-            f"사용자 감상문: {review_content}\n"
+            f"사용자 감상문: {parts.review_content}\n"
             f"앨범: {candidate.artist_name} - {candidate.album_title}\n"
-            f"전문가 리뷰 요약: {candidate.review_summary}\n"
-            f"전문가 리뷰 원문 일부: {candidate.review_content}\n"
-            "이 감상문과 앨범이 어울리는 이유를 짧은 한국어 문장으로 작성해 주세요."
+            f"전문가 리뷰 요약: {parts.review_summary}\n"
+            f"전문가 리뷰 원문 일부: {parts.review_excerpt}\n"
+            f"{REASON_INSTRUCTION}"
         )
         return [
             {
                 "role": "system",
-                "content": "재즈 앨범 추천 사유를 간결하고 구체적인 한국어로 작성한다.",
+                "content": SYSTEM_PROMPT,
             },
             {"role": "user", "content": user_prompt},
         ]
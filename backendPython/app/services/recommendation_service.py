@@ -1,23 +1,58 @@
+import asyncio
+import dataclasses
 import logging
-from typing import Any, Iterable
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, Optional
+
+import numpy as np
+
 from app.schemas.recommendation import AlbumCandidate
 
 from app.clients.spring_callback_client import SpringCallbackClient
+from app.core.cache import LruCache, content_hash
 from app.core.config import settings
 from app.core.error_codes import RecommendationErrorCode
 from app.core.exceptions import ConfigurationError, EmbeddingError, RepositoryError
+from app.core.metrics import ERRORS_TOTAL, RECOMMENDATIONS_TOTAL, STAGE_SECONDS
+from app.core.tracing import tracer
 from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.user_taste_store import blend_taste
 from app.schemas.recommendation import (
     RecommendationCallbackItem,
+    RecommendationCallbackRequest,
+    RecommendationPageResponse,
     RecommendationReason,
     normalize_score,
 )
+from app.services.candidate_diversifier import diversify_candidates, scale_to_similarity
 from app.services.embedding_service import EmbeddingService
 from app.services.recommendation_reason_service import RecommendationReasonService
 
 
 logger = logging.getLogger(__name__)
 
+FAILURE_MESSAGES = {
+    RecommendationErrorCode.EMBEDDING_FAILED: "감상문 임베딩 생성에 실패했습니다.",
+    RecommendationErrorCode.SEARCH_FAILED: "유사 앨범 검색에 실패했습니다.",
+    RecommendationErrorCode.NO_CANDIDATES: "추천 후보가 없습니다.",
+}
+
+# 요청마다 label 조회를 하지 않도록 hot path에서 쓰는 metric child를 미리 만든다.
+EMBED_SECONDS = STAGE_SECONDS.labels("embed")
+SEARCH_SECONDS = STAGE_SECONDS.labels("search")
+REASON_SECONDS = STAGE_SECONDS.labels("reason")
+CALLBACK_SECONDS = STAGE_SECONDS.labels("callback")
+COMPLETED_TOTAL = RECOMMENDATIONS_TOTAL.labels("COMPLETED")
+FAILED_TOTAL = RECOMMENDATIONS_TOTAL.labels("FAILED")
+
+
+@dataclass
+class PagedCandidates:
+    """paged 모드에서 감상문 하나에 대해 한 번 검색해 둔 후보 전체."""
+
+    review_content: str
+    candidates: list[AlbumCandidate]
+
 
 class RecommendationService:
     def __init__(
@@ -27,6 +62,18 @@ class RecommendationService:
         recommendation_reason_service: RecommendationReasonService,
         spring_callback_client: SpringCallbackClient,
         top_k: int = settings.RECOMMENDATION_TOP_K,
+        economy_reason_scheduler=None,
+        recommendation_history_repository=None,
+        user_taste_store=None,
+        taste_blend_weight: float = settings.USER_TASTE_BLEND_WEIGHT,
+        candidate_fetch_multiplier: int = settings.CANDIDATE_FETCH_MULTIPLIER,
+        mmr_lambda: float = settings.MMR_LAMBDA,
+        max_albums_per_artist: int = settings.MAX_ALBUMS_PER_ARTIST,
+        candidate_page_cache: Optional[LruCache] = None,
+        page_size: int = settings.RECOMMENDATION_PAGE_SIZE,
+        max_pages: int = settings.RECOMMENDATION_MAX_PAGES,
+        candidate_reranker=None,
+        result_cache: Optional[LruCache] = None,
     ):
         if embedding_service is None:
             raise ConfigurationError(
@@ -49,75 +96,329 @@ class RecommendationService:
             )
         self.spring_callback_client = spring_callback_client
         self.top_k = top_k
+        self.economy_reason_scheduler = economy_reason_scheduler
+        self.candidate_fetch_multiplier = max(1, candidate_fetch_multiplier)
+        self.mmr_lambda = mmr_lambda
+        self.max_albums_per_artist = max_albums_per_artist
+        self.recommendation_history_repository = recommendation_history_repository
+        self.user_taste_store = user_taste_store
+        self.taste_blend_weight = taste_blend_weight
+        self.candidate_page_cache = candidate_page_cache
+        self.page_size = max(1, page_size)
+        self.max_pages = max(1, max_pages)
+        self.candidate_reranker = candidate_reranker
+        self.result_cache = result_cache
+        self._result_versions: Optional[tuple] = None
+
+    async def recommend_by_review(
+        self, review_id: int, review_content: str, user_id: Optional[str] = None
+    ) -> None:
+        """같은 감상문의 재요청(Spring 재시도, 재전송)은 결과 캐시에서 바로 콜백한다."""
+        cache_key = self._result_cache_key(review_content, review_id, user_id)
+        cached = self.result_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            recommendations = cached.recommendations
+        else:
+            candidates, error_code = await self._find_candidates(
+                review_content, review_id, user_id
+            )
+            if error_code is not None:
+                await self._send_failed_safely(
+                    review_id, error_code, FAILURE_MESSAGES[error_code]
+                )
+                return
+
+            with REASON_SECONDS.time(), tracer.start_span(
+                "recommendation.reasons", candidates=len(candidates)
+            ):
+                reasons = await self.recommendation_reason_service.generate_reasons(
+                    review_content, candidates
+                )
+            recommendations = self._build_callback_items(candidates, reasons)
+            # 콜백 전에 저장해 콜백 실패 뒤의 재시도도 파이프라인을 다시 돌지 않는다.
+            if cache_key is not None:
+                self.result_cache.set(
+                    cache_key, RecommendationCallbackRequest.completed(recommendations)
+                )
 
-    async def recommend_by_review(self, review_id: int, review_content: str) -> None:
         try:
-            embedding = await self.embedding_service.embed_review(review_content)
-        except EmbeddingError:
+            with CALLBACK_SECONDS.time(), tracer.start_span("recommendation.callback"):
+                await self.spring_callback_client.send_completed_result(
+                    review_id, recommendations
+                )
+        except Exception as exc:
+            ERRORS_TOTAL.labels(RecommendationErrorCode.CALLBACK_FAILED.value).inc()
+            logger.exception("Spring callback failed: %s", exc)
+            raise
+        COMPLETED_TOTAL.inc()
+
+    async def recommend_by_review_economy(
+        self, review_id: int, review_content: str, user_id: Optional[str] = None
+    ) -> None:
+        """검색까지만 즉시 수행하고 추천 사유는 Batch API 제출 대기열에 넣는다."""
+        if self.economy_reason_scheduler is None:
+            logger.warning("Economy mode is not configured; falling back to realtime.")
+            await self.recommend_by_review(review_id, review_content, user_id)
+            return
+
+        candidates, error_code = await self._find_candidates(
+            review_content, review_id, user_id
+        )
+        if error_code is not None:
             await self._send_failed_safely(
-                review_id,
-                RecommendationErrorCode.EMBEDDING_FAILED,
-                "감상문 임베딩 생성에 실패했습니다.",
+                review_id, error_code, FAILURE_MESSAGES[error_code]
             )
             return
+        await self.economy_reason_scheduler.enqueue(review_id, review_content, candidates)
 
-        try:
-            candidates = await self.album_embedding_repository.find_similar_albums(
-                embedding, self.top_k
-            )
-        except RepositoryError:
+    async def recommend_by_review_paged(
+        self, review_id: int, review_content: str, user_id: Optional[str] = None
+    ) -> None:
+        """후보는 여러 page 분량을 한 번에 검색해 두고, 추천 사유는 첫 page만 만들어 콜백한다.
+
+        다음 page의 사유는 `recommendation_page`가 요청을 받을 때 만든다.
+        """
+        if self.candidate_page_cache is None:
+            logger.warning("Paged mode is not configured; falling back to realtime.")
+            await self.recommend_by_review(review_id, review_content, user_id)
+            return
+
+        candidates, error_code = await self._find_candidates(
+            review_content, review_id, user_id, limit=self.page_size * self.max_pages
+        )
+        if error_code is not None:
             await self._send_failed_safely(
-                review_id,
-                RecommendationErrorCode.SEARCH_FAILED,
-                "유사 앨범 검색에 실패했습니다.",
+                review_id, error_code, FAILURE_MESSAGES[error_code]
             )
             return
+        # 다양성 rerank용 벡터는 page 조회에 필요 없으므로 캐시에 남기지 않는다.
+        # 저장소가 SQLite(프로세스 공유)일 수 있어 이벤트 루프 밖에서 쓴다.
+        await asyncio.to_thread(
+            self.candidate_page_cache.set,
+            review_id,
+            PagedCandidates(
+                review_content,
+                [dataclasses.replace(candidate, embedding=None) for candidate in candidates],
+            ),
+        )
 
+        first_page = candidates[: self.page_size]
+        with REASON_SECONDS.time(), tracer.start_span(
+            "recommendation.reasons", candidates=len(first_page)
+        ):
+            reasons = await self.recommendation_reason_service.generate_reasons(
+                review_content, first_page
+            )
+        try:
+            with CALLBACK_SECONDS.time(), tracer.start_span("recommendation.callback"):
+                await self.spring_callback_client.send_completed_result(
+                    review_id, self._build_callback_items(first_page, reasons)
+                )
+        except Exception as exc:
+            ERRORS_TOTAL.labels(RecommendationErrorCode.CALLBACK_FAILED.value).inc()
+            logger.exception("Spring callback failed: %s", exc)
+            raise
+        COMPLETED_TOTAL.inc()
+
+    async def recommendation_page(
+        self, review_id: int, page: int
+    ) -> Optional[RecommendationPageResponse]:
+        """paged 모드로 검색해 둔 후보 중 page 번째(1부터) 묶음의 추천 사유를 만든다.
+
+        캐시에 후보가 없거나(paged 요청이 아니었거나 만료) page가 후보 범위를 넘으면 None을 돌려준다.
+        이미 만든 사유는 추천 사유 캐시에서 읽으므로 같은 page를 다시 요청해도 LLM을 다시 부르지 않는다.
+        """
+        if self.candidate_page_cache is None or page < 1:
+            return None
+        paged = await asyncio.to_thread(self.candidate_page_cache.get, review_id)
+        if paged is None:
+            return None
+
+        start = (page - 1) * self.page_size
+        candidates = paged.candidates[start : start + self.page_size]
         if not candidates:
-            await self._send_failed_safely(
-                review_id,
-                RecommendationErrorCode.NO_CANDIDATES,
-                "추천 후보가 없습니다.",
+            return None
+        with REASON_SECONDS.time(), tracer.start_span(
+            "recommendation.reasons", candidates=len(candidates), page=page
+        ):
+            reasons = await self.recommendation_reason_service.generate_reasons(
+                paged.review_content, candidates
             )
+        return RecommendationPageResponse(
+            review_id=review_id,
+            page=page,
+            recommendations=self._build_callback_items(candidates, reasons),
+            has_next=start + self.page_size < len(paged.candidates),
+        )
+
+    async def stream_by_review(
+        self, review_content: str, user_id: Optional[str] = None
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """콜백 없이 추천 단계 결과를 (event, data) 순서로 바로 내보낸다."""
+        candidates, error_code = await self._find_candidates(
+            review_content, user_id=user_id
+        )
+        if error_code is not None:
+            yield "failed", RecommendationCallbackRequest.failed(
+                error_code, FAILURE_MESSAGES[error_code]
+            ).model_dump(by_alias=True, mode="json", exclude={"recommendations"})
             return
 
-        reasons = await self.recommendation_reason_service.generate_reasons(
+        scored_items = self._build_callback_items(candidates, [])
+        yield "candidates", {
+            "recommendations": [
+                item.model_dump(
+                    by_alias=True, mode="json", exclude={"recommendation_reason"}
+                )
+                for item in scored_items
+            ]
+        }
+
+        reasons = []
+        async for reason in self.recommendation_reason_service.iter_reasons(
             review_content, candidates
+        ):
+            reasons.append(reason)
+            yield "reason", {
+                "albumId": reason.album_id,
+                "recommendationReason": reason.recommendation_reason,
+            }
+
+        yield "completed", RecommendationCallbackRequest.completed(
+            self._build_callback_items(candidates, reasons)
+        ).model_dump(by_alias=True, mode="json")
+
+    async def _find_candidates(
+        self,
+        review_content: str,
+        review_id: Optional[int] = None,
+        user_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> tuple[list[AlbumCandidate], Optional[RecommendationErrorCode]]:
+        limit = limit or self.top_k
+        # 추천 이력 조회는 임베딩 호출과 겹쳐서 기다린다.
+        history_lookup = asyncio.ensure_future(
+            self.previously_recommended(user_id, review_id)
         )
-        recommendations = self._build_callback_items(candidates, reasons)
+        try:
+            with EMBED_SECONDS.time(), tracer.start_span("recommendation.embed"):
+                embedding = await self.embedding_service.embed_review(review_content)
+        except EmbeddingError:
+            history_lookup.cancel()
+            return [], RecommendationErrorCode.EMBEDDING_FAILED
+        excluded_album_ids = await history_lookup
+        query = await self.personalize(embedding, user_id)
 
         try:
-            await self.spring_callback_client.send_completed_result(
-                review_id, recommendations
+            with SEARCH_SECONDS.time(), tracer.start_span(
+                "recommendation.search", top_k=limit
+            ):
+                # 추천 사유 호출이 비슷한 앨범에 겹치지 않도록 넉넉히 받아 다양성 rerank한다.
+                candidates = await self.album_embedding_repository.find_similar_albums(
+                    query,
+                    limit * self.candidate_fetch_multiplier,
+                    query_text=review_content,
+                    exclude_album_ids=excluded_album_ids,
+                )
+                candidates = self.diversify(candidates, limit, query_text=review_content)
+        except RepositoryError:
+            return [], RecommendationErrorCode.SEARCH_FAILED
+
+        if not candidates:
+            return [], RecommendationErrorCode.NO_CANDIDATES
+        await self.record_taste(embedding, user_id, review_id)
+        return list(candidates), None
+
+    async def personalize(self, embedding: np.ndarray, user_id: Optional[str]) -> np.ndarray:
+        """이전 감상문들의 taste vector를 검색 질의에 섞는다. 첫 감상문은 그대로 검색한다.
+
+        store는 동기 SQLite라 조회는 이벤트 루프 밖 thread에서 한다.
+        """
+        if not user_id or self.user_taste_store is None:
+            return embedding
+        taste = await asyncio.to_thread(self.user_taste_store.get, user_id)
+        if taste is None:
+            return embedding
+        return blend_taste(embedding, taste.vector, self.taste_blend_weight)
+
+    async def record_taste(
+        self, embedding: np.ndarray, user_id: Optional[str], review_id: Optional[int]
+    ) -> None:
+        """검색에 성공한 감상문을 taste에 반영한다.
+
+        검색이 실패한 요청은 taste를 바꾸지 않아, 재시도가 같은 taste로 다시 검색한다.
+        review_id가 없는 미리보기(SSE) 요청은 taste를 갱신하지 않는다.
+        """
+        if not user_id or review_id is None or self.user_taste_store is None:
+            return
+        await asyncio.to_thread(self.user_taste_store.update, user_id, embedding, review_id)
+
+    def result_versions(self) -> tuple:
+        """추천 결과를 바꾸는 인덱스/모델/프롬프트 버전."""
+        return (
+            self.album_embedding_repository.index_version,
+            settings.OPENAI_EMBEDDING_MODEL,
+            settings.OPENAI_CHAT_MODEL or "",
+            self.recommendation_reason_service.prompt_version,
+        )
+
+    def _result_cache_key(
+        self, review_content: str, review_id: int, user_id: Optional[str]
+    ) -> Optional[tuple]:
+        if self.result_cache is None:
+            return None
+        versions = self.result_versions()
+        if versions != self._result_versions:
+            # 버전이 바뀌면 이전 항목은 다시 적중하지 않으므로 TTL을 기다리지 않고 비운다.
+            if self._result_versions is not None:
+                self.result_cache.clear()
+            self._result_versions = versions
+        # taste 혼합과 추천 이력 제외는 사용자마다 다르므로 같은 사용자의 같은 감상문에만 재사용한다.
+        owner = (user_id, review_id) if user_id else None
+        return (content_hash(review_content), self.top_k, owner, versions)
+
+    async def previously_recommended(
+        self, user_id: Optional[str], review_id: Optional[int] = None
+    ) -> frozenset[str]:
+        """사용자에게 이미 추천한 앨범. 조회에 실패해도 추천은 제외 없이 계속한다."""
+        if not user_id or self.recommendation_history_repository is None:
+            return frozenset()
+        try:
+            return await self.recommendation_history_repository.recommended_album_ids(
+                user_id, exclude_review_id=review_id
             )
-        except Exception as exc:
-            logger.exception("Spring callback failed: %s", exc)
-            raise
+        except RepositoryError as exc:
+            logger.warning("Recommendation history lookup failed: user_id=%s, %s", user_id, exc)
+            return frozenset()
+
+    def diversify(
+        self,
+        candidates: Iterable[AlbumCandidate],
+        top_k: Optional[int] = None,
+        query_text: Optional[str] = None,
+    ) -> list[AlbumCandidate]:
+        """reranker가 있으면 그 점수를 관련도로 삼아 MMR로 top_k를 고른다."""
+        candidates = list(candidates)
+        return diversify_candidates(
+            candidates,
+            top_k or self.top_k,
+            mmr_lambda=self.mmr_lambda,
+            max_per_artist=self.max_albums_per_artist,
+            relevance=rerank_scores(self.candidate_reranker, query_text, candidates),
+        )
 
     def _build_callback_items(
         self, 
         candidates: Iterable[AlbumCandidate], 
         reasons: Iterable[RecommendationReason]
     ) -> list[RecommendationCallbackItem]:
-        reason_by_album_id = {
-            reason.album_id: reason.recommendation_reason
-            for reason in reasons
-        }
-        return [
-            RecommendationCallbackItem(
-                album_id=candidate.album_id,
-                album_artist=candidate.artist_name or None,
-                album_title=candidate.album_title or None,
-                recommendation_score=normalize_score(candidate.similarity),
-                recommendation_reason=reason_by_album_id.get(candidate.album_id, ""),
-                critics_review_id=candidate.critics_review_id,
-            )
-            for candidate in candidates
-        ]
+        return build_callback_items(candidates, reasons)
 
     async def _send_failed_safely(
         self, review_id: int, error_code: RecommendationErrorCode, message: str
     ) -> None:
+        ERRORS_TOTAL.labels(error_code.value).inc()
+        FAILED_TOTAL.inc()
         try:
             await self.spring_callback_client.send_failed_result(
                 review_id, error_code, message
@@ -125,3 +426,44 @@ class RecommendationService:
         except Exception as exc:
             logger.exception("Spring callback failed: %s", exc)
             raise
+
+
+def rerank_scores(
+    reranker, query_text: Optional[str], candidates: list[AlbumCandidate]
+) -> Optional[np.ndarray]:
+    """MMR 관련도로 쓸 reranker 점수. reranker나 감상문이 없으면 None이라 similarity를 그대로 쓴다.
+
+    점수 순서는 reranker를 따르고 크기는 후보들의 similarity 범위로 맞춘다.
+    """
+    if reranker is None or not query_text or not candidates:
+        return None
+    return scale_to_similarity(reranker.rerank_scores(query_text, candidates), candidates)
+
+
+def recommendation_handler(service: RecommendationService, mode: str):
+    """요청 mode에 맞는 처리 함수. HTTP front end와 worker가 같은 규칙을 쓴다."""
+    if mode == "economy":
+        return service.recommend_by_review_economy
+    if mode == "paged":
+        return service.recommend_by_review_paged
+    return service.recommend_by_review
+
+
+def build_callback_items(
+    candidates: Iterable[AlbumCandidate], reasons: Iterable[RecommendationReason]
+) -> list[RecommendationCallbackItem]:
+    reason_by_album_id = {
+        reason.album_id: reason.recommendation_reason
+        for reason in reasons
+    }
+    return [
+        RecommendationCallbackItem(
+            album_id=candidate.album_id,
+            album_artist=candidate.artist_name or None,
+            album_title=candidate.album_title or None,
+            recommendation_score=normalize_score(candidate.similarity),
+            recommendation_reason=reason_by_album_id.get(candidate.album_id, ""),
+            critics_review_id=candidate.critics_review_id,
+        )
+        for candidate in candidates
+    ]
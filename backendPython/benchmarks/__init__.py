@@ -0,0 +1,19 @@
+import os
+
+# app.core.config는 import 시점에 필수 환경 변수를 읽는다. 벤치마크는 네트워크 없이
+# stand-in만 쓰므로, 설정되지 않은 값은 벤치마크용 기본값으로 채운다.
+# SQLite 저장소 경로는 비워 작업 디렉터리에 파일을 남기거나 이전 실행 상태를 읽지 않게 한다.
+for _name, _value in {
+    "EMBEDDING_DIMENSIONS": "1536",
+    "RECOMMENDATION_TOP_K": "5",
+    "OPENAI_TIMEOUT_SECONDS": "10",
+    "OPENAI_CHAT_MODEL": "gpt-4o-mini",
+    "SPRING_BASE_URL": "http://127.0.0.1:18080",
+    "OPENAI_API_KEY": "sk-benchmark",
+    "CALLBACK_OUTBOX_PATH": "",
+    "ECONOMY_BATCH_STORE_PATH": "",
+    "USER_TASTE_STORE_PATH": "",
+    "RECOMMENDATION_QUEUE_PATH": "",
+    "CANDIDATE_PAGE_STORE_PATH": "",
+}.items():
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,308 @@
+"""POST /recommend/review open-loop 부하 생성기.
+
+응답을 기다리지 않고 정해진 도착률(고정 또는 선형 ramp)로 요청을 보낸다. 로컬 callback
+sink가 Spring 역할을 하며 요청 전송부터 콜백 도착까지 시간을 잰다.
+
+    # 1) Spring stand-in(callback sink)은 이 도구가 --sink-port로 띄운다.
+    # 2) 대상 서버는 sink를 Spring으로 보도록 띄운다.
+    SPRING_BASE_URL=http://127.0.0.1:18080 uvicorn benchmarks.stand_in_app:app --port 8000
+    # 3) 부하를 건다.
+    python -m benchmarks.load_generator --target http://127.0.0.1:8000 \\
+        --ramp-from 5 --ramp-to 80 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.stand_ins import CallbackSink
+
+
+@dataclass
+class RequestRecord:
+    review_id: int
+    scheduled_at: float
+    sent_at: float
+    accepted_at: Optional[float] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class WindowStats:
+    second: int
+    offered: int
+    accepted: int
+    callbacks: int
+    backlog: int
+    send_lag_ms: float
+    callback_p50_ms: Optional[float]
+
+
+@dataclass
+class LoadReport:
+    offered_requests: int
+    accept_ms: dict[str, Optional[float]]
+    callback_ms: dict[str, Optional[float]]
+    request_errors: dict[str, int]
+    callback_statuses: dict[str, int]
+    missing_callbacks: int
+    sustained_callbacks_per_second: float
+    saturation_offered_rate: Optional[float]
+    windows: list[WindowStats] = field(default_factory=list)
+
+
+def arrival_rate(args) -> Callable[[float], float]:
+    """경과 시간(초) -> 목표 도착률(req/s)."""
+    if args.rate is not None:
+        return lambda elapsed: args.rate
+    start, end, duration = args.ramp_from, args.ramp_to, args.duration
+    return lambda elapsed: start + (end - start) * min(elapsed / duration, 1.0)
+
+
+def schedule(rate: Callable[[float], float], duration: float, poisson: bool, seed: int) -> list[float]:
+    """도착 시각 목록. 응답과 무관하게 미리 정해 두어야 open loop가 된다."""
+    rng = random.Random(seed)
+    times = []
+    elapsed = 0.0
+    while True:
+        current = max(rate(elapsed), 1e-6)
+        gap = rng.expovariate(current) if poisson else 1.0 / current
+        elapsed += gap
+        if elapsed >= duration:
+            return times
+        times.append(elapsed)
+
+
+def percentiles(values: list[float]) -> dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    computed = np.percentile(np.asarray(values), (50, 95, 99))
+    return {
+        name: round(float(value), 2)
+        for name, value in zip(("p50", "p95", "p99"), computed)
+    }
+
+
+async def send_one(
+    http_client: httpx.AsyncClient,
+    url: str,
+    record: RequestRecord,
+    review_content: str,
+) -> None:
+    try:
+        response = await http_client.post(
+            url, json={"review_id": record.review_id, "review_content": review_content}
+        )
+        record.status_code = response.status_code
+        if response.status_code != 202:
+            record.error = f"HTTP_{response.status_code}"
+    except httpx.TimeoutException:
+        record.error = "TIMEOUT"
+    except httpx.HTTPError as exc:
+        record.error = type(exc).__name__
+    record.accepted_at = time.monotonic()
+
+
+def build_windows(
+    records: list[RequestRecord],
+    arrivals: dict[int, tuple[float, str, Optional[str]]],
+    started_at: float,
+    seconds: int,
+) -> list[WindowStats]:
+    windows = []
+    for second in range(seconds):
+        window_start = started_at + second
+        window_end = window_start + 1
+        in_window = [r for r in records if window_start <= r.sent_at < window_end]
+        window_callback_ms = [
+            (arrivals[r.review_id][0] - r.sent_at) * 1000
+            for r in in_window
+            if r.error is None and r.review_id in arrivals
+        ]
+        accepted_by_end = sum(
+            1 for r in records if r.error is None and r.accepted_at is not None and r.accepted_at < window_end
+        )
+        callbacks_by_end = sum(1 for arrived, _, _ in arrivals.values() if arrived < window_end)
+        windows.append(
+            WindowStats(
+                second=second,
+                offered=len(in_window),
+                accepted=sum(1 for r in in_window if r.error is None),
+                callbacks=sum(
+                    1 for arrived, _, _ in arrivals.values() if window_start <= arrived < window_end
+                ),
+                # 202를 받았지만 아직 콜백이 오지 않은 요청 수 = 서버 안에 쌓인 작업량.
+                backlog=max(accepted_by_end - callbacks_by_end, 0),
+                send_lag_ms=round(
+                    max(((r.sent_at - started_at) - r.scheduled_at) * 1000 for r in in_window), 2
+                )
+                if in_window
+                else 0.0,
+                callback_p50_ms=percentiles(window_callback_ms)["p50"],
+            )
+        )
+    return windows
+
+
+def estimate_saturation(
+    windows: list[WindowStats], slowdown: float = 2.0, consecutive: int = 3
+) -> Optional[float]:
+    """콜백까지 걸린 시간이 무부하 대비 slowdown배를 연속으로 넘기 시작한 구간의 도착률.
+
+    도착률이 오르면 backlog는 Little's law만큼 자연히 늘어나므로, 큐가 쌓여 지연이
+    불어나는 시점을 포화로 본다.
+    """
+    observed = [w.callback_p50_ms for w in windows if w.callback_p50_ms is not None]
+    if not observed:
+        return None
+    baseline = min(observed)
+    streak = 0
+    for index, window in enumerate(windows):
+        if window.callback_p50_ms is not None and window.callback_p50_ms > baseline * slowdown:
+            streak += 1
+            if streak >= consecutive:
+                return float(windows[index - consecutive + 1].offered)
+        else:
+            streak = 0
+    return None
+
+
+def summarize(
+    records: list[RequestRecord],
+    arrivals: dict[int, tuple[float, str, Optional[str]]],
+    started_at: float,
+    seconds: int,
+) -> LoadReport:
+    accepted = [r for r in records if r.error is None]
+    callback_ms = [
+        (arrivals[r.review_id][0] - r.sent_at) * 1000
+        for r in accepted
+        if r.review_id in arrivals
+    ]
+    callback_statuses = Counter(
+        status if error_code is None else f"{status}:{error_code}"
+        for _, status, error_code in (arrivals[r.review_id] for r in accepted if r.review_id in arrivals)
+    )
+    windows = build_windows(records, arrivals, started_at, seconds)
+    busy = [window.callbacks for window in windows if window.callbacks]
+    return LoadReport(
+        offered_requests=len(records),
+        accept_ms=percentiles(
+            [(r.accepted_at - r.sent_at) * 1000 for r in accepted if r.accepted_at is not None]
+        ),
+        callback_ms=percentiles(callback_ms),
+        request_errors=dict(Counter(r.error for r in records if r.error is not None)),
+        callback_statuses=dict(callback_statuses),
+        missing_callbacks=sum(1 for r in accepted if r.review_id not in arrivals),
+        sustained_callbacks_per_second=round(float(np.median(busy)), 2) if busy else 0.0,
+        saturation_offered_rate=estimate_saturation(windows),
+        windows=windows,
+    )
+
+
+async def run(args, sink: CallbackSink) -> LoadReport:
+    url = f"{args.target.rstrip('/')}/recommend/review"
+    times = schedule(arrival_rate(args), args.duration, args.poisson, args.seed)
+    records: list[RequestRecord] = []
+    tasks = []
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as http_client:
+        started_at = time.monotonic()
+        for index, offset in enumerate(times):
+            delay = started_at + offset - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            record = RequestRecord(
+                review_id=args.review_id_base + index,
+                scheduled_at=offset,
+                sent_at=time.monotonic(),
+            )
+            records.append(record)
+            review_content = f"부하 테스트 감상문 #{index % args.distinct_reviews}"
+            tasks.append(asyncio.create_task(send_one(http_client, url, record, review_content)))
+        await asyncio.gather(*tasks)
+
+        # 도착이 끝난 뒤 남은 콜백을 기다린다. 다 오면 일찍 끝낸다.
+        expected = {r.review_id for r in records if r.error is None}
+        deadline = time.monotonic() + args.drain_seconds
+        while time.monotonic() < deadline and not expected <= sink.snapshot().keys():
+            await asyncio.sleep(0.2)
+
+    seconds = int(np.ceil(time.monotonic() - started_at))
+    return summarize(records, sink.snapshot(), started_at, seconds)
+
+
+def format_report(report: LoadReport) -> str:
+    lines = [
+        f"offered={report.offered_requests} missing_callbacks={report.missing_callbacks}",
+        f"accept ms      {report.accept_ms}",
+        f"time-to-callback ms {report.callback_ms}",
+        f"request errors {report.request_errors}",
+        f"callbacks      {report.callback_statuses}",
+        f"sustained callbacks/s={report.sustained_callbacks_per_second} "
+        f"saturation offered rate={report.saturation_offered_rate}",
+        "",
+        f"{'sec':>4} {'offered':>8} {'accepted':>9} {'callbacks':>10} {'backlog':>8} "
+        f"{'lag ms':>8} {'cb p50 ms':>10}",
+    ]
+    for window in report.windows:
+        lines.append(
+            f"{window.second:>4} {window.offered:>8} {window.accepted:>9} "
+            f"{window.callbacks:>10} {window.backlog:>8} {window.send_lag_ms:>8} "
+            f"{'-' if window.callback_p50_ms is None else window.callback_p50_ms:>10}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    rate = parser.add_mutually_exclusive_group()
+    rate.add_argument("--rate", type=float, help="고정 도착률 (req/s)")
+    rate.add_argument("--ramp-from", type=float, default=1.0)
+    parser.add_argument("--ramp-to", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="도착을 만드는 시간(초)")
+    parser.add_argument("--poisson", action="store_true", help="지수 분포 간격으로 도착시킨다.")
+    parser.add_argument("--drain-seconds", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--distinct-reviews", type=int, default=1_000_000)
+    parser.add_argument(
+        "--review-id-base",
+        type=int,
+        default=int(time.time()) * 1000,
+        help="실행마다 다른 reviewId를 쓰도록 기본값은 현재 시각 기반이다.",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--sink-host", default="127.0.0.1")
+    parser.add_argument("--sink-port", type=int, default=18080)
+    parser.add_argument("--json", dest="json_path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with CallbackSink(args.sink_host, args.sink_port) as sink:
+        report = asyncio.run(run(args, sink))
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"args": vars(args), "report": asdict(report)},
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
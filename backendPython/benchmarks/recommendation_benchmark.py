@@ -0,0 +1,244 @@
+"""RecommendationService.recommend_by_review 처리량/단계별 지연 벤치마크.
+
+네트워크 없이 실행한다. OpenAI는 지연을 주입한 fake client, match_albums는 synthetic corpus,
+Spring은 로컬 callback sink로 대체한다.
+
+    cd backendPython
+    python -m benchmarks.recommendation_benchmark --concurrency 1 8 32 --top-k 5 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import benchmarks  # noqa: F401  벤치마크용 환경 변수 기본값을 먼저 채운다.
+
+import httpx
+import numpy as np
+
+from app.clients.callback_outbox import CallbackDispatcher, CallbackOutbox
+from app.clients.spring_callback_client import SpringCallbackClient
+from app.core.cache import LruCache
+from app.core.tracing import tracer
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.services.embedding_service import EmbeddingService
+from app.services.recommendation_reason_service import RecommendationReasonService
+from app.services.recommendation_service import RecommendationService
+
+from benchmarks.stand_ins import (
+    CallbackSink,
+    FakeOpenAIClient,
+    FakeSupabaseClient,
+    SyntheticCorpus,
+)
+
+
+STAGE_SPANS = {
+    "embed": "recommendation.embed",
+    "search": "recommendation.search",
+    "reasons": "recommendation.reasons",
+    "callback": "recommendation.callback",
+}
+PERCENTILES = (50, 95, 99)
+
+
+class DurationExporter:
+    """tracer span을 그대로 받아 이름별 소요 시간(ms)만 모은다."""
+
+    def __init__(self):
+        self.durations: dict[str, list[float]] = {}
+
+    def export(self, span) -> None:
+        self.durations.setdefault(span.name, []).append(
+            (span.end_time_ns - span.start_time_ns) / 1e6
+        )
+
+
+def percentiles(values: list[float]) -> dict[str, Optional[float]]:
+    if not values:
+        return {f"p{p}": None for p in PERCENTILES}
+    computed = np.percentile(np.asarray(values), PERCENTILES)
+    return {f"p{p}": round(float(value), 2) for p, value in zip(PERCENTILES, computed)}
+
+
+@dataclass
+class ScenarioResult:
+    concurrency: int
+    top_k: int
+    requests: int
+    elapsed_seconds: float
+    requests_per_second: float
+    end_to_end_ms: dict[str, Optional[float]]
+    stages_ms: dict[str, dict[str, Optional[float]]] = field(default_factory=dict)
+    peak_memory_mb: Optional[float] = None
+    callbacks_received: int = 0
+
+
+def build_service(args, corpus, sink, http_client, top_k, outbox=None):
+    openai_client = FakeOpenAIClient(
+        dims=args.dims,
+        embed_latency_seconds=args.embed_latency_ms / 1000,
+        chat_latency_seconds=args.chat_latency_ms / 1000,
+    )
+    dispatcher = None
+    if outbox is not None:
+        dispatcher = CallbackDispatcher(outbox=outbox, http_client=http_client)
+    service = RecommendationService(
+        embedding_service=EmbeddingService(
+            openai_client,
+            cache=LruCache(args.cache_size) if args.cache_size else None,
+        ),
+        album_embedding_repository=AlbumEmbeddingRepository(
+            FakeSupabaseClient(corpus, args.search_latency_ms / 1000)
+        ),
+        recommendation_reason_service=RecommendationReasonService(
+            openai_client,
+            cache=LruCache(args.cache_size) if args.cache_size else None,
+        ),
+        spring_callback_client=SpringCallbackClient(
+            base_url=sink.url, http_client=http_client, callback_dispatcher=dispatcher
+        ),
+        top_k=top_k,
+    )
+    return service, dispatcher
+
+
+def review_texts(count: int, distinct: int) -> list[str]:
+    return [
+        f"새벽에 듣기 좋은 차분한 피아노 트리오 감상문 #{index % distinct}"
+        for index in range(count)
+    ]
+
+
+async def run_scenario(args, corpus, sink, concurrency: int, top_k: int) -> ScenarioResult:
+    exporter = DurationExporter()
+    tracer.configure(exporter, sample_rate=1.0)
+    sink.reset()
+    outbox = CallbackOutbox(":memory:") if args.outbox else None
+    async with httpx.AsyncClient() as http_client:
+        service, dispatcher = build_service(args, corpus, sink, http_client, top_k, outbox)
+        if dispatcher is not None:
+            await dispatcher.start()
+
+        texts = review_texts(args.requests, args.distinct_reviews or args.requests)
+        limiter = asyncio.Semaphore(concurrency)
+        latencies: list[float] = []
+
+        async def one(review_id: int, text: str) -> None:
+            async with limiter:
+                started = time.perf_counter()
+                await service.recommend_by_review(review_id, text)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        if args.memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(one(review_id, text) for review_id, text in enumerate(texts, start=1))
+        )
+        elapsed = time.perf_counter() - started
+        peak_memory_mb = None
+        if args.memory:
+            peak_memory_mb = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+
+        if dispatcher is not None:
+            await dispatcher.stop()
+            outbox.close()
+    tracer.configure(None)
+
+    return ScenarioResult(
+        concurrency=concurrency,
+        top_k=top_k,
+        requests=args.requests,
+        elapsed_seconds=round(elapsed, 3),
+        requests_per_second=round(args.requests / elapsed, 2),
+        end_to_end_ms=percentiles(latencies),
+        stages_ms={
+            stage: percentiles(exporter.durations.get(span_name, []))
+            for stage, span_name in STAGE_SPANS.items()
+        },
+        peak_memory_mb=peak_memory_mb,
+        callbacks_received=len(sink.snapshot()),
+    )
+
+
+def format_table(results: list[ScenarioResult]) -> str:
+    header = (
+        f"{'conc':>5} {'top_k':>5} {'req/s':>9} {'e2e p50/p95/p99 ms':>24} "
+        + " ".join(f"{stage + ' p50/p95/p99':>24}" for stage in STAGE_SPANS)
+        + f" {'peak MB':>8}"
+    )
+    lines = [header]
+    for result in results:
+        def cell(values):
+            return "/".join("-" if value is None else f"{value:.1f}" for value in values.values())
+
+        lines.append(
+            f"{result.concurrency:>5} {result.top_k:>5} {result.requests_per_second:>9.2f} "
+            f"{cell(result.end_to_end_ms):>24} "
+            + " ".join(f"{cell(result.stages_ms[stage]):>24}" for stage in STAGE_SPANS)
+            + f" {'-' if result.peak_memory_mb is None else result.peak_memory_mb:>8}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5])
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--embed-latency-ms", type=float, default=40.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=400.0)
+    parser.add_argument(
+        "--search-latency-ms",
+        type=float,
+        default=15.0,
+        help="match_albums RPC 왕복 시간. 동기 supabase client처럼 event loop를 막는다.",
+    )
+    parser.add_argument("--cache-size", type=int, default=0, help="0이면 캐시를 끈다.")
+    parser.add_argument(
+        "--distinct-reviews",
+        type=int,
+        default=0,
+        help="서로 다른 감상문 수. 0이면 모든 요청이 다르다 (캐시 적중률 조절용).",
+    )
+    parser.add_argument("--outbox", action="store_true", help="콜백을 in-memory outbox로 보낸다.")
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument("--sink-port", type=int, default=18080)
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로도 저장한다.")
+    return parser.parse_args(argv)
+
+
+async def main_async(args) -> list[ScenarioResult]:
+    corpus = SyntheticCorpus.generate(args.corpus_size, args.dims)
+    results = []
+    with CallbackSink(port=args.sink_port) as sink:
+        for top_k in args.top_k:
+            for concurrency in args.concurrency:
+                results.append(await run_scenario(args, corpus, sink, concurrency, top_k))
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(main_async(args))
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"args": vars(args), "results": [asdict(result) for result in results]},
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""실제 FastAPI 앱을 stand-in client로 조립한다. 부하 테스트 대상 서버로 띄운다.
+
+    SPRING_BASE_URL=http://127.0.0.1:18080 \\
+        uvicorn benchmarks.stand_in_app:app --port 8000 --workers 2
+
+지연과 corpus 크기는 BENCH_* 환경 변수로 조절한다. 캐시/outbox 등은 평소처럼
+EMBEDDING_CACHE_SIZE, CALLBACK_OUTBOX_PATH 같은 앱 설정으로 바꾼다.
+"""
+
+import os
+
+import benchmarks  # noqa: F401  벤치마크용 환경 변수 기본값을 먼저 채운다.
+
+from app import main as main_module
+from app.core.config import settings
+
+from benchmarks.stand_ins import FakeOpenAIClient, FakeSupabaseClient, SyntheticCorpus
+
+
+CORPUS_SIZE = int(os.getenv("BENCH_CORPUS_SIZE", "20000"))
+EMBED_LATENCY_SECONDS = float(os.getenv("BENCH_EMBED_LATENCY_MS", "40")) / 1000
+CHAT_LATENCY_SECONDS = float(os.getenv("BENCH_CHAT_LATENCY_MS", "400")) / 1000
+SEARCH_LATENCY_SECONDS = float(os.getenv("BENCH_SEARCH_LATENCY_MS", "15")) / 1000
+
+
+def create_database_client():
+    corpus = SyntheticCorpus.generate(CORPUS_SIZE, settings.EMBEDDING_DIMENSIONS)
+    return FakeSupabaseClient(corpus, SEARCH_LATENCY_SECONDS)
+
+
+def create_openai_client():
+    return FakeOpenAIClient(
+        dims=settings.EMBEDDING_DIMENSIONS,
+        embed_latency_seconds=EMBED_LATENCY_SECONDS,
+        chat_latency_seconds=CHAT_LATENCY_SECONDS,
+    )
+
+
+# lifespan은 factory를 main 모듈 전역에서 찾으므로 교체만으로 stand-in이 주입된다.
+main_module.create_database_client = create_database_client
+main_module.create_openai_embedding_client = create_openai_client
+main_module.create_openai_chat_client = create_openai_client
+
+app = main_module.app
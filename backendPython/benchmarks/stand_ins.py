@@ -0,0 +1,235 @@
+"""네트워크 없이 추천 파이프라인을 돌리기 위한 OpenAI / Supabase / Spring stand-in."""
+
+import asyncio
+import base64
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import numpy as np
+
+
+def text_vector(text: str, dims: int) -> np.ndarray:
+    """같은 문장은 항상 같은 단위 벡터가 되도록 sha256을 seed로 쓴다."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dims).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def encode_vector(vector: np.ndarray, encoding_format: str):
+    # 실제 API처럼 base64는 little-endian float32 bytes, float는 JSON float list다.
+    if encoding_format == "base64":
+        return base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+    return vector.tolist()
+
+
+class _FakeEmbeddings:
+    def __init__(self, owner: "FakeOpenAIClient"):
+        self.owner = owner
+
+    async def create(self, model: str, input, encoding_format: str = "float", **kwargs):
+        texts = [input] if isinstance(input, str) else list(input)
+        await asyncio.sleep(self.owner.embed_latency_seconds)
+        self.owner.embedding_calls += 1
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(
+                    index=index,
+                    embedding=encode_vector(text_vector(text, self.owner.dims), encoding_format),
+                )
+                for index, text in enumerate(texts)
+            ],
+            usage=SimpleNamespace(
+                prompt_tokens=sum(len(text) // 2 for text in texts),
+                completion_tokens=None,
+            ),
+        )
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeOpenAIClient"):
+        self.owner = owner
+
+    async def create(self, model: str, messages, **kwargs):
+        await asyncio.sleep(self.owner.chat_latency_seconds)
+        self.owner.chat_calls += 1
+        prompt = messages[-1]["content"]
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(
+                        content="감상문과 앨범의 분위기가 잘 맞아 추천합니다."
+                    )
+                )
+            ],
+            usage=SimpleNamespace(prompt_tokens=len(prompt) // 2, completion_tokens=24),
+        )
+
+
+class FakeOpenAIClient:
+    """embeddings / chat.completions만 흉내 내는 AsyncOpenAI stand-in. 지연은 sleep으로 주입한다."""
+
+    def __init__(
+        self,
+        dims: int = 1536,
+        embed_latency_seconds: float = 0.0,
+        chat_latency_seconds: float = 0.0,
+    ):
+        self.dims = dims
+        self.embed_latency_seconds = embed_latency_seconds
+        self.chat_latency_seconds = chat_latency_seconds
+        self.embedding_calls = 0
+        self.chat_calls = 0
+        self.embeddings = _FakeEmbeddings(self)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+    async def aclose(self) -> None:
+        pass
+
+
+@dataclass
+class SyntheticCorpus:
+    rows: list[dict[str, Any]]
+    matrix: np.ndarray
+
+    @classmethod
+    def generate(cls, size: int, dims: int, seed: int = 7) -> "SyntheticCorpus":
+        rng = np.random.default_rng(seed)
+        matrix = rng.standard_normal((size, dims)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        rows = [
+            {
+                "album_id": f"00000000-0000-0000-0000-{index:012d}",
+                "album_title": f"Synthetic Album {index}",
+                "artist_name": f"Artist {index % 997}",
+                "review_summary": "차분한 모달 재즈와 넓은 공간감이 돋보이는 앨범",
+                "review_content": "modal jazz, cool, spacious mood " * 8,
+                "critics_review_id": str(100000 + index),
+            }
+            for index in range(size)
+        ]
+        return cls(rows, matrix)
+
+    def match(self, query: list[float], match_count: int) -> list[dict[str, Any]]:
+        scores = self.matrix @ np.asarray(query, dtype=np.float32)
+        count = min(match_count, len(self.rows))
+        top = np.argpartition(-scores, count - 1)[:count]
+        return [{**self.rows[index], "similarity": float(scores[index])} for index in top]
+
+
+class _FakeQuery:
+    def __init__(self, execute):
+        self._execute = execute
+
+    def execute(self):
+        return self._execute()
+
+
+class FakeSupabaseClient:
+    """`rpc("match_albums")`를 synthetic corpus 위에서 계산하는 supabase client stand-in.
+
+    실제 supabase-py client처럼 동기 호출이므로 search 지연은 event loop를 막는다.
+    """
+
+    def __init__(self, corpus: SyntheticCorpus, search_latency_seconds: float = 0.0):
+        self.corpus = corpus
+        self.search_latency_seconds = search_latency_seconds
+
+    def rpc(self, name: str, params: dict[str, Any]) -> _FakeQuery:
+        if name != "match_albums":
+            raise ValueError(f"Unknown rpc: {name}")
+
+        def execute():
+            if self.search_latency_seconds:
+                time.sleep(self.search_latency_seconds)
+            rows = self.corpus.match(params["query_embedding"], params["match_count"])
+            return SimpleNamespace(data=rows)
+
+        return _FakeQuery(execute)
+
+    def close(self) -> None:
+        pass
+
+
+class CallbackSink:
+    """Spring 콜백 API를 흉내 내는 로컬 서버.
+
+    reviewId별 (도착 시각(time.monotonic), status, errorCode)를 기록한다.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 18080):
+        self.host = host
+        self.port = port
+        self.url = f"http://{host}:{port}"
+        self.arrivals: dict[int, tuple[float, str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, review_id: int, body: dict[str, Any]) -> None:
+        with self._lock:
+            self.arrivals[review_id] = (
+                time.monotonic(),
+                body.get("status", ""),
+                body.get("errorCode"),
+            )
+
+    def snapshot(self) -> dict[int, tuple[float, str, Optional[str]]]:
+        with self._lock:
+            return dict(self.arrivals)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.arrivals.clear()
+
+    def build_app(self):
+        from fastapi import FastAPI, Request, Response
+
+        app = FastAPI()
+
+        @app.post("/api/user-reviews/{review_id}/recommendations")
+        async def receive(review_id: int, request: Request) -> Response:
+            self.record(review_id, await request.json())
+            return Response(status_code=200)
+
+        @app.post("/api/user-reviews/recommendations/batch")
+        async def receive_batch(request: Request) -> Response:
+            body = await request.json()
+            for callback in body.get("callbacks", []):
+                self.record(int(callback["reviewId"]), callback)
+            return Response(status_code=200)
+
+        return app
+
+    def start(self) -> "CallbackSink":
+        import uvicorn
+
+        config = uvicorn.Config(
+            self.build_app(), host=self.host, port=self.port, log_level="warning"
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, name="callback-sink", daemon=True
+        )
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Callback sink failed to start on {self.url}")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "CallbackSink":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
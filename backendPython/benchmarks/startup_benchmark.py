@@ -0,0 +1,154 @@
+"""FastAPI 앱 cold start 벤치마크.
+
+autoscaling으로 새 프로세스가 뜰 때 걸리는 시간을 단계별로 잰다. 측정마다 새 인터프리터를
+띄우므로 이미 import된 모듈 캐시의 영향을 받지 않는다.
+
+    cd backendPython
+    python -m benchmarks.startup_benchmark --runs 5 --json startup.json
+
+- import: `import app.main`까지 (`-X importtime` 기준 self time 상위 모듈도 출력한다)
+- lifespan: stand-in client로 lifespan startup을 마칠 때까지
+- per-request: `get_recommendation_service` 한 번 (app-scoped container 조회 vs 매번 조립)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+_IMPORT_PROBE = """
+import benchmarks
+import time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+"""
+
+_LIFESPAN_PROBE = """
+import asyncio, time
+import benchmarks.stand_in_app as stand_in
+from app.main import lifespan
+
+async def probe():
+    started = time.perf_counter()
+    async with lifespan(stand_in.app):
+        ready = time.perf_counter() - started
+    return ready
+
+print(asyncio.run(probe()))
+"""
+
+_REQUEST_PROBE = """
+import asyncio, json, time
+from types import SimpleNamespace
+import benchmarks.stand_in_app as stand_in
+from app.api.dependencies import build_recommendation_service, get_recommendation_service
+from app.main import lifespan
+
+ITERATIONS = 20000
+
+async def probe():
+    async with lifespan(stand_in.app):
+        request = SimpleNamespace(app=stand_in.app)
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            get_recommendation_service(request)
+        shared = (time.perf_counter() - started) / ITERATIONS
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            build_recommendation_service(stand_in.app.state)
+        rebuilt = (time.perf_counter() - started) / ITERATIONS
+    return {"container_us": shared * 1e6, "rebuild_us": rebuilt * 1e6}
+
+print(json.dumps(asyncio.run(probe())))
+"""
+
+
+def run_probe(source: str, extra_args=()) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    # lifespan probe는 synthetic corpus를 만들지 않도록 작은 값을 쓴다. 검색 인덱스는 첫 요청 때 적재된다.
+    env.setdefault("BENCH_CORPUS_SIZE", "100")
+    completed = subprocess.run(
+        [sys.executable, *extra_args, "-c", source],
+        cwd=BACKEND_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    return {
+        "min_ms": min(values) * 1000,
+        "median_ms": statistics.median(values) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def slowest_imports(stderr: str, limit: int) -> list[tuple[str, float]]:
+    """`-X importtime` 출력에서 self time이 큰 모듈을 고른다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line.removeprefix("import time:").split("|")
+        rows.append((module.strip(), int(self_us) / 1000))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+
+
+def measure(runs: int, top_imports: int) -> dict:
+    import_seconds = [float(run_probe(_IMPORT_PROBE).stdout) for _ in range(runs)]
+    lifespan_seconds = [float(run_probe(_LIFESPAN_PROBE).stdout) for _ in range(runs)]
+    importtime = run_probe(_IMPORT_PROBE, extra_args=("-X", "importtime"))
+    return {
+        "import": summarize(import_seconds),
+        "lifespan": summarize(lifespan_seconds),
+        "per_request": json.loads(run_probe(_REQUEST_PROBE).stdout),
+        "slowest_imports_ms": slowest_imports(importtime.stderr, top_imports),
+    }
+
+
+def format_report(result: dict) -> str:
+    lines = [f"{'stage':<10} {'min':>9} {'median':>9} {'max':>9}"]
+    for stage in ("import", "lifespan"):
+        stats = result[stage]
+        lines.append(
+            f"{stage:<10} {stats['min_ms']:>7.1f}ms {stats['median_ms']:>7.1f}ms "
+            f"{stats['max_ms']:>7.1f}ms"
+        )
+    per_request = result["per_request"]
+    lines.append(
+        f"get_recommendation_service: container {per_request['container_us']:.2f}us, "
+        f"rebuild {per_request['rebuild_us']:.2f}us"
+    )
+    lines.append("slowest imports (self):")
+    lines.extend(f"  {module:<50} {ms:>7.1f}ms" for module, ms in result["slowest_imports_ms"])
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top-imports", type=int, default=10)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장한다.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    result = measure(args.runs, args.top_imports)
+    print(format_report(result))
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
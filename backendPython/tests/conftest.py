@@ -16,6 +16,10 @@ def client(monkeypatch):
     from fastapi.testclient import TestClient
 
     from app import main as main_module
+    from app.clients.callback_outbox import CallbackOutbox
+    from app.repositories.user_taste_store import UserTasteStore
+    from app.services.candidate_page_store import CandidatePageStore
+    from app.services.economy_reason_service import EconomyBatchStore
 
     monkeypatch.setattr(
         main_module,
@@ -42,6 +46,31 @@ def client(monkeypatch):
         raising=False,
     )
 
+    monkeypatch.setattr(
+        main_module,
+        "create_callback_outbox",
+        lambda: CallbackOutbox(":memory:"),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        main_module,
+        "create_economy_batch_store",
+        lambda: EconomyBatchStore(":memory:"),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        main_module,
+        "create_user_taste_store",
+        lambda: UserTasteStore(":memory:"),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        main_module,
+        "create_candidate_page_cache",
+        lambda: CandidatePageStore(":memory:"),
+        raising=False,
+    )
+
     main_module.app.dependency_overrides.clear()
     with TestClient(main_module.app) as test_client:
         yield test_client
@@ -1,4 +1,7 @@
-from app.api.dependencies import get_recommendation_service
+from app.api.dependencies import (
+    get_bulk_recommendation_service,
+    get_recommendation_service,
+)
 from app.main import app
 
 from tests.fixtures import REVIEW_CONTENT, REVIEW_ID
@@ -9,7 +12,7 @@ def test_recommend_flow_valid_request_returns_202_and_processes_callback(client)
     calls = []
 
     class FakeRecommendationService:
-        async def recommend_by_review(self, review_id, review_content):
+        async def recommend_by_review(self, review_id, review_content, user_id=None):
             calls.append({"review_id": review_id, "review_content": review_content})
 
     app.dependency_overrides[get_recommendation_service] = (
@@ -24,3 +27,275 @@ def test_recommend_flow_valid_request_returns_202_and_processes_callback(client)
     assert response.status_code == 202
     assert calls == [{"review_id": REVIEW_ID, "review_content": REVIEW_CONTENT}]
 
+
+def test_recommend_flow_economy_mode_delegates_to_economy_path(client):
+    """mode=economy 요청은 202를 반환하고 Batch API 경로로 처리를 위임한다."""
+    calls = []
+
+    class FakeRecommendationService:
+        async def recommend_by_review(self, review_id, review_content, user_id=None):
+            calls.append(("realtime", review_id))
+
+        async def recommend_by_review_economy(self, review_id, review_content, user_id=None):
+            calls.append(("economy", review_id))
+
+    app.dependency_overrides[get_recommendation_service] = (
+        lambda: FakeRecommendationService()
+    )
+
+    response = client.post(
+        "/recommend/review",
+        json={
+            "review_id": REVIEW_ID,
+            "review_content": REVIEW_CONTENT,
+            "mode": "economy",
+        },
+    )
+
+    assert response.status_code == 202
+    assert calls == [("economy", REVIEW_ID)]
+
+
+def test_recommend_stream_returns_server_sent_events(client):
+    """스트림 요청은 RecommendationService 이벤트를 SSE 형식으로 그대로 전달한다."""
+
+    class FakeRecommendationService:
+        async def stream_by_review(self, review_content, user_id=None):
+            yield "candidates", {"recommendations": []}
+            yield "completed", {"status": "COMPLETED", "recommendations": []}
+
+    app.dependency_overrides[get_recommendation_service] = (
+        lambda: FakeRecommendationService()
+    )
+
+    response = client.post(
+        "/recommend/review/stream",
+        json={"review_id": REVIEW_ID, "review_content": REVIEW_CONTENT},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'event: candidates\ndata: {"recommendations": []}\n\n'
+        'event: completed\ndata: {"status": "COMPLETED", "recommendations": []}\n\n'
+    )
+
+
+def test_recommend_bulk_returns_202_with_job_and_exposes_progress(client):
+    """bulk 요청은 202와 작업 id를 반환하고, 진행률 조회로 처리 결과를 확인할 수 있다."""
+    calls = []
+
+    class FakeBulkRecommendationService:
+        async def run(self, job, items, mode="realtime"):
+            calls.append([(item.review_id, item.review_content) for item in items])
+            job.completed = len(items)
+            job.status = "COMPLETED"
+
+    app.dependency_overrides[get_bulk_recommendation_service] = (
+        lambda: FakeBulkRecommendationService()
+    )
+
+    response = client.post(
+        "/recommend/reviews/bulk",
+        json={
+            "items": [
+                {"review_id": REVIEW_ID, "review_content": REVIEW_CONTENT},
+                {"review_id": REVIEW_ID + 1, "review_content": REVIEW_CONTENT},
+            ]
+        },
+    )
+
+    assert response.status_code == 202
+    assert response.json()["total"] == 2
+    assert calls == [[(REVIEW_ID, REVIEW_CONTENT), (REVIEW_ID + 1, REVIEW_CONTENT)]]
+
+    progress = client.get(f"/recommend/reviews/bulk/{response.json()['job_id']}")
+    assert progress.json()["status"] == "COMPLETED"
+    assert progress.json()["completed"] == 2
+
+
+def test_recommend_bulk_unknown_job_returns_404(client):
+    """존재하지 않는 작업 id는 404를 반환한다."""
+    assert client.get("/recommend/reviews/bulk/unknown").status_code == 404
+
+
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    """/metrics는 단계별 latency와 캐시 적중 metric을 Prometheus text 형식으로 노출한다."""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE recommendation_stage_seconds histogram" in response.text
+    assert 'recommendation_cache_hits_total{cache="embedding"} 0' in response.text
+    assert 'recommendation_queue_depth{queue="callback_outbox"} 0' in response.text
+
+
+def test_recommend_flow_propagates_spring_traceparent_to_background(client, monkeypatch):
+    """Spring traceparent를 받은 요청은 background 처리 span까지 같은 trace로 기록된다."""
+    from app.core.tracing import tracer
+
+    spans = []
+
+    class ListExporter:
+        def export(self, span):
+            spans.append(span)
+
+    class FakeRecommendationService:
+        async def recommend_by_review(self, review_id, review_content, user_id=None):
+            pass
+
+    monkeypatch.setattr(tracer, "exporter", ListExporter())
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    app.dependency_overrides[get_recommendation_service] = (
+        lambda: FakeRecommendationService()
+    )
+
+    response = client.post(
+        "/recommend/review",
+        json={"review_id": REVIEW_ID, "review_content": REVIEW_CONTENT},
+        headers={
+            "traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        },
+    )
+
+    assert response.status_code == 202
+    assert {span.name for span in spans} == {
+        "POST /recommend/review",
+        "recommendation.background",
+    }
+    assert {span.context.trace_id for span in spans} == {
+        "4bf92f3577b34da6a3ce929d0e0e4736"
+    }
+
+
+def test_debug_profile_requires_configured_token(client, monkeypatch):
+    """프로파일러는 토큰이 설정된 경우에만 열리고, 토큰이 맞아야 collapsed stack을 반환한다."""
+    from app.core.config import settings
+
+    assert client.get("/debug/profile").status_code == 404
+
+    monkeypatch.setattr(settings, "DEBUG_PROFILER_TOKEN", "secret")
+    wrong = client.get("/debug/profile", headers={"X-Debug-Token": "nope"})
+    response = client.get(
+        "/debug/profile",
+        params={"seconds": 0.05, "interval_ms": 1},
+        headers={"X-Debug-Token": "secret"},
+    )
+
+    assert wrong.status_code == 401
+    assert response.status_code == 200
+    assert response.text.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+
+def test_similar_albums_served_from_loaded_knn_graph(client):
+    """앨범 kNN 그래프가 적재되어 있으면 이웃을 바로 돌려주고, 없으면 404/503을 준다."""
+    import numpy as np
+
+    from app.repositories.album_knn_graph import AlbumKnnGraph
+
+    assert client.get("/albums/a/similar").status_code == 503
+
+    client.app.state.album_knn_graph = AlbumKnnGraph.build(
+        ["a", "b", "c"], np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0]]), k=2
+    )
+    response = client.get("/albums/a/similar", params={"limit": 1})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "album_id": "a",
+        "similar_albums": [{"album_id": "b", "similarity": 0.7998}],
+    }
+    assert client.get("/albums/unknown/similar").status_code == 404
+
+
+def test_recommendation_page_returns_camel_case_page_or_404(client):
+    """다음 page 조회는 추천 사유가 채워진 page를 돌려주고, 검색해 둔 후보가 없으면 404다."""
+    from decimal import Decimal
+
+    from app.schemas.recommendation import (
+        RecommendationCallbackItem,
+        RecommendationPageResponse,
+    )
+
+    class FakeRecommendationService:
+        async def recommendation_page(self, review_id, page):
+            if review_id != REVIEW_ID:
+                return None
+            return RecommendationPageResponse(
+                review_id=review_id,
+                page=page,
+                recommendations=[
+                    RecommendationCallbackItem(
+                        album_id="7",
+                        recommendation_score=Decimal("0.9100"),
+                        recommendation_reason="추천 사유",
+                        critics_review_id="70",
+                    )
+                ],
+                has_next=False,
+            )
+
+    app.dependency_overrides[get_recommendation_service] = (
+        lambda: FakeRecommendationService()
+    )
+
+    response = client.get(f"/recommend/review/{REVIEW_ID}/recommendations?page=2")
+    missing = client.get("/recommend/review/999999/recommendations?page=2")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["reviewId"] == REVIEW_ID
+    assert body["hasNext"] is False
+    assert body["recommendations"][0]["recommendationReason"] == "추천 사유"
+    assert missing.status_code == 404
+
+
+def test_recommend_flow_enqueues_to_worker_queue_when_configured(client):
+    """작업 큐가 설정되어 있으면 front end는 처리하지 않고 큐에 넣은 뒤 202를 반환한다."""
+    from app.services.recommendation_queue import RecommendationJobQueue
+
+    calls = []
+
+    class FakeRecommendationService:
+        async def recommend_by_review(self, review_id, review_content, user_id=None):
+            calls.append(review_id)
+
+    queue = RecommendationJobQueue(":memory:")
+    app.state.recommendation_queue = queue
+    app.dependency_overrides[get_recommendation_service] = (
+        lambda: FakeRecommendationService()
+    )
+
+    response = client.post(
+        "/recommend/review",
+        json={
+            "review_id": REVIEW_ID,
+            "review_content": REVIEW_CONTENT,
+            "user_id": "user-1",
+        },
+    )
+
+    assert response.status_code == 202
+    assert calls == []
+    [job] = queue.claim("worker-1")
+    assert (job.review_id, job.review_content, job.mode, job.user_id) == (
+        REVIEW_ID,
+        REVIEW_CONTENT,
+        "realtime",
+        "user-1",
+    )
+
+
+def test_recommendation_service_is_built_once_per_app(client):
+    """요청마다 service를 조립하지 않고 lifespan에서 만든 인스턴스를 공유한다."""
+    from types import SimpleNamespace
+
+    request = SimpleNamespace(app=app)
+
+    first = get_recommendation_service(request)
+    second = get_recommendation_service(request)
+
+    assert first is second is app.state.services.recommendation_service
+    assert get_bulk_recommendation_service(request) is (
+        app.state.services.bulk_recommendation_service
+    )
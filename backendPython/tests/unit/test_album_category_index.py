@@ -0,0 +1,152 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.core.exceptions import RepositoryError
+from app.jobs.album_category_job import build_index, collect_category_texts
+from app.repositories.album_category_index import AlbumCategoryIndex, quantize_rows
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_vector_index import AlbumVectorIndex
+
+
+def small_index():
+    # 앨범 a: instrumentation, vocal_style / 앨범 b: instrumentation
+    return AlbumCategoryIndex.build(
+        ["a", "b"],
+        ["instrumentation", "vocal_style"],
+        vector_albums=[1, 0, 0],
+        vector_categories=[0, 0, 1],
+        matrix=np.array([[0.0, 1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]),
+    )
+
+
+def test_quantize_rows_keeps_cosine_within_int8_error():
+    """int8 양자화 후 복원한 벡터의 코사인 유사도 오차가 작다."""
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(50, 64)).astype(np.float32)
+    query = rng.normal(size=64).astype(np.float32)
+    query /= np.linalg.norm(query)
+
+    vectors, scales = quantize_rows(matrix)
+
+    exact = (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)) @ query
+    approx = (vectors.astype(np.float32) @ query) * scales
+    assert vectors.dtype == np.int8
+    assert np.abs(exact - approx).max() < 0.02
+
+
+def test_maxsim_takes_best_category_per_album_and_sums_query_vectors():
+    """앨범 점수는 질의 벡터마다 가장 가까운 카테고리 유사도를 더한 값이다."""
+    index = small_index()
+
+    single = index.maxsim(np.array([0.0, 0.0, 1.0]))
+    multi = index.maxsim(np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]))
+
+    assert single.tolist() == pytest.approx([1.0, 0.0], abs=0.01)
+    assert multi.tolist() == pytest.approx([2.0, 0.0], abs=0.01)
+
+
+def test_rank_orders_candidate_albums_and_survives_save_load(tmp_path):
+    """후보 앨범만 MaxSim DESC로 정렬하고, 카테고리 벡터가 없는 앨범은 뺀다. 파일로 저장해도 같다."""
+    path = tmp_path / "categories.npz"
+    small_index().save(str(path))
+    index = AlbumCategoryIndex.load(str(path))
+
+    ranked = index.rank(["a", "unknown", "b"], [0.1, 1.0, 0.0])
+
+    assert [album_id for album_id, _ in ranked] == ["b", "a"]
+    assert ranked[0][1] == pytest.approx(1.0 / np.linalg.norm([0.1, 1.0]), abs=0.01)
+    assert index.rank(["a"], [0.0, 0.0, 1.0])[0][1] == pytest.approx(1.0, abs=0.01)
+    assert index.vectors.dtype == np.int8
+
+
+def test_unsorted_vectors_are_rejected():
+    """앨범 순서로 정렬되지 않은 벡터 배열은 RepositoryError다."""
+    with pytest.raises(RepositoryError):
+        AlbumCategoryIndex(
+            ["a", "b"],
+            ["instrumentation"],
+            np.array([1, 0]),
+            np.array([0, 0]),
+            np.ones((2, 3), dtype=np.int8),
+            np.ones(2, dtype=np.float32),
+        )
+
+
+def test_collect_category_texts_joins_reviews_of_same_album():
+    """같은 앨범 평론의 카테고리 본문은 이어 붙이고, korean이 없으면 english를 쓴다."""
+    rows = [
+        {"album_id": "a", "categories": {"instrumentation": {"korean": "트럼펫 뮤트"}}},
+        {
+            "album_id": "a",
+            "categories": json.dumps({"instrumentation": {"english": "brushes"}}),
+        },
+        {"album_id": "b", "categories": None},
+        {"album_id": "c", "categories": "not json"},
+    ]
+
+    assert collect_category_texts(rows) == {("a", "instrumentation"): "트럼펫 뮤트\nbrushes"}
+
+
+class FakeRepository:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch_view_rows(self, page_size=1000):
+        return self.rows
+
+
+class FakeEmbeddingService:
+    VECTORS = {"피아노": [1.0, 0.0], "스캣": [0.0, 1.0]}
+
+    async def embed_reviews(self, texts):
+        return [self.VECTORS[text] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_build_index_embeds_each_album_category_once():
+    """(앨범, 카테고리)마다 벡터 하나를 만든다."""
+    rows = [
+        {"album_id": "a", "categories": {"instrumentation": "피아노", "vocal_style": "스캣"}},
+        {"album_id": "b", "categories": {"vocal_style": "스캣"}},
+    ]
+
+    index = await build_index(FakeRepository(rows), FakeEmbeddingService())
+
+    assert index.album_ids == ["a", "b"]
+    assert len(index.vectors) == 3
+    assert index.album_offsets.tolist() == [0, 2, 3]
+
+
+class FakeLoader:
+    def __init__(self, index):
+        self.index = index
+
+    def peek(self, repository):
+        return self.index
+
+
+@pytest.mark.asyncio
+async def test_find_similar_albums_fuses_category_hits():
+    """centroid 유사도는 낮아도 카테고리 벡터가 가까운 후보 앨범이 RRF로 앞에 온다."""
+    vector_index = AlbumVectorIndex.from_rows(
+        [
+            {"album_id": "1", "embedding": [1.0, 0.0, 0.0]},
+            {"album_id": "2", "embedding": [0.9, 0.1, 0.0]},
+            {"album_id": "3", "embedding": [0.0, 0.0, 1.0]},
+        ]
+    )
+    category_index = AlbumCategoryIndex.build(
+        ["3"], ["vocal_style"], [0], [0], np.array([[1.0, 0.0, 0.0]])
+    )
+    repository = AlbumEmbeddingRepository(
+        database=object(),
+        vector_index_loader=FakeLoader(vector_index),
+        category_index=category_index,
+    )
+
+    result = await repository.find_similar_albums([1.0, 0.0, 0.0], top_k=2)
+
+    assert [candidate.album_id for candidate in result] == ["3", "1"]
+    assert result[0].similarity == pytest.approx(0.0)
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.core.exceptions import RepositoryError
+from app.repositories.album_knn_graph import (
+    AlbumKnnGraph,
+    AlbumKnnGraphWatcher,
+    album_matrix,
+)
+from app.repositories.album_vector_index import AlbumVectorIndex
+
+
+def random_albums(count, dims=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [f"album-{number}" for number in range(count)], rng.normal(size=(count, dims))
+
+
+def brute_force_neighbors(matrix, k):
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = normalized @ normalized.T
+    np.fill_diagonal(scores, -np.inf)
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def test_build_matches_brute_force_across_blocks():
+    """block 단위로 곱해도 전체 유사도 행렬로 구한 이웃과 같다."""
+    album_ids, matrix = random_albums(50)
+
+    graph = AlbumKnnGraph.build(album_ids, matrix, k=5, block_size=7)
+
+    assert graph.neighbors.tolist() == brute_force_neighbors(matrix, 5).tolist()
+    assert graph.neighbors.dtype == np.int32
+    assert graph.scores.dtype == np.float16
+
+
+def test_similar_returns_neighbor_ids_without_self():
+    """조회는 자기 자신을 뺀 이웃 id와 유사도를 DESC로 돌려준다."""
+    graph = AlbumKnnGraph.build(
+        ["a", "b", "c"], np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0]]), k=5
+    )
+
+    assert [album_id for album_id, _ in graph.similar("a")] == ["b", "c"]
+    assert graph.similar("a", limit=1)[0][1] == pytest.approx(0.8, abs=1e-3)
+    assert graph.similar("unknown") == []
+
+
+def test_refreshed_with_new_albums_matches_full_build():
+    """새 앨범만 다시 계산해도 전체 재계산과 같은 그래프가 된다."""
+    album_ids, matrix = random_albums(60)
+    graph = AlbumKnnGraph.build(album_ids[:45], matrix[:45], k=6, block_size=8)
+
+    refreshed = graph.refreshed(album_ids, matrix, changed_album_ids=(), block_size=8)
+
+    assert refreshed.neighbors.tolist() == brute_force_neighbors(matrix, 6).tolist()
+
+
+def test_refreshed_with_changed_vector_matches_full_build():
+    """벡터가 바뀐 앨범을 지정하면 그 앨범과 관련된 이웃만 다시 계산한다."""
+    album_ids, matrix = random_albums(40)
+    graph = AlbumKnnGraph.build(album_ids, matrix, k=4)
+    matrix = matrix.copy()
+    matrix[3] = matrix[10] + 0.01
+
+    refreshed = graph.refreshed(album_ids, matrix, changed_album_ids=["album-3"])
+
+    assert refreshed.neighbors.tolist() == brute_force_neighbors(matrix, 4).tolist()
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """파일로 저장한 그래프를 다시 읽으면 같은 이웃을 돌려준다."""
+    album_ids, matrix = random_albums(20)
+    graph = AlbumKnnGraph.build(album_ids, matrix, k=3)
+    path = str(tmp_path / "album_knn.npz")
+
+    graph.save(path)
+    loaded = AlbumKnnGraph.load(path)
+
+    assert loaded.album_ids == album_ids
+    assert loaded.similar("album-0") == graph.similar("album-0")
+    with pytest.raises(RepositoryError):
+        AlbumKnnGraph.load(str(tmp_path / "missing.npz"))
+
+
+@pytest.mark.asyncio
+async def test_watcher_reloads_graph_when_file_mtime_changes(tmp_path):
+    """파일이 교체되면 다시 읽어 넘기고, 깨진 파일이면 이전 그래프를 그대로 둔다."""
+    album_ids, matrix = random_albums(20)
+    path = str(tmp_path / "album_knn.npz")
+    AlbumKnnGraph.build(album_ids, matrix, k=3).save(path)
+    reloaded = []
+    watcher = AlbumKnnGraphWatcher(path, on_reload=reloaded.append, interval_seconds=0)
+
+    assert await watcher.check() is False
+
+    AlbumKnnGraph.build(album_ids[:10], matrix[:10], k=3).save(path)
+    os.utime(path, ns=(1, 1))
+    assert await watcher.check() is True
+    assert len(reloaded[0]) == 10
+
+    with open(path, "wb") as file:
+        file.write(b"broken")
+    os.utime(path, ns=(2, 2))
+    assert await watcher.check() is False
+    assert await watcher.check() is False
+    assert len(reloaded) == 1
+
+
+def test_album_matrix_averages_reviews_of_same_album():
+    """평론 row가 여럿인 앨범은 평균 벡터 한 줄로 합친다."""
+    index = AlbumVectorIndex.from_rows(
+        [
+            {"album_id": "a", "critics_review_id": "1", "embedding": [1.0, 0.0]},
+            {"album_id": "a", "critics_review_id": "2", "embedding": [0.0, 1.0]},
+            {"album_id": "b", "critics_review_id": "3", "embedding": [0.0, 1.0]},
+        ]
+    )
+
+    album_ids, matrix = album_matrix(index)
+
+    assert album_ids == ["a", "b"]
+    assert matrix[0] == pytest.approx([2**-0.5, 2**-0.5])
@@ -0,0 +1,215 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_lexical_index import (
+    AlbumLexicalIndex,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from app.repositories.album_vector_index import AlbumVectorIndex
+
+
+ROWS = [
+    {
+        "album_id": "1",
+        "critics_review_id": "11",
+        "album_title": "Kind of Blue",
+        "artist_name": "Miles Davis",
+        "personnel": ["Bill Evans", "John Coltrane"],
+        "review_summary": "모달 재즈의 출발점",
+        "embedding": [1.0, 0.0, 0.0],
+    },
+    {
+        "album_id": "2",
+        "critics_review_id": "22",
+        "album_title": "Sunday at the Village Vanguard",
+        "artist_name": "Bill Evans Trio",
+        "review_summary": "빌 에반스 트리오의 서정적인 피아노",
+        "embedding": [0.0, 1.0, 0.0],
+    },
+    {
+        "album_id": "3",
+        "critics_review_id": "33",
+        "album_title": "Time Out",
+        "artist_name": "Dave Brubeck",
+        "review_summary": "변박으로 유명한 쿨 재즈",
+        "embedding": [0.0, 0.0, 1.0],
+    },
+]
+
+
+class FakeRpcQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self):
+        return type("Response", (), {"data": self.rows})()
+
+
+class FakeRpcDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return FakeRpcQuery(self.rows[: params["match_count"]])
+
+
+class FakeLoader:
+    def __init__(self, index):
+        self.index = index
+
+    def peek(self, repository):
+        return self.index
+
+
+def test_tokenize_splits_hangul_into_bigrams_to_ignore_particles():
+    """한글은 음절 bigram으로 잘라 조사가 붙어도 같은 token이 나온다."""
+    assert tokenize("Bill Evans 같은 피아노") == ["bill", "evans", "같은", "피아", "아노"]
+    assert set(tokenize("에반스")) <= set(tokenize("에반스의"))
+
+
+def test_search_ranks_artist_match_first():
+    """아티스트/연주자 이름이 겹치는 앨범이 요약만 겹치는 앨범보다 먼저 나온다."""
+    index = AlbumLexicalIndex.from_rows(ROWS)
+
+    hits = index.search("Bill Evans 같은 피아노", top_k=3)
+
+    assert [position for position, _ in hits] == [1, 0]
+    assert hits[0][1] > hits[1][1] > 0
+
+
+def test_search_without_matching_tokens_returns_empty_list():
+    """겹치는 token이 없으면 빈 목록을 반환한다."""
+    index = AlbumLexicalIndex.from_rows(ROWS)
+
+    assert index.search("xyz", top_k=3) == []
+    assert AlbumLexicalIndex([]).search("bill", top_k=3) == []
+
+
+def test_search_is_sub_millisecond_on_ten_thousand_albums():
+    """1만 앨범 규모에서도 질의 한 번이 1ms 안쪽이다."""
+    rng = np.random.default_rng(0)
+    words = [f"artist{number}" for number in range(2000)]
+    rows = [
+        {
+            "album_title": " ".join(rng.choice(words, 3)),
+            "artist_name": str(rng.choice(words)),
+            "review_summary": "차분한 피아노 트리오 " + " ".join(rng.choice(words, 20)),
+        }
+        for _ in range(10_000)
+    ]
+    index = AlbumLexicalIndex.from_rows(rows)
+
+    started = time.perf_counter()
+    for _ in range(100):
+        index.search("artist7 같은 차분한 피아노", top_k=30)
+    per_query = (time.perf_counter() - started) / 100
+
+    assert per_query < 0.001
+
+
+def test_reciprocal_rank_fusion_rewards_items_ranked_in_both_lists():
+    """두 목록에 모두 있는 항목이 한쪽 1위보다 앞선다."""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+    assert [key for key, _ in fused] == ["b", "a", "d", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+@pytest.mark.asyncio
+async def test_find_similar_albums_fuses_lexical_hits_into_vector_results():
+    """이름이 일치하는 앨범이 RRF로 앞에 오고, 인덱스가 있으면 RPC 없이 메모리에서 검색한다."""
+    index = AlbumVectorIndex.from_rows(ROWS)
+    database = FakeRpcDatabase([{**ROWS[2], "similarity": 0.9}])
+    repository = AlbumEmbeddingRepository(
+        database=database, vector_index_loader=FakeLoader(index)
+    )
+
+    result = await repository.find_similar_albums(
+        [0.0, 0.6, 0.8], top_k=3, query_text="Bill Evans 같은 피아노"
+    )
+
+    assert [candidate.album_id for candidate in result] == ["2", "1", "3"]
+    assert result[0].similarity == pytest.approx(0.6)
+    assert result[0].album_title == "Sunday at the Village Vanguard"
+    assert result[2].similarity == pytest.approx(0.8)
+    assert database.calls == []
+
+
+@pytest.mark.asyncio
+async def test_find_similar_albums_without_loaded_index_uses_vector_results_only():
+    """인덱스가 아직 없으면 기존 벡터 검색 결과를 그대로 쓴다."""
+    database = FakeRpcDatabase([{**ROWS[2], "similarity": 0.9}])
+    repository = AlbumEmbeddingRepository(
+        database=database, vector_index_loader=FakeLoader(None)
+    )
+
+    result = await repository.find_similar_albums(
+        [0.0, 0.0, 1.0], top_k=1, query_text="Bill Evans"
+    )
+
+    assert [candidate.album_id for candidate in result] == ["3"]
+    assert database.calls[0][1]["match_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_find_similar_albums_excludes_albums_inside_index_scan():
+    """제외 목록이 있으면 RPC 대신 메모리 인덱스에서 가린 채 검색해 TOP K를 새 앨범으로 채운다."""
+    index = AlbumVectorIndex.from_rows(ROWS)
+    database = FakeRpcDatabase([{**ROWS[1], "similarity": 0.9}])
+    repository = AlbumEmbeddingRepository(
+        database=database, vector_index_loader=FakeLoader(index)
+    )
+
+    result = await repository.find_similar_albums(
+        [0.0, 1.0, 0.0], top_k=2, query_text="Bill Evans", exclude_album_ids={"2"}
+    )
+
+    assert "2" not in [candidate.album_id for candidate in result]
+    assert len(result) == 2
+    assert database.calls == []
+
+
+@pytest.mark.asyncio
+async def test_find_similar_albums_without_index_overfetches_and_filters_exclusions():
+    """인덱스 적재 전에는 제외 수만큼 더 받아 거른다."""
+    database = FakeRpcDatabase(
+        [{**ROWS[1], "similarity": 0.9}, {**ROWS[0], "similarity": 0.5}]
+    )
+    repository = AlbumEmbeddingRepository(database=database)
+
+    result = await repository.find_similar_albums(
+        [0.0, 1.0, 0.0], top_k=1, exclude_album_ids={"2"}
+    )
+
+    assert [candidate.album_id for candidate in result] == ["1"]
+    assert database.calls[0][1]["match_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_find_similar_albums_fusion_keeps_one_slot_per_album():
+    """같은 앨범의 평론 row가 BM25에 여러 번 걸려도 결과에는 앨범마다 한 번만 나온다."""
+    rows = ROWS + [
+        {
+            **ROWS[1],
+            "critics_review_id": "23",
+            "review_summary": "빌 에반스 피아노 트리오의 라이브",
+            "embedding": [0.0, 0.9, 0.1],
+        }
+    ]
+    index = AlbumVectorIndex.from_rows(rows)
+    repository = AlbumEmbeddingRepository(
+        database=FakeRpcDatabase([]), vector_index_loader=FakeLoader(index)
+    )
+
+    result = await repository.find_similar_albums(
+        [0.0, 0.6, 0.8], top_k=3, query_text="빌 에반스 피아노 트리오"
+    )
+
+    assert sorted(candidate.album_id for candidate in result) == ["1", "2", "3"]
+    assert result[0].album_id == "2"
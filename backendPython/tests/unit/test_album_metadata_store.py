@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.repositories.album_metadata_store import AlbumMetadataStore
+from app.schemas.recommendation import AlbumCandidate
+
+
+ROWS = [
+    {
+        "album_id": "1",
+        "critics_review_id": "11",
+        "album_title": "Kind of Blue",
+        "artist_name": "Miles Davis",
+        "review_summary": "모달 재즈의 출발점",
+        "review_content": "평론 본문 1",
+    },
+    {
+        "album_id": "2",
+        "critics_review_id": "22",
+        "album_title": "Time Out",
+        "album_artist": "Dave Brubeck",
+        "review_summary": "변박",
+        "review_content": "평론 본문 2",
+    },
+    {
+        "album_id": "1",
+        "critics_review_id": "33",
+        "album_title": "Kind of Blue",
+        "artist_name": "Miles Davis",
+        "review_summary": "다른 평론가의 요약",
+        "review_content": "평론 본문 3",
+    },
+]
+
+
+def test_from_rows_stores_album_columns_once_per_album():
+    """앨범 단위 값은 앨범마다 한 번만 저장하고 평론 row는 앨범 번호만 가진다."""
+    store = AlbumMetadataStore.from_rows(ROWS)
+
+    assert len(store) == 3
+    assert store.album_ids == ["1", "2"]
+    assert store.artist_names == ["Miles Davis", "Dave Brubeck"]
+    assert store.row_albums.tolist() == [0, 1, 0]
+    assert store.key(2) == ("1", "33")
+
+
+def test_materialize_builds_candidate_equal_to_from_row():
+    """위치로 만든 후보는 row로 만든 후보와 같다."""
+    store = AlbumMetadataStore.from_rows(ROWS)
+
+    candidates = store.materialize_many([1, 2], [0.9, 0.5])
+
+    assert candidates == [
+        AlbumCandidate.from_row({**ROWS[1], "similarity": 0.9}),
+        AlbumCandidate.from_row({**ROWS[2], "similarity": 0.5}),
+    ]
+
+
+def test_positions_of_returns_every_review_row_of_albums():
+    """앨범 id로 찾으면 그 앨범의 평론 row 위치가 모두 나온다. 모르는 id는 무시한다."""
+    store = AlbumMetadataStore.from_rows(ROWS)
+
+    assert store.positions_of({"1", "unknown"}).tolist() == [0, 2]
+    assert store.positions_of({"unknown"}).dtype == np.int32
+    assert len(store.positions_of(())) == 0
@@ -0,0 +1,254 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.exceptions import RepositoryError
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_vector_index import (
+    AlbumVectorIndex,
+    AlbumVectorIndexLoader,
+    parse_embedding,
+)
+
+
+ROWS = [
+    {"album_id": "1", "album_title": "Kind of Blue", "embedding": "[1.0, 0.0, 0.0]"},
+    {"album_id": "2", "album_title": "Blue Train", "embedding": [0.8, 0.6, 0.0]},
+    {"album_id": "3", "album_title": "Time Out", "embedding": [0.0, 0.0, 1.0]},
+    {"album_id": "4", "album_title": "No Vector", "embedding": None},
+]
+
+
+class FakePagedQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.ranges = []
+
+    def select(self, columns):
+        return self
+
+    def range(self, start, end):
+        self.ranges.append((start, end))
+        self._page = self.rows[start : end + 1]
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": self._page})()
+
+
+class FakeDatabaseClient:
+    def __init__(self, rows):
+        self.query = FakePagedQuery(rows)
+        self.tables = []
+
+    def from_(self, table_name):
+        self.tables.append(table_name)
+        return self.query
+
+
+def test_from_rows_skips_rows_without_embedding():
+    """임베딩이 없는 row는 인덱스에 넣지 않는다."""
+    index = AlbumVectorIndex.from_rows(ROWS)
+
+    assert len(index) == 3
+
+
+def test_search_many_returns_top_k_per_query_by_cosine_similarity():
+    """질의마다 코사인 유사도 DESC로 TOP K 후보를 반환한다."""
+    index = AlbumVectorIndex.from_rows(ROWS)
+    queries = np.array([[2.0, 0.0, 0.0], [0.0, 0.0, 0.5]], dtype=np.float32)
+
+    results = index.search_many(queries, top_k=2)
+
+    assert [candidate.album_id for candidate in results[0]] == ["1", "2"]
+    assert results[0][0].similarity == pytest.approx(1.0)
+    assert results[0][1].similarity == pytest.approx(0.8)
+    assert results[1][0].album_id == "3"
+
+
+def test_search_top_k_larger_than_index_returns_all_candidates():
+    """TOP K가 인덱스 크기보다 크면 전체 후보를 반환한다."""
+    index = AlbumVectorIndex.from_rows(ROWS)
+
+    assert len(index.search([1.0, 0.0, 0.0], top_k=10)) == 3
+
+
+@pytest.mark.asyncio
+async def test_load_vector_index_reads_view_page_by_page():
+    """인덱스 적재는 v_embedding_with_album을 page 단위로 끝까지 읽는다."""
+    database = FakeDatabaseClient(ROWS)
+    repository = AlbumEmbeddingRepository(database=database)
+
+    index = await repository.load_vector_index(page_size=2)
+
+    assert len(index) == 3
+    assert set(database.tables) == {"v_embedding_with_album"}
+    assert database.query.ranges == [(0, 1), (2, 3), (4, 5)]
+
+
+@pytest.mark.asyncio
+async def test_vector_index_loader_loads_once_and_reloads_after_invalidate():
+    """loader는 인덱스를 한 번만 적재하고 invalidate 후 다시 적재한다."""
+    repository = AlbumEmbeddingRepository(database=FakeDatabaseClient(ROWS))
+    loader = AlbumVectorIndexLoader()
+
+    first = await loader.get(repository)
+    second = await loader.get(repository)
+    first_version = loader.version
+    loader.invalidate()
+    third = await loader.get(repository)
+
+    assert first is second
+    assert third is not first
+    assert loader.version > first_version > 0
+
+
+class FailingRepository:
+    def __init__(self):
+        self.calls = 0
+
+    async def load_vector_index(self):
+        self.calls += 1
+        raise RepositoryError("view unavailable")
+
+
+@pytest.mark.asyncio
+async def test_vector_index_loader_backs_off_after_failed_load():
+    """적재가 실패하면 peek는 backoff 시간이 지나기 전까지 다시 적재하지 않고, 간격은 두 배로 는다."""
+    now = [0.0]
+    repository = FailingRepository()
+    loader = AlbumVectorIndexLoader(
+        retry_base_seconds=10, retry_max_seconds=15, clock=lambda: now[0]
+    )
+
+    async def peek_and_wait():
+        assert loader.peek(repository) is None
+        if loader._loading is not None:
+            await loader._loading
+
+    await peek_and_wait()
+    await peek_and_wait()
+    now[0] = 9.9
+    await peek_and_wait()
+    assert repository.calls == 1
+
+    now[0] = 10.0
+    await peek_and_wait()
+    now[0] = 24.9
+    await peek_and_wait()
+    assert repository.calls == 2
+
+    now[0] = 25.0
+    await peek_and_wait()
+    assert repository.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_vector_index_loader_refreshes_stale_index_in_background():
+    """refresh 주기가 지나면 이전 인덱스를 쓰면서 view를 다시 읽고, 끝나면 새 인덱스로 바꾼다."""
+    now = [0.0]
+    database = FakeDatabaseClient(ROWS[:2])
+    repository = AlbumEmbeddingRepository(database=database)
+    loader = AlbumVectorIndexLoader(refresh_seconds=60, clock=lambda: now[0])
+    first = await loader.get(repository)
+
+    database.query.rows = ROWS
+    now[0] = 59.0
+    assert loader.peek(repository) is first
+    assert loader._loading is None or loader._loading.done()
+
+    now[0] = 60.0
+    assert loader.peek(repository) is first
+    await loader._loading
+    refreshed = loader.peek(repository)
+
+    assert refreshed is not first
+    assert len(first) == 2
+    assert len(refreshed) == 3
+    assert loader.version == 2
+
+    # 내용이 같은 재적재는 인덱스를 바꿔도 version을 올리지 않는다.
+    await loader.refresh(repository)
+    assert loader.version == 2
+
+
+@pytest.mark.asyncio
+async def test_vector_index_refresh_builds_index_off_event_loop(monkeypatch):
+    """재적재 중 인덱스 생성은 스레드에서 돌아 이벤트 루프가 다른 요청을 계속 처리한다."""
+    now = [0.0]
+    repository = AlbumEmbeddingRepository(database=FakeDatabaseClient(ROWS))
+    loader = AlbumVectorIndexLoader(refresh_seconds=60, clock=lambda: now[0])
+    first = await loader.get(repository)
+    building = threading.Event()
+    loop_ran = threading.Event()
+    build_saw_loop = []
+    from_rows = AlbumVectorIndex.from_rows
+
+    def slow_from_rows(rows):
+        building.set()
+        # 루프 위에서 돌면 아래 set이 실행되지 못해 timeout까지 기다린다.
+        build_saw_loop.append(loop_ran.wait(timeout=2))
+        return from_rows(rows)
+
+    monkeypatch.setattr(AlbumVectorIndex, "from_rows", staticmethod(slow_from_rows))
+    now[0] = 60.0
+    assert loader.peek(repository) is first
+    assert await asyncio.to_thread(building.wait, 2)
+    loop_ran.set()
+    await loader._loading
+
+    assert build_saw_loop == [True]
+    assert loader.peek(repository) is not first
+
+
+def test_search_masks_excluded_albums_before_top_k():
+    """제외한 앨범은 점수 단계에서 가려져 TOP K 칸을 차지하지 않는다."""
+    index = AlbumVectorIndex.from_rows(ROWS)
+    exclude = index.exclusion_positions({"1", "unknown"})
+
+    results = index.search([1.0, 0.0, 0.0], top_k=2, exclude=exclude)
+
+    assert exclude.tolist() == [0]
+    assert [candidate.album_id for candidate in results] == ["2", "3"]
+    assert index.search([1.0, 0.0, 0.0], top_k=5, exclude=index.exclusion_positions({"1", "2", "3"})) == []
+
+
+def test_search_returns_each_album_once_with_its_closest_review():
+    """평론이 여럿인 앨범도 centroid로 한 칸만 차지하고, 질의와 가장 가까운 평론 row를 쓴다."""
+    index = AlbumVectorIndex.from_rows(
+        [
+            {"album_id": "a", "critics_review_id": "a1", "embedding": [1.0, 0.0, 0.0]},
+            {"album_id": "a", "critics_review_id": "a2", "embedding": [0.8, 0.6, 0.0]},
+            {"album_id": "b", "critics_review_id": "b1", "embedding": [0.6, 0.8, 0.0]},
+            {"album_id": "c", "critics_review_id": "c1", "embedding": [0.0, 0.0, 1.0]},
+        ]
+    )
+
+    results = index.search([0.7, 0.7, 0.0], top_k=2)
+
+    assert index.album_matrix.shape == (3, 3)
+    assert [(candidate.album_id, candidate.critics_review_id) for candidate in results] == [
+        ("b", "b1"),
+        ("a", "a2"),
+    ]
+    centroid = np.array([1.8, 0.6, 0.0]) / np.linalg.norm([1.8, 0.6, 0.0])
+    query = np.array([0.7, 0.7, 0.0]) / np.linalg.norm([0.7, 0.7, 0.0])
+    assert results[1].similarity == pytest.approx(float(centroid @ query), abs=1e-5)
+    # 한 평론 row만 제외해도 앨범 전체가 빠진다.
+    excluded = index.search([0.7, 0.7, 0.0], top_k=3, exclude=np.array([0]))
+    assert [candidate.album_id for candidate in excluded] == ["b", "c"]
+
+
+def test_from_rows_reads_pgvector_binary_embeddings():
+    """view가 `vector_send` bytea를 내보내면 hex 문자열을 JSON 파싱 없이 읽는다."""
+    vector = np.asarray([0.6, 0.8, 0.0], dtype=">f4")
+    binary = "\\x" + ((3).to_bytes(2, "big") + bytes(2) + vector.tobytes()).hex()
+    index = AlbumVectorIndex.from_rows(
+        [{"album_id": "1", "embedding": binary}, {"album_id": "2", "embedding": "[0.0, 0.0, 1.0]"}]
+    )
+
+    assert index.matrix[0] == pytest.approx([0.6, 0.8, 0.0])
+    with pytest.raises(RepositoryError, match="pgvector binary"):
+        parse_embedding(binary[:-2])
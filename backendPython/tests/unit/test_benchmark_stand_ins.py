@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.services.embedding_service import EmbeddingService
+
+from benchmarks.recommendation_benchmark import percentiles
+from benchmarks.stand_ins import (
+    FakeOpenAIClient,
+    FakeSupabaseClient,
+    SyntheticCorpus,
+    text_vector,
+)
+
+
+@pytest.mark.asyncio
+async def test_fake_clients_drive_real_repository_and_embedding_service():
+    """stand-in은 실제 EmbeddingService/AlbumEmbeddingRepository 코드 경로를 그대로 탄다."""
+    corpus = SyntheticCorpus.generate(size=50, dims=8)
+    embedding_service = EmbeddingService(FakeOpenAIClient(dims=8))
+    repository = AlbumEmbeddingRepository(FakeSupabaseClient(corpus))
+
+    embedding = await embedding_service.embed_review("차분한 피아노")
+    candidates = await repository.find_similar_albums(embedding, top_k=3)
+
+    expected = np.argsort(-(corpus.matrix @ text_vector("차분한 피아노", 8)))[:3]
+    assert [candidate.album_id for candidate in candidates] == [
+        corpus.rows[index]["album_id"] for index in expected
+    ]
+
+
+def test_percentiles_reports_p50_p95_p99_or_none_when_empty():
+    """단계 지연 요약은 p50/p95/p99를 계산하고, 표본이 없으면 None을 채운다."""
+    assert percentiles(list(range(1, 101))) == {"p50": 50.5, "p95": 95.05, "p99": 99.01}
+    assert percentiles([]) == {"p50": None, "p95": None, "p99": None}
@@ -0,0 +1,259 @@
+import numpy as np
+import pytest
+
+from app.core.error_codes import RecommendationErrorCode
+from app.core.exceptions import EmbeddingError
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_vector_index import AlbumVectorIndex
+from app.schemas.recommendation import RecommendByReviewRequest, RecommendationReason
+from app.services.bulk_recommendation_service import (
+    BulkJobRegistry,
+    BulkRecommendationService,
+)
+
+from tests.fixtures import ALBUM_ID_1, ALBUM_ID_2, ALBUM_ID_3, REVIEW_CONTENT
+
+
+class FakeEmbeddingService:
+    def __init__(self, error=None, fail_calls=()):
+        self.error = error
+        self.fail_calls = set(fail_calls)
+        self.calls = []
+
+    async def embed_reviews(self, review_contents):
+        self.calls.append(review_contents)
+        if self.error or len(self.calls) in self.fail_calls:
+            raise self.error or EmbeddingError("batch failed")
+        return [[1.0, 0.0] for _ in review_contents]
+
+
+class FakeVectorIndexLoader:
+    def __init__(self, rows):
+        self.index = AlbumVectorIndex.from_rows(rows)
+
+    async def get(self, repository):
+        return self.index
+
+    def peek(self, repository):
+        return self.index
+
+
+class FakeRecommendationReasonService:
+    async def generate_reasons(self, review_content, candidates):
+        return [
+            RecommendationReason(
+                album_id=candidate.album_id,
+                recommendation_reason=f"{candidate.album_id} 추천 사유",
+            )
+            for candidate in candidates
+        ]
+
+
+class FakeSpringCallbackClient:
+    def __init__(self):
+        self.completed_calls = []
+        self.failed_calls = []
+
+    async def send_completed_result(self, review_id, recommendations):
+        self.completed_calls.append(
+            {"review_id": review_id, "recommendations": recommendations}
+        )
+
+    async def send_failed_result(self, review_id, error_code, message):
+        self.failed_calls.append({"review_id": review_id, "error_code": error_code})
+
+
+ROWS = [
+    {"album_id": ALBUM_ID_1, "embedding": [1.0, 0.0]},
+    {"album_id": ALBUM_ID_2, "embedding": [0.6, 0.8]},
+]
+
+
+def make_items(count):
+    return [
+        RecommendByReviewRequest(review_id=review_id, review_content=REVIEW_CONTENT)
+        for review_id in range(1, count + 1)
+    ]
+
+
+def build_service(
+    embedding_service=None, rows=ROWS, callback_client=None, top_k=2, embedding_batch_size=100
+):
+    return BulkRecommendationService(
+        embedding_service=embedding_service or FakeEmbeddingService(),
+        album_embedding_repository=AlbumEmbeddingRepository(database=object()),
+        vector_index_loader=FakeVectorIndexLoader(rows),
+        recommendation_reason_service=FakeRecommendationReasonService(),
+        spring_callback_client=callback_client or FakeSpringCallbackClient(),
+        top_k=top_k,
+        embedding_batch_size=embedding_batch_size,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_embeds_once_and_sends_callback_per_review():
+    """모든 감상문을 한 번에 임베딩하고 리뷰별 COMPLETED 콜백을 보낸다."""
+    embedding_service = FakeEmbeddingService()
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(
+        embedding_service=embedding_service, callback_client=callback_client
+    )
+    job = BulkJobRegistry().create(total=3)
+
+    await service.run(job, make_items(3))
+
+    assert len(embedding_service.calls) == 1
+    assert sorted(call["review_id"] for call in callback_client.completed_calls) == [1, 2, 3]
+    first = callback_client.completed_calls[0]["recommendations"]
+    assert [item.album_id for item in first] == [ALBUM_ID_1, ALBUM_ID_2]
+    assert (job.status, job.embedded, job.searched, job.completed, job.failed) == (
+        "COMPLETED",
+        3,
+        3,
+        3,
+        0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_embedding_failure_sends_failed_callback_for_every_review():
+    """임베딩 실패 시 모든 리뷰에 EMBEDDING_FAILED 콜백을 보낸다."""
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(
+        embedding_service=FakeEmbeddingService(error=EmbeddingError("down")),
+        callback_client=callback_client,
+    )
+    job = BulkJobRegistry().create(total=2)
+
+    await service.run(job, make_items(2))
+
+    assert [call["error_code"] for call in callback_client.failed_calls] == [
+        RecommendationErrorCode.EMBEDDING_FAILED,
+        RecommendationErrorCode.EMBEDDING_FAILED,
+    ]
+    assert job.failed == 2
+    assert job.completed == 0
+    assert job.status == "FAILED"
+
+
+@pytest.mark.asyncio
+async def test_run_failed_embedding_batch_fails_only_its_reviews():
+    """임베딩 호출 하나가 실패하면 그 호출의 리뷰만 실패하고 작업은 PARTIAL로 끝난다."""
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(
+        embedding_service=FakeEmbeddingService(fail_calls={2}),
+        callback_client=callback_client,
+        embedding_batch_size=2,
+    )
+    job = BulkJobRegistry().create(total=5)
+
+    await service.run(job, make_items(5))
+
+    assert [call["review_id"] for call in callback_client.failed_calls] == [3, 4]
+    assert sorted(call["review_id"] for call in callback_client.completed_calls) == [1, 2, 5]
+    assert (job.status, job.embedded, job.completed, job.failed) == ("PARTIAL", 3, 3, 2)
+
+
+@pytest.mark.asyncio
+async def test_run_empty_index_sends_no_candidates():
+    """인덱스가 비어 있으면 NO_CANDIDATES 실패 콜백을 보낸다."""
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(rows=[], callback_client=callback_client)
+    job = BulkJobRegistry().create(total=1)
+
+    await service.run(job, make_items(1))
+
+    assert callback_client.failed_calls[0]["error_code"] == RecommendationErrorCode.NO_CANDIDATES
+
+
+def test_bulk_job_registry_keeps_only_recent_jobs():
+    """보관 개수를 넘으면 가장 오래된 작업부터 제거한다."""
+    registry = BulkJobRegistry(retention=2)
+    first = registry.create(total=1)
+    registry.create(total=1)
+    registry.create(total=1)
+
+    assert registry.get(first.job_id) is None
+
+
+class FakeRecommendationHistoryRepository:
+    async def recommended_album_ids(self, user_id, exclude_review_id=None):
+        return frozenset({ALBUM_ID_1}) if user_id == "user-1" else frozenset()
+
+
+@pytest.mark.asyncio
+async def test_run_excludes_albums_already_recommended_to_user():
+    """user_id가 있는 리뷰만 이전 추천 앨범을 빼고 검색한다."""
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(callback_client=callback_client)
+    service.recommendation_history_repository = FakeRecommendationHistoryRepository()
+    items = [
+        RecommendByReviewRequest(review_id=1, review_content=REVIEW_CONTENT, user_id="user-1"),
+        RecommendByReviewRequest(review_id=2, review_content=REVIEW_CONTENT),
+    ]
+
+    await service.run(BulkJobRegistry().create(total=2), items)
+
+    album_ids = {
+        call["review_id"]: [item.album_id for item in call["recommendations"]]
+        for call in callback_client.completed_calls
+    }
+    assert album_ids == {1: [ALBUM_ID_2], 2: [ALBUM_ID_1, ALBUM_ID_2]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_search_matches_realtime_fused_search():
+    """같은 임베딩이면 bulk도 실시간 검색과 같은 BM25 fusion을 거쳐 같은 후보를 찾는다."""
+    rows = [
+        {"album_id": ALBUM_ID_1, "album_title": "Kind of Blue", "embedding": [1.0, 0.0]},
+        {"album_id": ALBUM_ID_2, "album_title": "Blue Train", "embedding": [0.8, 0.6]},
+        {"album_id": ALBUM_ID_3, "album_title": "Time Out", "embedding": [0.6, 0.8]},
+    ]
+    loader = FakeVectorIndexLoader(rows)
+    repository = AlbumEmbeddingRepository(
+        database=object(), vector_index_loader=loader, hybrid_fetch_multiplier=1
+    )
+    service = build_service(rows=rows, top_k=2)
+    service.album_embedding_repository = repository
+    service.vector_index_loader = loader
+    service.candidate_fetch_multiplier = 1
+    items = [
+        RecommendByReviewRequest(review_id=1, review_content="time out"),
+        RecommendByReviewRequest(review_id=2, review_content="time out", user_id="user-1"),
+        RecommendByReviewRequest(review_id=3, review_content="모달"),
+    ]
+    queries = np.asarray([[1.0, 0.0]] * len(items), dtype=np.float32)
+    exclusions = [frozenset(), frozenset({ALBUM_ID_1}), frozenset()]
+
+    bulk = service._search(loader.index, items, queries, exclusions)
+    realtime = [
+        await repository.find_similar_albums(
+            query, 2, query_text=item.review_content, exclude_album_ids=excluded
+        )
+        for item, query, excluded in zip(items, queries, exclusions)
+    ]
+
+    def ids(results):
+        return [[candidate.album_id for candidate in candidates] for candidates in results]
+
+    assert ids(bulk) == ids(realtime)
+    # BM25가 섞이지 않았다면 벡터 TOP 2(ALBUM_ID_1, ALBUM_ID_2)만 나온다.
+    assert ALBUM_ID_3 in ids(bulk)[0]
+
+
+class FailingEconomyScheduler:
+    async def enqueue(self, review_id, review_content, candidates):
+        if review_id == 2:
+            raise RuntimeError("database is locked")
+
+
+@pytest.mark.asyncio
+async def test_run_counts_review_failure_without_failing_whole_job():
+    """한 리뷰 처리에서 예외가 나도 다른 리뷰는 끝까지 세고 작업은 PARTIAL로 끝난다."""
+    service = build_service()
+    service.economy_reason_scheduler = FailingEconomyScheduler()
+    job = BulkJobRegistry().create(total=3)
+
+    await service.run(job, make_items(3), mode="economy")
+
+    assert (job.status, job.completed, job.failed) == ("PARTIAL", 2, 1)
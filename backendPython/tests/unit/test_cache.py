@@ -0,0 +1,40 @@
+from app.core.cache import LruCache, content_hash
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used_entry():
+    """최대 크기를 넘으면 가장 오래 사용되지 않은 항목을 제거한다."""
+    cache = LruCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expired_entry_is_miss():
+    """TTL이 지난 항목은 miss로 집계하고 제거한다."""
+    clock = FakeClock()
+    cache = LruCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 6
+    assert cache.get("a") is None
+    assert cache.hits == 0
+    assert cache.misses == 1
+    assert len(cache) == 0
+
+
+def test_content_hash_separates_parts():
+    """구분자를 넣어 part 경계가 다른 입력이 같은 key가 되지 않는다."""
+    assert content_hash("ab", "c") != content_hash("a", "bc")
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.clients.callback_batcher import CallbackBatcher
+from app.core.exceptions import ConfigurationError
+
+from tests.fixtures import REVIEW_ID
+
+
+COMPLETED_BODY = {"status": "COMPLETED", "recommendations": []}
+
+
+class FakeDeliver:
+    def __init__(self, fail_urls=()):
+        self.calls = []
+        self.fail_urls = set(fail_urls)
+
+    async def __call__(self, url, body, headers=None):
+        self.calls.append({"url": url, "body": body, "headers": headers or {}})
+        if url in self.fail_urls:
+            raise RuntimeError("spring unavailable")
+
+
+def test_callback_batcher_requires_deliver_function():
+    """전송 함수 없이 batcher를 만들면 설정 오류로 실패한다."""
+    with pytest.raises(ConfigurationError, match="deliver"):
+        CallbackBatcher(deliver=None, base_url="https://spring.example.com")
+
+
+@pytest.mark.asyncio
+async def test_add_within_window_sends_single_batch_request():
+    """window 안에 들어온 완료 결과는 배치 콜백 한 번으로 전송된다."""
+    deliver = FakeDeliver()
+    batcher = CallbackBatcher(
+        deliver=deliver,
+        base_url="https://spring.example.com",
+        window_seconds=0.01,
+        max_batch_size=10,
+    )
+
+    await batcher.add(REVIEW_ID, COMPLETED_BODY)
+    await batcher.add(REVIEW_ID + 1, COMPLETED_BODY)
+    await asyncio.sleep(0.05)
+
+    assert len(deliver.calls) == 1
+    assert deliver.calls[0]["url"] == (
+        "https://spring.example.com/api/user-reviews/recommendations/batch"
+    )
+    assert [item["reviewId"] for item in deliver.calls[0]["body"]["callbacks"]] == [
+        REVIEW_ID,
+        REVIEW_ID + 1,
+    ]
+    assert deliver.calls[0]["body"]["callbacks"][0]["status"] == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_add_reaching_max_batch_size_flushes_immediately():
+    """배치 크기 상한에 도달하면 window를 기다리지 않고 전송한다."""
+    deliver = FakeDeliver()
+    batcher = CallbackBatcher(
+        deliver=deliver,
+        base_url="https://spring.example.com",
+        window_seconds=60,
+        max_batch_size=2,
+    )
+
+    await batcher.add(REVIEW_ID, COMPLETED_BODY)
+    await batcher.add(REVIEW_ID + 1, COMPLETED_BODY)
+
+    assert len(deliver.calls) == 1
+    assert len(deliver.calls[0]["body"]["callbacks"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_results():
+    """종료 시 window가 끝나지 않은 결과도 전송한다."""
+    deliver = FakeDeliver()
+    batcher = CallbackBatcher(
+        deliver=deliver,
+        base_url="https://spring.example.com",
+        window_seconds=60,
+        max_batch_size=10,
+    )
+
+    await batcher.add(REVIEW_ID, COMPLETED_BODY)
+    await batcher.stop()
+
+    assert len(deliver.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_individual_callbacks():
+    """배치 전송이 실패하면 결과를 버리지 않고 항목마다 원래 traceparent로 개별 콜백한다."""
+    batch_url = "https://spring.example.com/api/user-reviews/recommendations/batch"
+    deliver = FakeDeliver(fail_urls=[batch_url])
+    batcher = CallbackBatcher(
+        deliver=deliver,
+        base_url="https://spring.example.com",
+        window_seconds=60,
+        max_batch_size=10,
+    )
+    traceparent = {"traceparent": "00-" + "a" * 32 + "-" + "b" * 16 + "-01"}
+
+    await batcher.add(REVIEW_ID, COMPLETED_BODY, traceparent)
+    await batcher.add(REVIEW_ID + 1, COMPLETED_BODY)
+    await batcher.stop()
+
+    assert [call["url"] for call in deliver.calls] == [
+        batch_url,
+        f"https://spring.example.com/api/user-reviews/{REVIEW_ID}/recommendations",
+        f"https://spring.example.com/api/user-reviews/{REVIEW_ID + 1}/recommendations",
+    ]
+    assert deliver.calls[1]["headers"] == traceparent
+    assert deliver.calls[1]["body"] == COMPLETED_BODY
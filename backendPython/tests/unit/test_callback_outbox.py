@@ -0,0 +1,263 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from app.clients.callback_outbox import CallbackDispatcher, CallbackOutbox
+from app.core.exceptions import ConfigurationError
+
+from tests.fixtures import REVIEW_ID
+
+
+CALLBACK_URL = f"https://spring.example.com/api/user-reviews/{REVIEW_ID}/recommendations"
+PAYLOAD = {"status": "COMPLETED", "recommendations": []}
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_dispatcher(outbox, handler, **overrides):
+    options = {
+        "max_attempts": 3,
+        "retry_base_seconds": 2.0,
+        "retry_max_seconds": 60.0,
+        "max_concurrency_per_host": 4,
+        "drain_timeout_seconds": 1.0,
+        "jitter": lambda: 0.0,
+    }
+    options.update(overrides)
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return CallbackDispatcher(outbox=outbox, http_client=http_client, **options)
+
+
+class LockedOutbox(CallbackOutbox):
+    """다른 프로세스가 SQLite lock을 잡은 것처럼 claim이 풀릴 때까지 기다린다."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.claiming = threading.Event()
+        self.released = threading.Event()
+
+    def claim(self, *args, **kwargs):
+        self.claiming.set()
+        assert self.released.wait(timeout=2)
+        return super().claim(*args, **kwargs)
+
+
+def test_callback_dispatcher_requires_outbox_and_http_client():
+    """운영 조립 경로에서 outbox 또는 HTTP client 누락은 설정 오류로 실패한다."""
+    with pytest.raises(ConfigurationError, match="CallbackOutbox"):
+        CallbackDispatcher(outbox=None, http_client=object())
+    with pytest.raises(ConfigurationError, match="http client"):
+        CallbackDispatcher(outbox=CallbackOutbox(":memory:"), http_client=None)
+
+
+def test_callback_outbox_keeps_pending_payload_across_reopen(tmp_path):
+    """전송 전 기록된 payload는 프로세스 재시작 후에도 남아 있다."""
+    path = str(tmp_path / "outbox.sqlite3")
+    outbox = CallbackOutbox(path)
+    outbox.add(CALLBACK_URL, PAYLOAD, now=1000.0)
+    outbox.close()
+
+    reopened = CallbackOutbox(path)
+    entries = reopened.due(now=1000.0)
+    reopened.close()
+
+    assert len(entries) == 1
+    assert entries[0].url == CALLBACK_URL
+    assert entries[0].body == PAYLOAD
+    assert entries[0].attempts == 0
+
+
+def test_claim_leases_entries_so_other_processes_skip_them(tmp_path):
+    """같은 파일을 연 두 프로세스는 같은 payload를 가져가지 않고, lease가 지나면 다시 가져간다."""
+    path = str(tmp_path / "outbox.sqlite3")
+    first = CallbackOutbox(path)
+    second = CallbackOutbox(path)
+    first.add(CALLBACK_URL, PAYLOAD, now=1000.0)
+    first.add(CALLBACK_URL, PAYLOAD, now=1000.0)
+
+    claimed = first.claim(now=1000.0, lease_seconds=30.0, limit=1)
+    other = second.claim(now=1000.0, lease_seconds=30.0)
+    expired = second.claim(now=1031.0, lease_seconds=30.0)
+    first.close()
+    second.close()
+
+    assert len(claimed) == 1 and len(other) == 1
+    assert claimed[0].id != other[0].id
+    assert [entry.id for entry in expired] == [claimed[0].id, other[0].id]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_due_delivers_and_removes_entry():
+    """2xx 응답을 받으면 outbox에서 payload를 제거한다."""
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    clock = FakeClock()
+    outbox = CallbackOutbox(":memory:")
+    dispatcher = make_dispatcher(outbox, handler, clock=clock)
+
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD)
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+
+    assert str(requests[0].url) == CALLBACK_URL
+    assert outbox.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_due_failure_schedules_exponential_backoff():
+    """전송 실패 시 attempts를 늘리고 지수 backoff 시각으로 재예약한다."""
+    async def handler(request):
+        return httpx.Response(503, content=b"deploying")
+
+    clock = FakeClock()
+    outbox = CallbackOutbox(":memory:")
+    dispatcher = make_dispatcher(outbox, handler, clock=clock)
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD)
+
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+    first_retry_at = outbox.next_due_at()
+    clock.now = first_retry_at
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+
+    assert first_retry_at == pytest.approx(1000.0 + 1.0)
+    assert outbox.next_due_at() == pytest.approx(first_retry_at + 2.0)
+    assert outbox.due(now=float("inf"))[0].attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatch_due_exhausted_attempts_marks_entry_dead(caplog):
+    """최대 시도 횟수를 넘기면 재시도를 멈추고 CALLBACK_FAILED 로그를 남긴다."""
+    async def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    clock = FakeClock()
+    outbox = CallbackOutbox(":memory:")
+    dispatcher = make_dispatcher(outbox, handler, clock=clock, max_attempts=1)
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD)
+
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+
+    assert outbox.pending_count() == 0
+    assert "CALLBACK_FAILED" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_dispatch_due_limits_concurrency_per_host():
+    """같은 호스트로의 동시 전송 수는 설정값을 넘지 않는다."""
+    active = 0
+    max_active = 0
+
+    async def handler(request):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200)
+
+    outbox = CallbackOutbox(":memory:")
+    dispatcher = make_dispatcher(outbox, handler, max_concurrency_per_host=2)
+    for _ in range(6):
+        await dispatcher.enqueue(CALLBACK_URL, PAYLOAD)
+
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+
+    assert max_active == 2
+    assert outbox.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_entries_waiting_for_backoff():
+    """종료 시 backoff 대기 중인 payload도 한 번 더 전송을 시도한다."""
+    responses = iter([httpx.Response(503), httpx.Response(200)])
+
+    async def handler(request):
+        return next(responses)
+
+    clock = FakeClock()
+    outbox = CallbackOutbox(":memory:")
+    dispatcher = make_dispatcher(outbox, handler, clock=clock)
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD)
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+    assert outbox.pending_count() == 1
+
+    await dispatcher.stop()
+
+    assert outbox.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_batches_completed_results_and_retries_each_on_failure():
+    """COMPLETED 결과는 outbox에 먼저 기록되고 전송 시점에 배치로 묶인다. 배치가 실패하면 항목마다 재예약된다."""
+    responses = iter([httpx.Response(503), httpx.Response(200)])
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return next(responses)
+
+    clock = FakeClock(now=1000.2)
+    outbox = CallbackOutbox(":memory:")
+    dispatcher = make_dispatcher(
+        outbox,
+        handler,
+        clock=clock,
+        batch_window_seconds=0.5,
+        base_url="https://spring.example.com",
+    )
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD, review_id=REVIEW_ID)
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD, review_id=REVIEW_ID + 1)
+    assert await dispatcher.dispatch_due() == 0
+
+    clock.now = 1000.5
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+    assert outbox.pending_count() == 2
+    assert {entry.attempts for entry in outbox.due(now=float("inf"))} == {1}
+
+    clock.now = outbox.next_due_at()
+    await dispatcher.dispatch_due()
+    await asyncio.gather(*dispatcher._in_flight.values())
+
+    assert len(requests) == 2
+    assert str(requests[1].url).endswith("/api/user-reviews/recommendations/batch")
+    callbacks = json.loads(requests[1].content)["callbacks"]
+    assert [callback["reviewId"] for callback in callbacks] == [REVIEW_ID, REVIEW_ID + 1]
+    assert outbox.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_due_waits_for_sqlite_lock_off_event_loop():
+    """outbox가 lock을 기다리는 동안에도 이벤트 루프는 다른 작업을 처리한다."""
+    async def handler(request):
+        return httpx.Response(200)
+
+    outbox = LockedOutbox(":memory:")
+    dispatcher = make_dispatcher(outbox, handler)
+    await dispatcher.enqueue(CALLBACK_URL, PAYLOAD)
+
+    dispatching = asyncio.create_task(dispatcher.dispatch_due())
+    assert await asyncio.to_thread(outbox.claiming.wait, 2)
+    outbox.released.set()
+
+    assert await dispatching == 1
+    await asyncio.gather(*dispatcher._in_flight.values())
+    assert outbox.pending_count() == 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from app.schemas.recommendation import AlbumCandidate
+from app.services.candidate_diversifier import diversify_candidates, scale_to_similarity
+
+
+def make(album_id, similarity, artist, embedding=None, critics_review_id=""):
+    return AlbumCandidate(
+        album_id=album_id,
+        similarity=similarity,
+        artist_name=artist,
+        critics_review_id=critics_review_id,
+        embedding=None if embedding is None else np.asarray(embedding, dtype=np.float32),
+    )
+
+
+def ids(candidates):
+    return [candidate.album_id for candidate in candidates]
+
+
+def test_same_artist_is_limited_to_one_album():
+    """같은 아티스트는 한 번만 고르고 다음 아티스트 후보로 넘어간다."""
+    candidates = [
+        make("1", 0.95, "Bill Evans"),
+        make("2", 0.94, "bill  evans"),
+        make("3", 0.90, "Keith Jarrett"),
+    ]
+
+    assert ids(diversify_candidates(candidates, top_k=2)) == ["1", "3"]
+
+
+def test_near_duplicate_embeddings_are_penalized():
+    """유사도가 조금 높아도 이미 고른 앨범과 거의 같은 벡터면 뒤로 밀린다."""
+    candidates = [
+        make("1", 0.95, "A", [1.0, 0.0]),
+        make("2", 0.94, "B", [0.99, 0.01]),
+        make("3", 0.85, "C", [0.0, 1.0]),
+    ]
+
+    assert ids(diversify_candidates(candidates, top_k=2, mmr_lambda=0.7)) == ["1", "3"]
+    assert ids(diversify_candidates(candidates, top_k=2, mmr_lambda=1.0)) == ["1", "2"]
+
+
+def test_other_reviews_of_selected_album_are_never_reused():
+    """같은 앨범의 다른 평론 row는 후보가 모자라도 다시 고르지 않는다."""
+    candidates = [
+        make("1", 0.95, "A", critics_review_id="11"),
+        make("1", 0.93, "A", critics_review_id="12"),
+        make("2", 0.80, "B"),
+    ]
+
+    assert ids(diversify_candidates(candidates, top_k=3)) == ["1", "2"]
+
+
+def test_artist_constraint_is_relaxed_to_fill_top_k():
+    """아티스트 제약만으로 top_k가 안 차면 남은 후보로 채운다."""
+    candidates = [make("1", 0.95, "A"), make("2", 0.90, "A"), make("3", 0.80, "B")]
+
+    assert ids(diversify_candidates(candidates, top_k=3)) == ["1", "3", "2"]
+
+
+def test_reranker_scores_are_scaled_to_similarity_range_before_mmr():
+    """sigmoid 점수를 그대로 쓰면 중복 후보가 뽑히지만, similarity 범위로 맞추면 중복 항이 작동한다."""
+    candidates = [
+        make("1", 0.80, "A", [1.0, 0.0]),
+        make("2", 0.79, "B", [0.99, 0.01]),
+        make("3", 0.78, "C", [0.0, 1.0]),
+    ]
+    raw = [0.99, 0.9, 0.1]
+
+    scaled = scale_to_similarity(raw, candidates)
+
+    assert scaled.tolist() == pytest.approx([0.80, 0.78 + 0.02 * 0.8 / 0.89, 0.78], abs=1e-5)
+    assert ids(diversify_candidates(candidates, top_k=2, relevance=raw)) == ["1", "2"]
+    assert ids(diversify_candidates(candidates, top_k=2, relevance=scaled)) == ["1", "3"]
+    # reranker 점수가 모두 같으면 구분할 정보가 없으므로 similarity를 쓴다.
+    assert scale_to_similarity([0.5, 0.5, 0.5], candidates).tolist() == pytest.approx(
+        [0.80, 0.79, 0.78]
+    )
@@ -0,0 +1,59 @@
+import pytest
+
+from app.core.exceptions import ConfigurationError
+from app.schemas.recommendation import AlbumCandidate
+from app.services.candidate_page_store import CandidatePageStore
+from app.services.recommendation_service import PagedCandidates
+
+from tests.fixtures import REVIEW_CONTENT, REVIEW_ID
+
+
+PAGED = PagedCandidates(
+    REVIEW_CONTENT,
+    [
+        AlbumCandidate(
+            album_id="7",
+            similarity=0.91,
+            album_title="Kind of Blue",
+            artist_name="Miles Davis",
+            critics_review_id="70",
+            rating=4.5,
+        ),
+        AlbumCandidate(album_id="8", similarity=0.8),
+    ],
+)
+
+
+def test_store_without_path_raises_configuration_error():
+    """경로 없이 생성하면 ConfigurationError가 발생한다."""
+    with pytest.raises(ConfigurationError):
+        CandidatePageStore("")
+
+
+def test_candidates_written_by_one_process_are_read_by_another(tmp_path):
+    """첫 page를 만든 프로세스가 저장한 후보를 같은 파일을 연 다른 프로세스가 그대로 읽는다."""
+    path = str(tmp_path / "candidate_pages.sqlite3")
+    writer = CandidatePageStore(path)
+    reader = CandidatePageStore(path)
+
+    writer.set(REVIEW_ID, PAGED)
+    paged = reader.get(REVIEW_ID)
+    writer.close()
+    reader.close()
+
+    assert paged == PAGED
+    assert paged.candidates[0].rating == 4.5
+
+
+def test_expired_candidates_are_not_returned_and_pruned_on_write():
+    """TTL이 지난 후보는 읽히지 않고, 다음 쓰기에서 지워진다."""
+    now = [0.0]
+    store = CandidatePageStore(":memory:", ttl_seconds=60, clock=lambda: now[0])
+    store.set(REVIEW_ID, PAGED)
+
+    now[0] = 60.0
+    assert store.get(REVIEW_ID) is None
+
+    store.set(REVIEW_ID + 1, PAGED)
+    assert len(store) == 1
+    assert store.get(REVIEW_ID + 1) == PAGED
@@ -0,0 +1,109 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.core.exceptions import RepositoryError
+from app.jobs.train_reranker import load_examples
+from app.repositories.album_metadata_store import AlbumMetadataStore
+from app.schemas.recommendation import AlbumCandidate
+from app.services.candidate_reranker import (
+    FEATURE_NAMES,
+    MISSING_FEATURE_VALUE,
+    LinearReranker,
+    candidate_features,
+    fit_linear_reranker,
+)
+
+
+def test_candidate_features_cover_similarity_overlap_rating_and_recency():
+    """feature는 유사도, 감상문 token 겹침 비율, 평점/5, 발행 연도 반감기 순서다."""
+    candidates = [
+        AlbumCandidate(
+            album_id="1",
+            similarity=0.8,
+            review_summary="따뜻한 피아노",
+            rating=4.0,
+            published_year=2016,
+        ),
+        AlbumCandidate(album_id="2", similarity=0.6, review_content="drums"),
+    ]
+
+    features = candidate_features("따뜻한 피아노", candidates, current_year=2026)
+
+    assert features.shape == (2, len(FEATURE_NAMES))
+    assert features[0].tolist() == pytest.approx([0.8, 1.0, 0.8, 0.5])
+    # 평점과 발행일이 없으면 중간값을 쓴다.
+    assert features[1].tolist() == pytest.approx(
+        [0.6, 0.0, MISSING_FEATURE_VALUE, MISSING_FEATURE_VALUE]
+    )
+
+
+def test_metadata_store_carries_rating_and_published_year_to_candidates():
+    """view row의 rating/published_date는 materialize한 후보까지 전달된다."""
+    store = AlbumMetadataStore.from_rows(
+        [
+            {"album_id": "1", "rating": "4.5", "published_date": "2019-03-01"},
+            {"album_id": "2", "rating": None, "published_date": ""},
+        ]
+    )
+
+    rated, unrated = store.materialize_many([0, 1], [0.9, 0.8])
+
+    assert (rated.rating, rated.published_year) == (4.5, 2019)
+    assert (unrated.rating, unrated.published_year) == (None, None)
+
+
+def test_fit_learns_to_prefer_clicked_feature_and_round_trips(tmp_path):
+    """클릭된 후보가 lexical overlap이 높으면 학습된 모델도 그 후보를 위로 올린다."""
+    rng = np.random.default_rng(0)
+    features = rng.uniform(size=(400, len(FEATURE_NAMES)))
+    labels = (features[:, 1] > 0.5).astype(np.float32)
+
+    reranker = fit_linear_reranker(features, labels)
+    path = tmp_path / "reranker.json"
+    reranker.save(str(path))
+    loaded = LinearReranker.load(str(path))
+
+    high, low = loaded.score(np.array([[0.5, 0.9, 0.5, 0.5], [0.5, 0.1, 0.5, 0.5]]))
+    assert high > 0.5 > low
+    assert np.argmax(np.abs(loaded.weights)) == FEATURE_NAMES.index("lexical_overlap")
+
+
+def test_load_rejects_model_with_other_feature_set(tmp_path):
+    """feature 구성이 다른 모델 파일은 RepositoryError로 거부한다."""
+    path = tmp_path / "reranker.json"
+    path.write_text(
+        json.dumps(
+            {"model": "linear", "features": ["similarity"], "weights": [1.0],
+             "bias": 0.0, "mean": [0.0], "scale": [1.0]}
+        ),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(RepositoryError):
+        LinearReranker.load(str(path))
+
+
+def test_load_examples_flattens_candidates_with_labels():
+    """학습 예제는 감상문별 노출 후보를 feature 행과 0/1 label로 펼친다."""
+    lines = [
+        json.dumps(
+            {
+                "review_content": "피아노",
+                "candidates": [
+                    {"similarity": 0.9, "review_summary": "피아노", "label": 1},
+                    {"similarity": 0.7, "label": 0},
+                ],
+            },
+            ensure_ascii=False,
+        ),
+        "",
+        json.dumps({"review_content": "빈 예제", "candidates": []}, ensure_ascii=False),
+    ]
+
+    features, labels = load_examples(lines)
+
+    assert features.shape == (2, len(FEATURE_NAMES))
+    assert labels.tolist() == [1.0, 0.0]
+    assert features[:, 1].tolist() == [1.0, 0.0]
@@ -2,7 +2,10 @@ from types import SimpleNamespace
 
 import pytest
 
-from app.api.dependencies import get_recommendation_service
+from app.api.dependencies import (
+    get_bulk_recommendation_service,
+    get_recommendation_service,
+)
 from app.core.exceptions import ConfigurationError
 
 
@@ -107,3 +110,26 @@ def test_get_recommendation_service_none_resource_raises_configuration_error(
 
     with pytest.raises(ConfigurationError, match=f"app.state.{resource_name}"):
         get_recommendation_service(request)
+
+
+def test_get_bulk_recommendation_service_uses_app_scoped_index_and_limiter():
+    """bulk provider는 app.state의 인덱스 loader와 LLM 동시성 limiter를 주입한다."""
+    request = make_request()
+    loader = object()
+    limiter = object()
+    request.app.state.album_vector_index_loader = loader
+    request.app.state.bulk_reason_limiter = limiter
+
+    service = get_bulk_recommendation_service(request)
+
+    assert service.vector_index_loader is loader
+    assert service.recommendation_reason_service.concurrency_limiter is limiter
+
+
+def test_get_bulk_recommendation_service_missing_index_loader_raises_configuration_error():
+    """인덱스 loader가 없으면 설정 누락 예외가 발생한다."""
+    request = make_request()
+    request.app.state.bulk_reason_limiter = object()
+
+    with pytest.raises(ConfigurationError, match="app.state.album_vector_index_loader"):
+        get_bulk_recommendation_service(request)
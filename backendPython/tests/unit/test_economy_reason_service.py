@@ -0,0 +1,333 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.exceptions import ConfigurationError
+from app.schemas.recommendation import AlbumCandidate
+from app.services.economy_reason_service import (
+    EconomyBatchStore,
+    EconomyReasonScheduler,
+)
+
+from tests.fixtures import ALBUM_ID_1, ALBUM_ID_2, REVIEW_CONTENT, REVIEW_ID
+
+
+def make_album_candidate(album_id=ALBUM_ID_1, similarity=0.9):
+    return AlbumCandidate(
+        album_id=album_id,
+        similarity=similarity,
+        album_title="Kind of Blue",
+        artist_name="Miles Davis",
+        review_summary="차분한 모달 재즈",
+        review_content="modal jazz",
+        critics_review_id="1001",
+    )
+
+
+class FakeFiles:
+    def __init__(self, output_text=""):
+        self.uploads = []
+        self.output_text = output_text
+
+    async def create(self, file, purpose):
+        self.uploads.append({"file": file, "purpose": purpose})
+        return SimpleNamespace(id="file-input")
+
+    async def content(self, file_id):
+        return SimpleNamespace(text=self.output_text)
+
+
+class FakeBatches:
+    def __init__(self, status="in_progress"):
+        self.created = []
+        self.status = status
+
+    async def create(self, input_file_id, endpoint, completion_window):
+        self.created.append(
+            {
+                "input_file_id": input_file_id,
+                "endpoint": endpoint,
+                "completion_window": completion_window,
+            }
+        )
+        return SimpleNamespace(id="batch-1")
+
+    async def retrieve(self, batch_id):
+        return SimpleNamespace(id=batch_id, status=self.status, output_file_id="file-output")
+
+
+class FakeOpenAIClient:
+    def __init__(self, status="in_progress", output_text=""):
+        self.files = FakeFiles(output_text)
+        self.batches = FakeBatches(status)
+
+
+class FakeRecommendationReasonService:
+    def build_messages(self, review_content, candidate):
+        return [{"role": "user", "content": f"{review_content} / {candidate.album_title}"}]
+
+    def build_fallback_reason(self, review_content, candidate):
+        return "fallback 사유"
+
+
+class FakeSpringCallbackClient:
+    def __init__(self):
+        self.completed_calls = []
+
+    async def send_completed_result(self, review_id, recommendations):
+        self.completed_calls.append(
+            {"review_id": review_id, "recommendations": recommendations}
+        )
+
+
+def build_scheduler(store, openai_client, callback_client=None, **overrides):
+    return EconomyReasonScheduler(
+        store=store,
+        openai_client=openai_client,
+        recommendation_reason_service=FakeRecommendationReasonService(),
+        spring_callback_client=callback_client or FakeSpringCallbackClient(),
+        **overrides,
+    )
+
+
+def batch_output_line(custom_id, content):
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": content}}]},
+            },
+        }
+    )
+
+
+def test_economy_reason_scheduler_requires_store_and_openai_client():
+    """운영 조립 경로에서 store 또는 OpenAI client 누락은 설정 오류로 실패한다."""
+    with pytest.raises(ConfigurationError, match="EconomyBatchStore"):
+        build_scheduler(None, FakeOpenAIClient())
+    with pytest.raises(ConfigurationError, match="openai client"):
+        build_scheduler(EconomyBatchStore(":memory:"), None)
+
+
+def test_economy_batch_store_keeps_requests_across_reopen(tmp_path):
+    """Batch 결과를 기다리는 요청은 프로세스 재시작 후에도 후보와 함께 남아 있다."""
+    path = str(tmp_path / "economy.sqlite3")
+    store = EconomyBatchStore(path)
+    store.add(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()])
+    store.close()
+
+    reopened = EconomyBatchStore(path)
+    requests = reopened.unsubmitted()
+    reopened.close()
+
+    assert requests[0].review_id == REVIEW_ID
+    assert requests[0].candidates == [make_album_candidate()]
+
+
+@pytest.mark.asyncio
+async def test_submit_pending_uploads_jsonl_and_assigns_batch_id():
+    """대기 중인 후보마다 chat completion 요청 한 줄을 만들어 Batch API에 제출한다."""
+    store = EconomyBatchStore(":memory:")
+    openai_client = FakeOpenAIClient()
+    scheduler = build_scheduler(store, openai_client)
+    await scheduler.enqueue(
+        REVIEW_ID,
+        REVIEW_CONTENT,
+        [make_album_candidate(ALBUM_ID_1), make_album_candidate(ALBUM_ID_2)],
+    )
+
+    batch_id = await scheduler.submit_pending()
+
+    _, content = openai_client.files.uploads[0]["file"]
+    lines = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+    assert batch_id == "batch-1"
+    assert openai_client.files.uploads[0]["purpose"] == "batch"
+    assert openai_client.batches.created[0]["endpoint"] == "/v1/chat/completions"
+    assert [line["custom_id"] for line in lines] == [
+        f"reason-{REVIEW_ID}-0",
+        f"reason-{REVIEW_ID}-1",
+    ]
+    assert store.unsubmitted() == []
+    assert store.submitted_batch_ids() == ["batch-1"]
+
+
+@pytest.mark.asyncio
+async def test_submit_pending_limits_requests_per_batch():
+    """한 batch의 요청 수가 상한을 넘으면 남은 리뷰는 다음 주기로 미룬다."""
+    store = EconomyBatchStore(":memory:")
+    scheduler = build_scheduler(store, FakeOpenAIClient(), max_requests_per_batch=2)
+    await scheduler.enqueue(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()] * 2)
+    await scheduler.enqueue(REVIEW_ID + 1, REVIEW_CONTENT, [make_album_candidate()])
+
+    await scheduler.submit_pending()
+
+    assert [request.review_id for request in store.unsubmitted()] == [REVIEW_ID + 1]
+
+
+@pytest.mark.asyncio
+async def test_collect_finished_sends_callback_and_fills_missing_reasons():
+    """완료된 batch 결과로 COMPLETED 콜백을 보내고, 누락된 사유는 fallback으로 채운다."""
+    store = EconomyBatchStore(":memory:")
+    openai_client = FakeOpenAIClient(
+        status="completed",
+        output_text=batch_output_line(f"reason-{REVIEW_ID}-0", "모달 재즈 추천 사유"),
+    )
+    callback_client = FakeSpringCallbackClient()
+    scheduler = build_scheduler(store, openai_client, callback_client)
+    await scheduler.enqueue(
+        REVIEW_ID,
+        REVIEW_CONTENT,
+        [make_album_candidate(ALBUM_ID_1), make_album_candidate(ALBUM_ID_2)],
+    )
+    await scheduler.submit_pending()
+
+    collected = await scheduler.collect_finished()
+
+    recommendations = callback_client.completed_calls[0]["recommendations"]
+    assert collected == 1
+    assert [item.recommendation_reason for item in recommendations] == [
+        "모달 재즈 추천 사유",
+        "fallback 사유",
+    ]
+    assert store.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_collect_finished_skips_batches_still_in_progress():
+    """진행 중인 batch는 콜백 없이 다음 주기까지 store에 남겨 둔다."""
+    store = EconomyBatchStore(":memory:")
+    callback_client = FakeSpringCallbackClient()
+    scheduler = build_scheduler(store, FakeOpenAIClient(), callback_client)
+    await scheduler.enqueue(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()])
+    await scheduler.submit_pending()
+
+    collected = await scheduler.collect_finished()
+
+    assert collected == 0
+    assert callback_client.completed_calls == []
+    assert store.pending_count() == 1
+
+
+class FlakyBatches(FakeBatches):
+    """지정한 batch id 조회만 실패시키고, 제출마다 새 batch id를 발급한다."""
+
+    def __init__(self, failing_batch_ids, status="completed"):
+        super().__init__(status)
+        self.failing_batch_ids = set(failing_batch_ids)
+
+    async def create(self, input_file_id, endpoint, completion_window):
+        await super().create(input_file_id, endpoint, completion_window)
+        return SimpleNamespace(id=f"batch-{len(self.created)}")
+
+    async def retrieve(self, batch_id):
+        if batch_id in self.failing_batch_ids:
+            raise RuntimeError(f"{batch_id} not found")
+        return await super().retrieve(batch_id)
+
+
+@pytest.mark.asyncio
+async def test_collect_finished_isolates_batch_that_fails_to_retrieve():
+    """한 batch 조회가 실패해도 다른 batch는 수집하고, 실패한 batch는 store에 남긴다."""
+    store = EconomyBatchStore(":memory:")
+    openai_client = FakeOpenAIClient()
+    openai_client.batches = FlakyBatches({"batch-1"})
+    callback_client = FakeSpringCallbackClient()
+    scheduler = build_scheduler(store, openai_client, callback_client)
+    await scheduler.enqueue(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()])
+    await scheduler.submit_pending()
+    await scheduler.enqueue(REVIEW_ID + 1, REVIEW_CONTENT, [make_album_candidate()])
+    await scheduler.submit_pending()
+
+    collected = await scheduler.collect_finished()
+
+    assert collected == 1
+    assert [call["review_id"] for call in callback_client.completed_calls] == [REVIEW_ID + 1]
+    assert store.submitted_batch_ids() == ["batch-1"]
+
+
+@pytest.mark.asyncio
+async def test_batch_failing_repeatedly_is_resubmitted_and_new_requests_still_submit():
+    """상한만큼 조회에 실패한 batch는 새 batch로 다시 내고, 수집 실패 중에도 제출은 계속된다."""
+    store = EconomyBatchStore(":memory:")
+    openai_client = FakeOpenAIClient()
+    openai_client.batches = FlakyBatches({"batch-1"}, status="in_progress")
+    scheduler = build_scheduler(store, openai_client, max_batch_failures=2)
+    await scheduler.enqueue(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()])
+    await scheduler.submit_pending()
+
+    await scheduler.enqueue(REVIEW_ID + 1, REVIEW_CONTENT, [make_album_candidate()])
+    await scheduler.run_once()
+
+    assert sorted(store.submitted_batch_ids()) == ["batch-1", "batch-2"]
+
+    await scheduler.run_once()
+
+    assert [request.review_id for request in store.for_batch("batch-3")] == [REVIEW_ID]
+    assert "batch-1" not in store.submitted_batch_ids()
+
+
+class ExpiredBatches(FlakyBatches):
+    """제출한 batch가 모두 출력 파일 없이 expired로 끝난다."""
+
+    def __init__(self):
+        super().__init__((), status="expired")
+
+    async def retrieve(self, batch_id):
+        return SimpleNamespace(id=batch_id, status=self.status, output_file_id=None)
+
+
+@pytest.mark.asyncio
+async def test_batch_ending_without_output_is_resubmitted_before_fallback():
+    """출력 없이 끝난 batch의 요청은 시도 상한까지 새 batch로 다시 내고, 그 뒤에만 fallback 사유로 보낸다."""
+    store = EconomyBatchStore(":memory:")
+    openai_client = FakeOpenAIClient()
+    openai_client.batches = ExpiredBatches()
+    callback_client = FakeSpringCallbackClient()
+    scheduler = build_scheduler(store, openai_client, callback_client, max_batch_attempts=2)
+    await scheduler.enqueue(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()])
+    await scheduler.submit_pending()
+
+    assert await scheduler.collect_finished() == 0
+    assert callback_client.completed_calls == []
+    [request] = store.unsubmitted()
+    assert request.batch_attempts == 1
+
+    assert await scheduler.submit_pending() == "batch-2"
+    assert await scheduler.collect_finished() == 1
+    recommendations = callback_client.completed_calls[0]["recommendations"]
+    assert [item.recommendation_reason for item in recommendations] == ["fallback 사유"]
+    assert store.pending_count() == 0
+
+
+class LockedStore(EconomyBatchStore):
+    """다른 연결이 SQLite lock을 잡은 것처럼 add가 풀릴 때까지 기다린다."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.adding = threading.Event()
+        self.released = threading.Event()
+
+    def add(self, *args, **kwargs):
+        self.adding.set()
+        assert self.released.wait(timeout=2)
+        super().add(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_waits_for_sqlite_lock_off_event_loop():
+    """store가 lock을 기다리는 동안에도 이벤트 루프는 다른 작업을 처리한다."""
+    store = LockedStore(":memory:")
+    scheduler = build_scheduler(store, FakeOpenAIClient())
+
+    enqueueing = asyncio.create_task(
+        scheduler.enqueue(REVIEW_ID, REVIEW_CONTENT, [make_album_candidate()])
+    )
+    assert await asyncio.to_thread(store.adding.wait, 2)
+    store.released.set()
+    await enqueueing
+
+    assert store.pending_count() == 1
@@ -1,5 +1,7 @@
+import base64
 from types import SimpleNamespace
 
+import numpy as np
 import pytest
 
 from app.core.config import settings
@@ -44,7 +46,7 @@ async def test_embed_review_success_returns_1536_vector():
 
     result = await service.embed_review(REVIEW_CONTENT)
 
-    assert result == vector
+    assert result.tolist() == pytest.approx(vector)
     assert len(result) == settings.EMBEDDING_DIMENSIONS
 
 
@@ -70,3 +72,65 @@ async def test_embed_review_uses_configured_model():
 
     assert embeddings.calls[0]["model"] == settings.OPENAI_EMBEDDING_MODEL
     assert embeddings.calls[0]["input"] == REVIEW_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_embed_review_same_content_uses_shared_cache():
+    """같은 감상문은 공유 캐시에서 꺼내 OpenAI를 다시 호출하지 않는다."""
+    from app.core.cache import LruCache
+
+    embeddings = FakeEmbeddings(
+        response=SimpleNamespace(data=[SimpleNamespace(embedding=[0.1] * settings.EMBEDDING_DIMENSIONS)])
+    )
+    cache = LruCache(max_size=10)
+    first = EmbeddingService(openai_client=FakeOpenAiClient(embeddings), cache=cache)
+    second = EmbeddingService(openai_client=FakeOpenAiClient(embeddings), cache=cache)
+
+    await first.embed_review(REVIEW_CONTENT)
+    result = await second.embed_review(REVIEW_CONTENT)
+
+    assert len(embeddings.calls) == 1
+    assert len(result) == settings.EMBEDDING_DIMENSIONS
+
+
+@pytest.mark.asyncio
+async def test_embed_reviews_batches_inputs_and_keeps_input_order():
+    """여러 감상문은 batch_size 단위로 묶어 요청하고 입력 순서대로 반환한다."""
+
+    class BatchEmbeddings(FakeEmbeddings):
+        async def create(self, **kwargs):
+            self.calls.append(kwargs)
+            inputs = kwargs["input"]
+            # 응답 순서를 뒤집어도 index 기준으로 제자리를 찾아야 한다.
+            return SimpleNamespace(
+                data=[
+                    SimpleNamespace(index=index, embedding=[float(len(text))])
+                    for index, text in reversed(list(enumerate(inputs)))
+                ]
+            )
+
+    embeddings = BatchEmbeddings()
+    service = EmbeddingService(openai_client=FakeOpenAiClient(embeddings))
+
+    result = await service.embed_reviews(["a", "bb", "ccc"], batch_size=2)
+
+    assert [call["input"] for call in embeddings.calls] == [["a", "bb"], ["ccc"]]
+    assert result == [[1.0], [2.0], [3.0]]
+
+
+@pytest.mark.asyncio
+async def test_embed_review_requests_base64_and_decodes_float32():
+    """임베딩은 base64로 받아 float list를 거치지 않고 float32 ndarray로 읽는다."""
+    vector = np.arange(4, dtype="<f4") / 4
+    embeddings = FakeEmbeddings(
+        response=SimpleNamespace(
+            data=[SimpleNamespace(embedding=base64.b64encode(vector.tobytes()).decode())]
+        )
+    )
+    service = EmbeddingService(openai_client=FakeOpenAiClient(embeddings))
+
+    result = await service.embed_review(REVIEW_CONTENT)
+
+    assert embeddings.calls[0]["encoding_format"] == "base64"
+    assert result.dtype == np.float32
+    assert result.tolist() == [0.0, 0.25, 0.5, 0.75]
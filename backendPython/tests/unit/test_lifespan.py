@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 
 from app import main as main_module
+from app.core.config import settings
 
 
 class FakeDatabaseClient:
@@ -11,6 +12,50 @@ class FakeDatabaseClient:
         self.closed = True
 
 
+class FakeCallbackOutbox:
+    def __init__(self):
+        self.closed = False
+
+    def claim(self, now, lease_seconds, limit=100, due_before=None):
+        return []
+
+    def next_due_at(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeEconomyBatchStore:
+    def __init__(self):
+        self.closed = False
+
+    def submitted_batch_ids(self):
+        return []
+
+    def unsubmitted(self):
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class FakeUserTasteStore:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCandidatePageStore:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
 class FakeAsyncClient:
     def __init__(self):
         self.closed = False
@@ -25,6 +70,10 @@ def test_lifespan_registers_and_closes_app_scoped_resources(monkeypatch):
     embedding_client = FakeAsyncClient()
     chat_client = FakeAsyncClient()
     spring_http_client = FakeAsyncClient()
+    callback_outbox = FakeCallbackOutbox()
+    economy_batch_store = FakeEconomyBatchStore()
+    user_taste_store = FakeUserTasteStore()
+    candidate_page_store = FakeCandidatePageStore()
 
     monkeypatch.setattr(
         main_module,
@@ -51,13 +100,62 @@ def test_lifespan_registers_and_closes_app_scoped_resources(monkeypatch):
         raising=False,
     )
 
+    monkeypatch.setattr(
+        main_module,
+        "create_callback_outbox",
+        lambda: callback_outbox,
+        raising=False,
+    )
+    monkeypatch.setattr(
+        main_module,
+        "create_economy_batch_store",
+        lambda: economy_batch_store,
+        raising=False,
+    )
+    monkeypatch.setattr(
+        main_module,
+        "create_user_taste_store",
+        lambda: user_taste_store,
+        raising=False,
+    )
+    monkeypatch.setattr(
+        main_module,
+        "create_candidate_page_cache",
+        lambda: candidate_page_store,
+        raising=False,
+    )
+
     with TestClient(main_module.app) as client:
         assert client.app.state.database is database
         assert client.app.state.openai_embedding_client is embedding_client
         assert client.app.state.openai_chat_client is chat_client
         assert client.app.state.spring_http_client is spring_http_client
+        assert client.app.state.callback_outbox is callback_outbox
+        assert client.app.state.callback_dispatcher.outbox is callback_outbox
+        assert client.app.state.economy_reason_scheduler.store is economy_batch_store
+        assert client.app.state.user_taste_store is user_taste_store
+        assert client.app.state.candidate_page_cache is candidate_page_store
+        services = client.app.state.services
+        assert services.recommendation_service.spring_callback_client.http_client is (
+            spring_http_client
+        )
+        assert services.bulk_recommendation_service.embedding_service is (
+            services.recommendation_service.embedding_service
+        )
 
     assert database.closed
     assert embedding_client.closed
     assert chat_client.closed
     assert spring_http_client.closed
+    assert callback_outbox.closed
+    assert economy_batch_store.closed
+    assert user_taste_store.closed
+    assert candidate_page_store.closed
+
+
+def test_create_spring_http_client_uses_configured_pool_and_timeouts():
+    """Spring 콜백 HTTP client는 설정된 timeout과 연결 풀을 사용한다."""
+    http_client = main_module.create_spring_http_client()
+
+    assert http_client.timeout.connect == settings.SPRING_CONNECT_TIMEOUT_SECONDS
+    assert http_client.timeout.read == settings.SPRING_TIMEOUT_SECONDS
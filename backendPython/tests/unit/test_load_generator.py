@@ -0,0 +1,67 @@
+from benchmarks.load_generator import (
+    RequestRecord,
+    WindowStats,
+    estimate_saturation,
+    schedule,
+    summarize,
+)
+
+
+def make_window(second, offered, callback_p50_ms):
+    return WindowStats(
+        second=second,
+        offered=offered,
+        accepted=offered,
+        callbacks=offered,
+        backlog=0,
+        send_lag_ms=0.0,
+        callback_p50_ms=callback_p50_ms,
+    )
+
+
+def test_schedule_fixed_and_ramping_rates_are_open_loop_arrivals():
+    """도착 시각은 응답과 무관하게 도착률만으로 미리 정해진다."""
+    fixed = schedule(lambda elapsed: 10.0, duration=2.0, poisson=False, seed=1)
+    ramp = schedule(lambda elapsed: 2.0 + 18.0 * elapsed / 2.0, duration=2.0, poisson=False, seed=1)
+
+    assert len(fixed) == 19
+    assert fixed[1] - fixed[0] == 0.1
+    assert ramp[1] - ramp[0] > ramp[-1] - ramp[-2]
+
+
+def test_estimate_saturation_uses_sustained_callback_latency_growth():
+    """콜백 지연이 무부하 대비 2배를 3구간 연속 넘기 시작한 도착률을 포화 지점으로 본다."""
+    windows = [
+        make_window(0, 10, 100.0),
+        make_window(1, 20, 110.0),
+        make_window(2, 30, 250.0),
+        make_window(3, 40, 150.0),
+        make_window(4, 50, 400.0),
+        make_window(5, 60, 900.0),
+        make_window(6, 70, 2000.0),
+    ]
+
+    assert estimate_saturation(windows) == 50.0
+    assert estimate_saturation(windows[:4]) is None
+
+
+def test_summarize_reports_latencies_errors_and_backlog():
+    """accept/콜백 지연, 요청 오류, 콜백 상태와 초 단위 backlog를 집계한다."""
+    records = [
+        RequestRecord(review_id=1, scheduled_at=0.0, sent_at=100.0, accepted_at=100.01, status_code=202),
+        RequestRecord(review_id=2, scheduled_at=0.5, sent_at=100.5, accepted_at=100.52, status_code=202),
+        RequestRecord(review_id=3, scheduled_at=0.9, sent_at=100.9, accepted_at=101.0, error="TIMEOUT"),
+    ]
+    arrivals = {
+        1: (100.2, "COMPLETED", None),
+        2: (101.5, "FAILED", "NO_CANDIDATES"),
+    }
+
+    report = summarize(records, arrivals, started_at=100.0, seconds=2)
+
+    assert report.offered_requests == 3
+    assert report.request_errors == {"TIMEOUT": 1}
+    assert report.callback_statuses == {"COMPLETED": 1, "FAILED:NO_CANDIDATES": 1}
+    assert report.missing_callbacks == 0
+    assert [window.backlog for window in report.windows] == [1, 0]
+    assert report.callback_ms["p50"] == 600.0
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.metrics import (
+    MetricsRegistry,
+    OPENAI_TOKENS_TOTAL,
+    record_token_usage,
+    start_metrics_server,
+)
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    """histogram은 Prometheus 형식의 누적 bucket, sum, count를 출력한다."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency.", ("stage",), (0.1, 1.0))
+    histogram.labels("embed").observe(0.05)
+    histogram.labels("embed").observe(0.1)
+    histogram.labels("embed").observe(3.0)
+
+    text = registry.render()
+
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="embed",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="embed",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="embed",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="embed"} 3.15' in text
+    assert 'stage_seconds_count{stage="embed"} 3' in text
+
+
+def test_counter_and_gauge_render_labels_and_scrape_time_functions():
+    """counter는 누적값을, gauge는 scrape 시점 함수 값을 출력하고 실패한 함수는 건너뛴다."""
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors.", ("error_code",))
+    gauge = registry.gauge("queue_depth", "Queue depth.", ("queue",))
+    counter.labels("SEARCH_FAILED").inc()
+    counter.labels("SEARCH_FAILED").inc()
+    gauge.labels("outbox").set_function(lambda: 4)
+    gauge.labels("closed").set_function(lambda: 1 / 0)
+
+    text = registry.render()
+
+    assert 'errors_total{error_code="SEARCH_FAILED"} 2' in text
+    assert 'queue_depth{queue="outbox"} 4' in text
+    assert 'queue="closed"' not in text
+
+
+def test_metric_labels_require_declared_label_count():
+    """선언한 label 개수와 다르게 호출하면 즉시 실패한다."""
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors.", ("error_code",))
+
+    with pytest.raises(ValueError):
+        counter.labels()
+    with pytest.raises(ValueError):
+        registry.counter("errors_total", "Errors.")
+
+
+def test_record_token_usage_accepts_sdk_objects_and_batch_dicts():
+    """SDK 응답 usage 객체와 Batch 결과 dict 모두 model별 token counter에 더한다."""
+    prompt = OPENAI_TOKENS_TOTAL.labels("test-model", "prompt")
+    completion = OPENAI_TOKENS_TOTAL.labels("test-model", "completion")
+    before = (prompt.value, completion.value)
+
+    record_token_usage("test-model", SimpleNamespace(prompt_tokens=10, completion_tokens=3))
+    record_token_usage("test-model", {"prompt_tokens": 5, "completion_tokens": 2})
+    record_token_usage("test-model", None)
+
+    assert (prompt.value - before[0], completion.value - before[1]) == (15, 5)
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_registry_for_worker_processes():
+    """worker용 listener는 GET /metrics에 registry를 돌려주고 다른 경로는 404다."""
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs.").inc(3)
+    server = await start_metrics_server("127.0.0.1", 0, registry)
+    port = server.sockets[0].getsockname()[1]
+
+    async def get(path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: worker\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    try:
+        metrics = await get("/metrics")
+        missing = await get("/")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert metrics.startswith("HTTP/1.1 200 OK")
+    assert "jobs_total 3" in metrics
+    assert missing.startswith("HTTP/1.1 404")
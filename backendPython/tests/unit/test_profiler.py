@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.profiler import SamplingProfiler
+
+
+def busy_until(event):
+    while not event.is_set():
+        sum(range(1000))
+
+
+def test_sample_threads_records_worker_thread_stack_in_collapsed_format():
+    """cpu 표본은 worker thread의 실행 중인 함수까지 바깥 frame부터 ';'로 이어 기록한다."""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_until, args=(stop,), name="worker")
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval_seconds=0.001)
+        profiler.profile_threads(0.02)
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = profiler.collapsed().splitlines()
+    worker_lines = [line for line in lines if line.startswith("worker;")]
+    assert worker_lines
+    stack, count = worker_lines[0].rsplit(" ", 1)
+    assert "test_profiler:busy_until" in stack
+    assert int(count) >= 1
+    assert not any("profile_threads" in line for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_sample_tasks_records_where_tasks_are_awaiting():
+    """async 표본은 suspend된 task가 await 중인 coroutine 경로를 기록한다."""
+
+    async def waiting_for_callback():
+        await asyncio.sleep(1)
+
+    task = asyncio.create_task(waiting_for_callback(), name="callback-wait")
+    await asyncio.sleep(0)
+    profiler = SamplingProfiler()
+
+    profiler.sample_tasks(asyncio.get_running_loop())
+    task.cancel()
+
+    assert any(
+        stack.startswith("task:callback-wait;") and stack.endswith("waiting_for_callback")
+        for stack in profiler.samples
+    )
@@ -0,0 +1,93 @@
+from app.services import prompt_budget
+from app.services.prompt_budget import (
+    budget_prompt_parts,
+    count_tokens,
+    preload_encoding,
+    select_excerpt,
+    split_sentences,
+    truncate_to_tokens,
+)
+
+
+REVIEW = "빌 에반스 같은 차분한 피아노 트리오가 좋았습니다."
+CRITIC_REVIEW = (
+    "This session was recorded in 1961 at the Village Vanguard. "
+    "The label later reissued it with alternate takes. "
+    "Bill Evans leads a trio with a calm, interactive piano sound. "
+    "Scott LaFaro's bass answers every phrase."
+)
+
+
+def test_split_sentences_keeps_terminators():
+    """문장 부호 기준으로 자르고 부호는 문장에 남긴다."""
+    assert split_sentences("첫 문장. 둘째 문장!\n셋째") == ["첫 문장.", "둘째 문장!", "셋째"]
+
+
+def test_truncate_to_tokens_respects_budget():
+    """잘라낸 결과는 budget token을 넘지 않는다."""
+    truncated = truncate_to_tokens(CRITIC_REVIEW, 10)
+
+    assert CRITIC_REVIEW.startswith(truncated)
+    assert 0 < count_tokens(truncated) <= 10
+    assert truncate_to_tokens(REVIEW, 0) == ""
+
+
+def test_select_excerpt_prefers_sentences_related_to_user_review():
+    """감상문과 겹치는 문장을 고르고 원문 순서를 유지한다."""
+    budget = count_tokens(split_sentences(CRITIC_REVIEW)[2]) + 1
+
+    excerpt = select_excerpt(CRITIC_REVIEW, "Bill Evans piano trio", budget)
+
+    assert excerpt == "Bill Evans leads a trio with a calm, interactive piano sound."
+
+
+def test_budget_prompt_parts_gives_unused_share_to_excerpt():
+    """짧은 감상문/요약이 남긴 token은 발췌에 쓰이고 전체 합은 예산 안이다."""
+    parts = budget_prompt_parts(
+        REVIEW,
+        "서정적인 트리오",
+        CRITIC_REVIEW * 20,
+        total_budget=120,
+        review_budget=60,
+        summary_budget=30,
+    )
+
+    assert parts.review_content == REVIEW
+    assert parts.review_summary == "서정적인 트리오"
+    total = sum(
+        count_tokens(text)
+        for text in (parts.review_content, parts.review_summary, parts.review_excerpt)
+    )
+    assert 100 < total <= 120
+
+
+def test_budget_prompt_parts_without_budget_keeps_full_text():
+    """total_budget이 0이면 자르지 않는다."""
+    parts = budget_prompt_parts(REVIEW, "요약", CRITIC_REVIEW, 0, 0, 0)
+
+    assert parts.review_excerpt == CRITIC_REVIEW
+
+
+class OfflineTiktoken:
+    def __init__(self):
+        self.calls = 0
+
+    def encoding_for_model(self, model):
+        raise KeyError(model)
+
+    def get_encoding(self, name):
+        self.calls += 1
+        raise OSError("BPE download failed")
+
+
+def test_preload_encoding_reports_download_failure_and_retries_later(monkeypatch):
+    """BPE 파일을 못 받아도 기동은 계속되고, 실패는 캐시하지 않아 다음에 다시 받는다."""
+    offline = OfflineTiktoken()
+    monkeypatch.setattr(prompt_budget, "tiktoken", offline)
+    prompt_budget._encoding.cache_clear()
+
+    assert preload_encoding("unknown-model") is False
+    assert preload_encoding("unknown-model") is False
+    assert offline.calls == 2
+
+    prompt_budget._encoding.cache_clear()
@@ -0,0 +1,92 @@
+import pytest
+
+from app.core.exceptions import ConfigurationError, RepositoryError
+from app.repositories.recommendation_history_repository import (
+    RecommendationHistoryRepository,
+)
+
+
+class FakeQuery:
+    def __init__(self, table, data, error=None):
+        self.table = table
+        self.data = data
+        self.error = error
+        self.filters = []
+
+    def select(self, columns):
+        self.filters.append(("select", columns))
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(("neq", column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(("in", column, list(values)))
+        return self
+
+    def order(self, column, desc=False):
+        self.filters.append(("order", column, desc))
+        return self
+
+    def limit(self, count):
+        self.filters.append(("limit", count))
+        return self
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return type("Response", (), {"data": self.data})()
+
+
+class FakeDatabaseClient:
+    def __init__(self, tables, error=None):
+        self.tables = tables
+        self.error = error
+        self.queries = {}
+
+    def from_(self, table_name):
+        query = FakeQuery(table_name, self.tables.get(table_name, []), self.error)
+        self.queries[table_name] = query
+        return query
+
+
+def test_repository_without_database_raises_configuration_error():
+    """database client 없이 생성하면 ConfigurationError가 발생한다."""
+    with pytest.raises(ConfigurationError):
+        RecommendationHistoryRepository(database=None)
+
+
+@pytest.mark.asyncio
+async def test_recommended_album_ids_reads_recent_reviews_except_current():
+    """사용자의 최근 감상문(현재 감상문 제외)에 추천된 앨범 id를 모은다."""
+    database = FakeDatabaseClient(
+        {
+            "user_reviews": [{"id": 3}, {"id": 2}],
+            "recommend_album": [{"album_id": "a"}, {"album_id": "b"}, {"album_id": "a"}],
+        }
+    )
+    repository = RecommendationHistoryRepository(database=database, recent_reviews=10)
+
+    album_ids = await repository.recommended_album_ids("user-1", exclude_review_id=4)
+
+    assert album_ids == frozenset({"a", "b"})
+    assert ("eq", "user_id", "user-1") in database.queries["user_reviews"].filters
+    assert ("neq", "id", 4) in database.queries["user_reviews"].filters
+    assert ("limit", 10) in database.queries["user_reviews"].filters
+    assert ("in", "user_review_id", [3, 2]) in database.queries["recommend_album"].filters
+
+
+@pytest.mark.asyncio
+async def test_recommended_album_ids_db_failure_raises_repository_error():
+    """DB 조회 실패는 RepositoryError로 감싼다."""
+    repository = RecommendationHistoryRepository(
+        database=FakeDatabaseClient({}, error=RuntimeError("db down"))
+    )
+
+    with pytest.raises(RepositoryError):
+        await repository.recommended_album_ids("user-1")
@@ -0,0 +1,94 @@
+import pytest
+
+from app.services.recommendation_queue import (
+    RecommendationJobQueue,
+    RecommendationWorker,
+)
+
+from tests.fixtures import REVIEW_CONTENT, REVIEW_ID
+
+
+class FakeRecommendationService:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def recommend_by_review(self, review_id, review_content, user_id=None):
+        self.calls.append(("realtime", review_id, user_id))
+        if self.error:
+            raise self.error
+
+    async def recommend_by_review_economy(self, review_id, review_content, user_id=None):
+        self.calls.append(("economy", review_id, user_id))
+
+
+def test_claim_hands_each_job_to_one_worker_across_connections(tmp_path):
+    """같은 파일을 연 두 프로세스(연결)가 가져가도 작업은 한 번씩만 나간다."""
+    path = str(tmp_path / "jobs.sqlite3")
+    front = RecommendationJobQueue(path)
+    worker_a = RecommendationJobQueue(path)
+    worker_b = RecommendationJobQueue(path)
+    for review_id in (1, 2, 3):
+        front.add(review_id, REVIEW_CONTENT)
+
+    first = worker_a.claim("a", limit=2)
+    second = worker_b.claim("b", limit=2)
+
+    assert [job.review_id for job in first] == [1, 2]
+    assert [job.review_id for job in second] == [3]
+    assert worker_b.claim("b") == []
+    assert front.pending_count() == 3
+
+    worker_a.complete(first[0].id)
+    assert front.pending_count() == 2
+    for queue in (front, worker_a, worker_b):
+        queue.close()
+
+
+def test_expired_lease_is_reclaimed_until_max_attempts():
+    """lease 안에 완료되지 않은 작업은 다시 나가고, max_attempts를 넘기면 DEAD로 남는다."""
+    queue = RecommendationJobQueue(":memory:", lease_seconds=10, max_attempts=2)
+    queue.add(REVIEW_ID, REVIEW_CONTENT, mode="economy", user_id="user-1")
+
+    first = queue.claim("a", now=100.0)
+    assert queue.claim("b", now=105.0) == []
+    second = queue.claim("b", now=111.0)
+
+    assert second[0].attempts == 2
+    assert (second[0].mode, second[0].user_id) == ("economy", "user-1")
+    assert first[0].id == second[0].id
+    assert queue.claim("c", now=200.0) == []
+    assert queue.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_job_by_mode_and_completes_even_when_handler_fails():
+    """worker는 mode에 맞는 처리 함수를 부르고, 실패해도 작업을 다시 돌리지 않는다."""
+    queue = RecommendationJobQueue(":memory:")
+    queue.add(1, REVIEW_CONTENT, mode="economy", user_id="user-1")
+    queue.add(2, REVIEW_CONTENT)
+    service = FakeRecommendationService(error=RuntimeError("callback failed"))
+    worker = RecommendationWorker(queue, service, worker_id="w", concurrency=4)
+
+    assert await worker.run_once() == 2
+    await worker.stop()
+
+    assert sorted(service.calls) == [("economy", 1, "user-1"), ("realtime", 2, None)]
+    assert queue.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_claims_no_more_than_concurrency():
+    """동시에 처리하는 작업 수는 concurrency를 넘지 않는다."""
+    queue = RecommendationJobQueue(":memory:")
+    for review_id in (1, 2, 3):
+        queue.add(review_id, REVIEW_CONTENT)
+    worker = RecommendationWorker(
+        queue, FakeRecommendationService(), worker_id="w", concurrency=2
+    )
+
+    assert await worker.run_once() == 2
+    assert await worker.run_once() == 0
+    await worker.stop()
+    assert await worker.run_once() == 1
+    await worker.stop()
@@ -141,3 +141,85 @@ def test_fallback_reason_common_keywords_mentions_shared_feature():
     reason = service.build_fallback_reason(REVIEW_CONTENT, candidate)
 
     assert "차분" in reason or "modal" in reason or "모달" in reason
+
+
+@pytest.mark.asyncio
+async def test_generate_reasons_cached_reason_skips_open_ai_call():
+    """같은 감상문과 후보의 추천 사유는 공유 캐시에서 재사용한다."""
+    from app.core.cache import LruCache
+
+    completions = FakeChatCompletions("차분한 분위기가 잘 맞습니다.")
+    service = RecommendationReasonService(
+        openai_client=FakeOpenAiClient(completions), cache=LruCache(max_size=10)
+    )
+
+    await service.generate_reasons(REVIEW_CONTENT, [make_candidate()])
+    result = await service.generate_reasons(REVIEW_CONTENT, [make_candidate()])
+
+    assert len(completions.calls) == 1
+    assert result[0].recommendation_reason == "차분한 분위기가 잘 맞습니다."
+
+
+@pytest.mark.asyncio
+async def test_generate_reasons_fallback_reason_is_not_cached():
+    """fallback 사유는 캐시하지 않고 다음 요청에서 LLM을 다시 호출한다."""
+    from app.core.cache import LruCache
+
+    completions = FakeChatCompletions(error=RuntimeError("llm down"))
+    service = RecommendationReasonService(
+        openai_client=FakeOpenAiClient(completions), cache=LruCache(max_size=10)
+    )
+
+    await service.generate_reasons(REVIEW_CONTENT, [make_candidate()])
+    await service.generate_reasons(REVIEW_CONTENT, [make_candidate()])
+
+    assert len(completions.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_iter_reasons_yields_reason_per_candidate_as_completed():
+    """iter_reasons는 후보별 추천 사유를 완료되는 대로 하나씩 내보낸다."""
+    service = RecommendationReasonService(
+        openai_client=FakeOpenAiClient(FakeChatCompletions("추천 사유입니다."))
+    )
+    candidates = [make_candidate(ALBUM_ID_1), make_candidate(ALBUM_ID_2)]
+
+    reasons = [
+        reason async for reason in service.iter_reasons(REVIEW_CONTENT, candidates)
+    ]
+
+    assert sorted(reason.album_id for reason in reasons) == [ALBUM_ID_1, ALBUM_ID_2]
+
+
+@pytest.mark.asyncio
+async def test_generate_reasons_concurrency_limiter_caps_parallel_calls():
+    """concurrency limiter가 있으면 동시 LLM 호출 수를 그 값으로 제한한다."""
+    completions = FakeChatCompletions("추천 사유입니다.", delay=0.01)
+    service = RecommendationReasonService(
+        openai_client=FakeOpenAiClient(completions),
+        concurrency_limiter=asyncio.Semaphore(1),
+    )
+    candidates = [make_candidate(ALBUM_ID_1), make_candidate(ALBUM_ID_2)]
+
+    await service.generate_reasons(REVIEW_CONTENT, candidates)
+
+    assert completions.max_active_count == 1
+
+
+def test_build_messages_puts_relevant_excerpt_within_token_budget():
+    """긴 평론 원문은 감상문과 관련된 문장만 token 예산 안에서 들어간다."""
+    service = RecommendationReasonService(
+        openai_client=FakeOpenAiClient(FakeChatCompletions()),
+        prompt_token_budget=80,
+        review_token_budget=40,
+        summary_token_budget=20,
+    )
+    filler = "The liner notes list the recording dates and the studio crew. " * 30
+    candidate = make_candidate(
+        review_content=filler + "차분하고 공간감 있는 연주가 모달 재즈의 정수다."
+    )
+
+    prompt = service.build_messages(REVIEW_CONTENT, candidate)[1]["content"]
+
+    assert "차분하고 공간감 있는 연주가 모달 재즈의 정수다." in prompt
+    assert len(prompt) < len(filler)
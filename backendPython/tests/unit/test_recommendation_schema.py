@@ -22,6 +22,8 @@ def test_request_valid_maps_fields():
     assert dump_alias(request) == {
         "review_id": REVIEW_ID,
         "review_content": REVIEW_CONTENT,
+        "mode": "realtime",
+        "user_id": None,
     }
 
 
@@ -1,8 +1,14 @@
+import numpy as np
 import pytest
 
+from app.core.cache import LruCache
 from app.core.error_codes import RecommendationErrorCode
 from app.core.exceptions import EmbeddingError, RepositoryError
-from app.schemas.recommendation import RecommendationReason
+from app.core.metrics import ERRORS_TOTAL, STAGE_SECONDS
+from app.repositories.album_embedding_repository import AlbumEmbeddingRepository
+from app.repositories.album_vector_index import AlbumVectorIndexLoader
+from app.repositories.user_taste_store import UserTasteStore
+from app.schemas.recommendation import AlbumCandidate, RecommendationReason
 from app.services.recommendation_service import RecommendationService
 
 from tests.fixtures import (
@@ -32,9 +38,14 @@ class FakeAlbumEmbeddingRepository:
         self.candidates = candidates if candidates is not None else [make_candidate()]
         self.error = error
         self.calls = []
+        self.index_version = 1
 
-    async def find_similar_albums(self, embedding, top_k):
-        self.calls.append({"embedding": embedding, "top_k": top_k})
+    async def find_similar_albums(
+        self, embedding, top_k, query_text=None, exclude_album_ids=()
+    ):
+        self.calls.append(
+            {"embedding": embedding, "top_k": top_k, "exclude_album_ids": exclude_album_ids}
+        )
         if self.error:
             raise self.error
         return self.candidates
@@ -43,6 +54,7 @@ class FakeAlbumEmbeddingRepository:
 class FakeRecommendationReasonService:
     def __init__(self):
         self.calls = []
+        self.prompt_version = "v1"
 
     async def generate_reasons(self, review_content, candidates):
         self.calls.append({"review_content": review_content, "candidates": candidates})
@@ -54,6 +66,10 @@ class FakeRecommendationReasonService:
             for candidate in candidates
         ]
 
+    async def iter_reasons(self, review_content, candidates):
+        for reason in await self.generate_reasons(review_content, candidates):
+            yield reason
+
 
 class FakeSpringCallbackClient:
     def __init__(self, error=None):
@@ -76,12 +92,23 @@ class FakeSpringCallbackClient:
             raise self.error
 
 
+class FakeEconomyReasonScheduler:
+    def __init__(self):
+        self.calls = []
+
+    async def enqueue(self, review_id, review_content, candidates):
+        self.calls.append(
+            {"review_id": review_id, "review_content": review_content, "candidates": candidates}
+        )
+
+
 def build_service(
     embedding_service=None,
     repository=None,
     reason_service=None,
     callback_client=None,
     top_k=3,
+    economy_reason_scheduler=None,
 ):
     return RecommendationService(
         embedding_service=embedding_service or FakeEmbeddingService(),
@@ -89,6 +116,7 @@ def build_service(
         recommendation_reason_service=reason_service or FakeRecommendationReasonService(),
         spring_callback_client=callback_client or FakeSpringCallbackClient(),
         top_k=top_k,
+        economy_reason_scheduler=economy_reason_scheduler,
     )
 
 
@@ -193,3 +221,419 @@ async def test_recommend_by_review_callback_failure_logs_and_raises(caplog):
         await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
 
     assert "spring down" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_stream_by_review_yields_candidates_reasons_then_completed():
+    """스트림은 후보 점수, 후보별 사유, 최종 결과 순서로 이벤트를 내보내고 콜백하지 않는다."""
+    callback_client = FakeSpringCallbackClient()
+    candidates = [
+        make_candidate(ALBUM_ID_1, 0.95),
+        make_candidate(ALBUM_ID_2, 0.91),
+    ]
+    service = build_service(
+        repository=FakeAlbumEmbeddingRepository(candidates=candidates),
+        callback_client=callback_client,
+    )
+
+    events = [event async for event in service.stream_by_review(REVIEW_CONTENT)]
+
+    names = [name for name, _ in events]
+    assert names == ["candidates", "reason", "reason", "completed"]
+    assert events[0][1]["recommendations"][0]["recommendationScore"] == "0.9500"
+    assert "recommendationReason" not in events[0][1]["recommendations"][0]
+    assert events[-1][1]["status"] == "COMPLETED"
+    assert len(events[-1][1]["recommendations"]) == 2
+    assert callback_client.completed_calls == []
+
+
+@pytest.mark.asyncio
+async def test_stream_by_review_no_candidates_yields_failed_event():
+    """후보가 없으면 failed 이벤트 하나로 스트림을 끝낸다."""
+    service = build_service(repository=FakeAlbumEmbeddingRepository(candidates=[]))
+
+    events = [event async for event in service.stream_by_review(REVIEW_CONTENT)]
+
+    assert events == [
+        (
+            "failed",
+            {
+                "status": "FAILED",
+                "errorCode": "NO_CANDIDATES",
+                "message": "추천 후보가 없습니다.",
+            },
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_economy_enqueues_candidates_without_llm_call():
+    """economy 모드는 검색 결과만 Batch 대기열에 넣고 즉시 LLM/콜백을 호출하지 않는다."""
+    callback_client = FakeSpringCallbackClient()
+    reason_service = FakeRecommendationReasonService()
+    scheduler = FakeEconomyReasonScheduler()
+    service = build_service(
+        reason_service=reason_service,
+        callback_client=callback_client,
+        economy_reason_scheduler=scheduler,
+    )
+
+    await service.recommend_by_review_economy(REVIEW_ID, REVIEW_CONTENT)
+
+    assert scheduler.calls[0]["review_id"] == REVIEW_ID
+    assert len(scheduler.calls[0]["candidates"]) == 1
+    assert reason_service.calls == []
+    assert callback_client.completed_calls == []
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_economy_without_scheduler_falls_back_to_realtime():
+    """economy scheduler가 구성되지 않았으면 realtime 경로로 처리한다."""
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(callback_client=callback_client)
+
+    await service.recommend_by_review_economy(REVIEW_ID, REVIEW_CONTENT)
+
+    assert callback_client.completed_calls[0]["review_id"] == REVIEW_ID
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_records_stage_latency_and_error_metrics():
+    """성공 경로는 단계별 latency를, 실패 경로는 errorCode별 counter를 기록한다."""
+    stages = ["embed", "search", "reason", "callback"]
+    counts_before = [STAGE_SECONDS.labels(stage).count for stage in stages]
+    errors = ERRORS_TOTAL.labels(RecommendationErrorCode.NO_CANDIDATES.value)
+    errors_before = errors.value
+
+    await build_service().recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    await build_service(
+        repository=FakeAlbumEmbeddingRepository(candidates=[])
+    ).recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+
+    counts_after = [STAGE_SECONDS.labels(stage).count for stage in stages]
+    assert [after - before for before, after in zip(counts_before, counts_after)] == [
+        2,
+        2,
+        1,
+        1,
+    ]
+    assert errors.value - errors_before == 1
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_overfetches_and_diversifies_artists():
+    """TOP K보다 넉넉히 검색한 뒤 같은 아티스트가 겹치지 않게 골라 추천 사유를 요청한다."""
+    repository = FakeAlbumEmbeddingRepository(
+        candidates=[
+            make_candidate("1", 0.95, artist_name="Bill Evans"),
+            make_candidate("2", 0.94, artist_name="Bill Evans"),
+            make_candidate("3", 0.90, artist_name="Keith Jarrett"),
+            make_candidate("4", 0.85, artist_name="Brad Mehldau"),
+        ]
+    )
+    reason_service = FakeRecommendationReasonService()
+    service = build_service(repository=repository, reason_service=reason_service, top_k=3)
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+
+    assert repository.calls[0]["top_k"] == 3 * service.candidate_fetch_multiplier
+    assert [
+        candidate.album_id for candidate in reason_service.calls[0]["candidates"]
+    ] == ["1", "3", "4"]
+
+
+class FakeRecommendationHistoryRepository:
+    def __init__(self, album_ids=frozenset(), error=None):
+        self.album_ids = album_ids
+        self.error = error
+        self.calls = []
+
+    async def recommended_album_ids(self, user_id, exclude_review_id=None):
+        self.calls.append((user_id, exclude_review_id))
+        if self.error:
+            raise self.error
+        return self.album_ids
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_excludes_previously_recommended_albums():
+    """user_id가 있으면 이전 추천 앨범을 검색 제외 목록으로 넘긴다."""
+    repository = FakeAlbumEmbeddingRepository()
+    history = FakeRecommendationHistoryRepository(album_ids=frozenset({"old"}))
+    service = build_service(repository=repository)
+    service.recommendation_history_repository = history
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT, user_id="user-1")
+
+    assert history.calls == [("user-1", REVIEW_ID)]
+    assert repository.calls[0]["exclude_album_ids"] == frozenset({"old"})
+
+
+@pytest.mark.asyncio
+async def test_history_lookup_failure_does_not_fail_recommendation():
+    """추천 이력 조회가 실패해도 제외 없이 추천을 완료한다."""
+    repository = FakeAlbumEmbeddingRepository()
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(repository=repository, callback_client=callback_client)
+    service.recommendation_history_repository = FakeRecommendationHistoryRepository(
+        error=RepositoryError("db down")
+    )
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT, user_id="user-1")
+
+    assert repository.calls[0]["exclude_album_ids"] == frozenset()
+    assert len(callback_client.completed_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_blends_user_taste_into_query():
+    """이전 감상문들의 taste vector를 검색 질의에 섞고 이번 감상문을 taste에 반영한다."""
+    store = UserTasteStore(":memory:")
+    store.update("user-1", [0.0, 1.0], review_id=1)
+    repository = FakeAlbumEmbeddingRepository()
+    service = build_service(
+        embedding_service=FakeEmbeddingService(vector=[1.0, 0.0]), repository=repository
+    )
+    service.user_taste_store = store
+    service.taste_blend_weight = 0.5
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT, user_id="user-1")
+
+    query = repository.calls[0]["embedding"]
+    assert isinstance(query, np.ndarray)
+    assert query.tolist() == pytest.approx([2**-0.5, 2**-0.5])
+    assert store.get("user-1").review_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_search_does_not_update_user_taste():
+    """검색이 실패한 요청은 taste를 바꾸지 않아 재시도가 같은 질의로 검색하고 한 번만 반영된다."""
+    store = UserTasteStore(":memory:")
+    store.update("user-1", [0.0, 1.0], review_id=1)
+    repository = FakeAlbumEmbeddingRepository(error=RepositoryError("rpc down"))
+    service = build_service(
+        embedding_service=FakeEmbeddingService(vector=[1.0, 0.0]), repository=repository
+    )
+    service.user_taste_store = store
+    service.taste_blend_weight = 0.5
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT, user_id="user-1")
+    assert store.get("user-1").review_count == 1
+
+    repository.error = None
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT, user_id="user-1")
+
+    assert repository.calls[1]["embedding"].tolist() == repository.calls[0]["embedding"].tolist()
+    assert store.get("user-1").review_count == 2
+
+
+def build_paged_service(reason_service, callback_client=None, candidate_count=5):
+    candidates = [
+        AlbumCandidate(
+            album_id=str(number),
+            similarity=1.0 - number * 0.01,
+            album_title=f"앨범 {number}",
+            artist_name=f"아티스트 {number}",
+            # 서로 직교하는 벡터라 MMR이 similarity 순서를 바꾸지 않는다.
+            embedding=[float(number == axis) for axis in range(candidate_count)],
+        )
+        for number in range(candidate_count)
+    ]
+    return RecommendationService(
+        embedding_service=FakeEmbeddingService(),
+        album_embedding_repository=FakeAlbumEmbeddingRepository(candidates=candidates),
+        recommendation_reason_service=reason_service,
+        spring_callback_client=callback_client or FakeSpringCallbackClient(),
+        top_k=3,
+        candidate_page_cache=LruCache(10),
+        page_size=2,
+        max_pages=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_paged_generates_reasons_for_first_page_only():
+    """paged 모드는 여러 page 분량 후보를 검색해 두고 첫 page만 추천 사유를 만들어 콜백한다."""
+    reason_service = FakeRecommendationReasonService()
+    callback_client = FakeSpringCallbackClient()
+    service = build_paged_service(reason_service, callback_client)
+
+    await service.recommend_by_review_paged(REVIEW_ID, REVIEW_CONTENT)
+
+    assert service.album_embedding_repository.calls[0]["top_k"] == 6 * 3
+    assert len(reason_service.calls) == 1
+    assert len(reason_service.calls[0]["candidates"]) == 2
+    recommendations = callback_client.completed_calls[0]["recommendations"]
+    assert [item.album_id for item in recommendations] == ["0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_recommendation_page_generates_reasons_on_demand():
+    """다음 page는 요청할 때 그 page 후보의 추천 사유만 만든다. 검색은 다시 하지 않는다."""
+    reason_service = FakeRecommendationReasonService()
+    service = build_paged_service(reason_service)
+    await service.recommend_by_review_paged(REVIEW_ID, REVIEW_CONTENT)
+
+    second = await service.recommendation_page(REVIEW_ID, 2)
+    last = await service.recommendation_page(REVIEW_ID, 3)
+
+    assert [item.album_id for item in second.recommendations] == ["2", "3"]
+    assert second.recommendations[0].recommendation_reason == "앨범 2 추천 사유"
+    assert second.has_next is True
+    assert [item.album_id for item in last.recommendations] == ["4"]
+    assert last.has_next is False
+    assert [len(call["candidates"]) for call in reason_service.calls] == [2, 2, 1]
+    assert reason_service.calls[1]["candidates"][0].embedding is None
+    assert len(service.album_embedding_repository.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_recommendation_page_without_paged_candidates_returns_none():
+    """paged로 검색한 적 없는 감상문은 page를 만들 수 없다."""
+    service = build_paged_service(FakeRecommendationReasonService())
+
+    assert await service.recommendation_page(REVIEW_ID, 2) is None
+
+
+@pytest.mark.asyncio
+async def test_recommendation_page_past_last_page_returns_none():
+    """후보 범위를 넘은 page는 빈 목록 대신 None(404)이고 추천 사유도 만들지 않는다."""
+    reason_service = FakeRecommendationReasonService()
+    service = build_paged_service(reason_service)
+    await service.recommend_by_review_paged(REVIEW_ID, REVIEW_CONTENT)
+
+    assert await service.recommendation_page(REVIEW_ID, 4) is None
+    assert len(reason_service.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_uses_reranker_scores_as_relevance():
+    """reranker가 있으면 similarity 대신 reranker 점수 순서로 top_k를 고른다."""
+
+    class FakeReranker:
+        def __init__(self):
+            self.calls = []
+
+        def rerank_scores(self, query_text, candidates):
+            self.calls.append(query_text)
+            return [0.1, 0.9, 0.5]
+
+    repository = FakeAlbumEmbeddingRepository(
+        candidates=[
+            make_candidate("1", 0.95, artist_name="A"),
+            make_candidate("2", 0.90, artist_name="B"),
+            make_candidate("3", 0.85, artist_name="C"),
+        ]
+    )
+    reason_service = FakeRecommendationReasonService()
+    reranker = FakeReranker()
+    service = build_service(repository=repository, reason_service=reason_service, top_k=2)
+    service.candidate_reranker = reranker
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+
+    assert reranker.calls == [REVIEW_CONTENT]
+    assert [
+        candidate.album_id for candidate in reason_service.calls[0]["candidates"]
+    ] == ["2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_recommend_by_review_serves_repeat_request_from_result_cache():
+    """같은 감상문을 다시 요청하면 임베딩/검색/사유 생성 없이 저장해 둔 결과로 콜백한다."""
+    embedding_service = FakeEmbeddingService()
+    reason_service = FakeRecommendationReasonService()
+    callback_client = FakeSpringCallbackClient()
+    service = build_service(
+        embedding_service=embedding_service,
+        reason_service=reason_service,
+        callback_client=callback_client,
+    )
+    service.result_cache = LruCache(max_size=10)
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    await service.recommend_by_review(REVIEW_ID, "다른 감상문")
+
+    assert embedding_service.calls == [REVIEW_CONTENT, "다른 감상문"]
+    assert len(reason_service.calls) == 2
+    first, second, _ = callback_client.completed_calls
+    assert second["recommendations"] == first["recommendations"]
+    assert service.result_cache.hits == 1
+
+
+class FakeViewDatabase:
+    """v_embedding_with_album을 page 단위로 돌려주는 DB. rows를 바꾸면 다음 적재에 반영된다."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._page = []
+
+    def from_(self, table):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def range(self, start, end):
+        self._page = self.rows[start : end + 1]
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": self._page})()
+
+
+def view_row(album_id, embedding):
+    return {
+        "album_id": album_id,
+        "album_title": f"앨범 {album_id}",
+        "artist_name": f"아티스트 {album_id}",
+        "critics_review_id": f"{album_id}0",
+        "embedding": embedding,
+    }
+
+
+@pytest.mark.asyncio
+async def test_result_cache_follows_real_index_refresh():
+    """같은 view를 다시 적재하면 캐시를 유지하고, view 내용이 바뀐 재적재 뒤에는 다시 검색한다."""
+    database = FakeViewDatabase([view_row("1", [1.0, 0.0, 0.0]), view_row("2", [0.0, 1.0, 0.0])])
+    loader = AlbumVectorIndexLoader(refresh_seconds=0)
+    repository = AlbumEmbeddingRepository(
+        database=database, vector_index_loader=loader, hybrid_search_enabled=False
+    )
+    embedding_service = FakeEmbeddingService(vector=[1.0, 0.1, 0.0])
+    service = build_service(embedding_service=embedding_service, repository=repository)
+    service.result_cache = LruCache(max_size=10)
+    await loader.get(repository)
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    await loader.refresh(repository)
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    unchanged_version = repository.index_version
+
+    database.rows = database.rows + [view_row("3", [0.9, 0.1, 0.0])]
+    await loader.refresh(repository)
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+
+    assert unchanged_version == 1
+    assert repository.index_version == 2
+    assert embedding_service.calls == [REVIEW_CONTENT, REVIEW_CONTENT]
+    assert service.result_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_result_cache_is_cleared_when_index_or_prompt_version_changes():
+    """인덱스나 프롬프트 버전이 바뀌면 저장해 둔 결과를 버리고 파이프라인을 다시 돈다."""
+    repository = FakeAlbumEmbeddingRepository()
+    reason_service = FakeRecommendationReasonService()
+    service = build_service(repository=repository, reason_service=reason_service)
+    service.result_cache = LruCache(max_size=10)
+
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    repository.index_version = 2
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+    reason_service.prompt_version = "v2"
+    await service.recommend_by_review(REVIEW_ID, REVIEW_CONTENT)
+
+    assert len(repository.calls) == 3
+    assert len(service.result_cache) == 1
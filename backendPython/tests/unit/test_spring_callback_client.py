@@ -1,3 +1,4 @@
+import gzip
 import json
 from decimal import Decimal
 
@@ -6,7 +7,10 @@ import pytest
 
 from app.core.error_codes import RecommendationErrorCode
 from app.core.exceptions import CallbackError, ConfigurationError
-from app.clients.spring_callback_client import SpringCallbackClient
+from app.clients.spring_callback_client import (
+    SpringCallbackClient,
+    encode_callback_body,
+)
 from app.schemas.recommendation import RecommendationCallbackItem
 
 from tests.fixtures import ALBUM_ID_1, CRITICS_REVIEW_ID_1, REVIEW_ID
@@ -135,3 +139,88 @@ async def test_send_recommendations_timeout_raises_callback_error():
 
         with pytest.raises(CallbackError):
             await client.send_completed_result(REVIEW_ID, [make_item()])
+
+
+@pytest.mark.asyncio
+async def test_send_completed_result_with_dispatcher_enqueues_instead_of_posting():
+    """outbox dispatcher가 있으면 HTTP 전송 대신 payload를 outbox에 기록한다."""
+    requests = []
+    enqueued = []
+
+    class FakeDispatcher:
+        async def enqueue(self, url, body, headers=None, review_id=None):
+            enqueued.append({"url": url, "body": body, "review_id": review_id})
+
+    async def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = SpringCallbackClient(
+            base_url="https://spring.example.com",
+            http_client=http_client,
+            callback_dispatcher=FakeDispatcher(),
+        )
+
+        await client.send_completed_result(REVIEW_ID, [make_item()])
+
+    assert requests == []
+    assert enqueued[0]["url"] == (
+        f"https://spring.example.com/api/user-reviews/{REVIEW_ID}/recommendations"
+    )
+    assert enqueued[0]["body"]["status"] == "COMPLETED"
+    assert enqueued[0]["review_id"] == REVIEW_ID
+
+
+def test_encode_callback_body_large_payload_is_gzipped():
+    """임계값 이상 payload는 gzip으로 압축하고 Content-Encoding을 붙인다."""
+    body = {"status": "COMPLETED", "recommendations": [], "message": "사유" * 100}
+
+    content, headers = encode_callback_body(body, gzip_min_bytes=64)
+
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(content)) == body
+
+
+def test_encode_callback_body_small_payload_is_plain_json():
+    """임계값 미만이거나 압축이 꺼져 있으면 평문 JSON으로 보낸다."""
+    body = {"status": "COMPLETED", "recommendations": []}
+
+    content, headers = encode_callback_body(body, gzip_min_bytes=0)
+
+    assert "Content-Encoding" not in headers
+    assert json.loads(content) == body
+
+
+@pytest.mark.asyncio
+async def test_send_completed_result_with_batcher_defers_to_batch():
+    """batcher가 있으면 COMPLETED 결과는 배치로 넘기고 FAILED는 즉시 전송한다."""
+    requests = []
+    batched = []
+
+    class FakeBatcher:
+        async def add(self, review_id, body, headers=None):
+            batched.append({"review_id": review_id, "body": body})
+
+    async def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = SpringCallbackClient(
+            base_url="https://spring.example.com",
+            http_client=http_client,
+            callback_batcher=FakeBatcher(),
+        )
+
+        await client.send_completed_result(REVIEW_ID, [make_item()])
+        await client.send_failed_result(
+            REVIEW_ID,
+            error_code=RecommendationErrorCode.NO_CANDIDATES,
+            message="추천 후보가 없습니다.",
+        )
+
+    assert batched[0]["review_id"] == REVIEW_ID
+    assert batched[0]["body"]["recommendations"][0]["albumId"] == ALBUM_ID_1
+    assert len(requests) == 1
+    assert json.loads(requests[0].content)["status"] == "FAILED"
@@ -0,0 +1,171 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.clients.spring_callback_client import SpringCallbackClient
+from app.core.tracing import (
+    JsonlSpanExporter,
+    OtlpHttpSpanExporter,
+    SpanContext,
+    Tracer,
+    format_traceparent,
+    inject_headers,
+    parse_traceparent,
+    tracer as global_tracer,
+)
+
+from tests.fixtures import REVIEW_ID
+
+
+SPRING_TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_traceparent_round_trip_and_invalid_values():
+    """W3C traceparent는 그대로 왕복하고, 형식이 틀리거나 0 id면 무시한다."""
+    context = parse_traceparent(SPRING_TRACEPARENT)
+
+    assert context == SpanContext(
+        "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", sampled=True
+    )
+    assert format_traceparent(context) == SPRING_TRACEPARENT
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(f"00-{'0' * 32}-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_nested_spans_share_trace_and_follow_remote_parent():
+    """하위 span은 Spring이 보낸 trace id와 sampling 결정을 이어받는다."""
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=0.0)
+
+    with tracer.start_span("accept", parent=parse_traceparent(SPRING_TRACEPARENT)) as root:
+        with tracer.start_span("embed", model="m") as child:
+            pass
+
+    assert [span.name for span in exporter.spans] == ["embed", "accept"]
+    assert child.context.trace_id == root.context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert child.parent_span_id == root.context.span_id
+    assert root.parent_span_id == "00f067aa0ba902b7"
+    assert child.attributes == {"model": "m"}
+
+
+def test_unsampled_trace_is_not_exported_but_still_propagated():
+    """sampling에서 빠진 trace는 기록하지 않지만 traceparent는 flag 00으로 전달한다."""
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=0.5, random_source=lambda: 0.9)
+
+    with tracer.start_span("accept"):
+        headers = inject_headers()
+
+    assert exporter.spans == []
+    assert headers["traceparent"].endswith("-00")
+
+
+def test_span_records_error_and_disabled_tracer_yields_none():
+    """예외가 난 span은 오류를 기록하고, exporter가 없으면 span을 만들지 않는다."""
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with pytest.raises(RuntimeError):
+        with tracer.start_span("search"):
+            raise RuntimeError("rpc down")
+    with Tracer().start_span("noop") as span:
+        assert span is None
+
+    assert exporter.spans[0].error == "RuntimeError: rpc down"
+
+
+@pytest.mark.asyncio
+async def test_bind_runs_background_function_under_request_span():
+    """요청 context가 끝난 뒤 실행되는 background 함수도 요청 span의 하위 span이 된다."""
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    async def background():
+        await asyncio.sleep(0)
+
+    with tracer.start_span("accept") as accept:
+        bound = tracer.bind(background, "background")
+    await bound()
+
+    background_span = exporter.spans[-1]
+    assert background_span.name == "background"
+    assert background_span.parent_span_id == accept.context.span_id
+
+
+def test_jsonl_exporter_writes_one_span_per_line(tmp_path):
+    """JSONL exporter는 buffer를 비울 때 span마다 한 줄을 기록한다."""
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlSpanExporter(str(path), buffer_size=10)
+    tracer = Tracer(exporter)
+
+    with tracer.start_span("accept"):
+        with tracer.start_span("embed"):
+            pass
+    exporter.flush()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["embed", "accept"]
+    assert lines[0]["parentSpanId"] == lines[1]["spanId"]
+
+
+@pytest.mark.asyncio
+async def test_otlp_exporter_posts_json_payload_to_collector():
+    """OTLP exporter는 collector의 /v1/traces로 OTLP JSON을 보낸다."""
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    exporter = OtlpHttpSpanExporter(
+        "http://collector:4318",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    tracer = Tracer(exporter)
+    with tracer.start_span("accept", review_id=REVIEW_ID):
+        pass
+
+    await exporter.aclose()
+
+    payload = json.loads(requests[0].content)
+    span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert str(requests[0].url) == "http://collector:4318/v1/traces"
+    assert span["name"] == "accept"
+    assert span["attributes"] == [{"key": "review_id", "value": {"intValue": str(REVIEW_ID)}}]
+
+
+@pytest.mark.asyncio
+async def test_spring_callback_carries_traceparent_of_callback_span(monkeypatch):
+    """Spring 콜백 요청에는 콜백 span을 부모로 하는 traceparent 헤더가 붙는다."""
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    exporter = ListExporter()
+    monkeypatch.setattr(global_tracer, "exporter", exporter)
+    monkeypatch.setattr(global_tracer, "sample_rate", 1.0)
+    client = SpringCallbackClient(
+        base_url="https://spring.example.com",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    with global_tracer.start_span("accept", parent=parse_traceparent(SPRING_TRACEPARENT)):
+        await client.send_completed_result(REVIEW_ID, [])
+
+    callback_span = exporter.spans[0]
+    assert callback_span.name == "spring.callback"
+    assert requests[0].headers["traceparent"] == format_traceparent(callback_span.context)
+    assert callback_span.context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from app.core.exceptions import ConfigurationError
+from app.repositories.user_taste_store import UserTasteStore, blend_taste
+
+
+def test_store_without_path_raises_configuration_error():
+    """경로 없이 생성하면 ConfigurationError가 발생한다."""
+    with pytest.raises(ConfigurationError):
+        UserTasteStore("")
+
+
+def test_update_keeps_exponentially_decayed_mean():
+    """새 감상문일수록 비중이 큰 감쇠 평균을 O(d) 갱신으로 유지한다."""
+    store = UserTasteStore(":memory:", decay=0.5)
+
+    store.update("user-1", [1.0, 0.0], review_id=1)
+    taste = store.update("user-1", [0.0, 1.0], review_id=2)
+
+    # (0.5 * [1, 0] + [0, 1]) / (0.5 + 1)
+    assert taste.vector == pytest.approx([1 / 3, 2 / 3], abs=1e-3)
+    assert taste.weight == pytest.approx(1.5)
+    assert taste.review_count == 2
+    stored = store.get("user-1")
+    assert stored.vector.dtype == np.float32
+    assert stored.vector == pytest.approx([1 / 3, 2 / 3], abs=1e-3)
+
+
+def test_update_same_review_twice_counts_once():
+    """같은 review_id 재시도는 taste에 두 번 반영하지 않는다."""
+    store = UserTasteStore(":memory:", decay=0.5)
+
+    store.update("user-1", [1.0, 0.0], review_id=1)
+    taste = store.update("user-1", [1.0, 0.0], review_id=1)
+
+    assert taste.review_count == 1
+    assert store.get("unknown") is None
+
+
+def test_update_retry_after_later_review_still_counts_once(tmp_path):
+    """다른 감상문이 먼저 반영된 뒤 도착한 재시도도 다시 세지 않고, 재시작 후에도 유지된다."""
+    path = str(tmp_path / "taste.sqlite3")
+    store = UserTasteStore(path, decay=0.5)
+    store.update("user-1", [1.0, 0.0], review_id=1)
+    store.update("user-1", [0.0, 1.0], review_id=2)
+
+    taste = store.update("user-1", [1.0, 0.0], review_id=1)
+    store.close()
+    reopened = UserTasteStore(path, decay=0.5)
+    retried = reopened.update("user-1", [0.0, 1.0], review_id=2)
+    reopened.close()
+
+    assert taste.review_count == 2
+    assert retried.review_count == 2
+    assert retried.vector == pytest.approx([1 / 3, 2 / 3], abs=1e-3)
+
+
+def test_blend_taste_mixes_unit_vectors_by_weight():
+    """감상문과 taste를 단위 벡터로 맞춰 weight 비중으로 섞는다."""
+    blended = blend_taste([10.0, 0.0], np.array([0.0, 2.0]), weight=0.5)
+
+    assert isinstance(blended, np.ndarray)
+    assert blended.dtype == np.float32
+    assert blended.tolist() == pytest.approx([2**-0.5, 2**-0.5])
+    assert blend_taste([1.0, 0.0], np.array([0.0, 1.0]), weight=0.0).tolist() == [1.0, 0.0]